@@ -0,0 +1,208 @@
+"""
+Dashboard queries over the hourly rollups in `corund.db`.
+
+`event_hourly` and `decision_hourly` are maintained by triggers in the same
+transaction as each event/decision write, so every query here reads one row
+per (bucket, key) instead of scanning raw rows, and still sees data that
+retention has already compacted away.
+
+Usage: python -m corund.analytics summary [--hours N] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from corund import db
+from corund.event_model import to_epoch
+
+HOUR = 3600
+BUCKETS = {"hour": HOUR, "day": 24 * HOUR}
+DECISION_KEYS = ("workspace", "tool_name")
+
+TimeLike = float | str | datetime | None
+
+
+def _window(since: TimeLike, until: TimeLike) -> Tuple[int, int]:
+    """[since, until) as whole epoch hours; open ends become the full range."""
+    lo = to_epoch(since)
+    hi = to_epoch(until)
+    lo = 0 if lo is None else int(lo) // HOUR * HOUR
+    hi = 2**62 if hi is None else int(hi)
+    return lo, hi
+
+
+def _bucket_size(bucket: str) -> int:
+    try:
+        return BUCKETS[bucket]
+    except KeyError:
+        raise ValueError(f"Unknown bucket {bucket!r}; expected one of {sorted(BUCKETS)}") from None
+
+
+def _ratio(part: int, total: int) -> float | None:
+    return part / total if total else None
+
+
+def event_counts(
+    since: TimeLike = None,
+    until: TimeLike = None,
+    *,
+    bucket: str = "hour",
+    types: Iterable[str] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Event counts per time bucket and type.
+
+    Returns dicts with bucket (epoch start, UTC), type and count, ordered by
+    bucket then type.
+    """
+    size = _bucket_size(bucket)
+    lo, hi = _window(since, until)
+    sql = "SELECT (hour / ?) * ?, type, SUM(count) FROM event_hourly WHERE hour >= ? AND hour < ?"
+    params: List[Any] = [size, size, lo, hi]
+    if types is not None:
+        types = list(types)
+        sql += f" AND type IN ({','.join('?' * len(types))})"
+        params += types
+    sql += " GROUP BY 1, 2 ORDER BY 1, 2"
+    with db.connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [{"bucket": r[0], "type": r[1], "count": r[2]} for r in rows]
+
+
+def top_event_types(since: TimeLike = None, until: TimeLike = None, *, limit: int = 10) -> List[Tuple[str, int]]:
+    """The `limit` most frequent event types in the window, as (type, count)."""
+    lo, hi = _window(since, until)
+    with db.connection() as conn:
+        rows = conn.execute(
+            "SELECT type, SUM(count) FROM event_hourly WHERE hour >= ? AND hour < ? "
+            "GROUP BY type ORDER BY 2 DESC, 1 LIMIT ?",
+            (lo, hi, limit),
+        ).fetchall()
+    return [(r[0], r[1]) for r in rows]
+
+
+def decision_stats(
+    since: TimeLike = None,
+    until: TimeLike = None,
+    *,
+    bucket: str | None = "day",
+    group_by: Sequence[str] = DECISION_KEYS,
+) -> List[Dict[str, Any]]:
+    """
+    Agent decision totals, executed/blocked counts and success ratio.
+
+    Rows are grouped by time bucket ("hour", "day" or None for the whole
+    window) and by any of `workspace` / `tool_name`; decisions without a
+    workspace are reported under "". `success_ratio` is executed / total.
+
+    Raises:
+        ValueError: for an unknown bucket or grouping key.
+    """
+    unknown = set(group_by) - set(DECISION_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown decision grouping: {sorted(unknown)}")
+    keys = [key for key in DECISION_KEYS if key in group_by]
+    lo, hi = _window(since, until)
+    columns: List[str] = []
+    params: List[Any] = []
+    if bucket is not None:
+        size = _bucket_size(bucket)
+        columns.append("(hour / ?) * ?")
+        params += [size, size]
+    columns += keys
+    select = ", ".join(columns + ["SUM(total)", "SUM(executed)", "SUM(blocked)"])
+    sql = f"SELECT {select} FROM decision_hourly WHERE hour >= ? AND hour < ?"
+    params += [lo, hi]
+    if columns:
+        positions = ", ".join(str(n + 1) for n in range(len(columns)))
+        sql += f" GROUP BY {positions} ORDER BY {positions}"
+    with db.connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+    names = (["bucket"] if bucket is not None else []) + keys
+    out = []
+    for row in rows:
+        total, executed, blocked = row[len(names):]
+        if total is None:  # no rollup rows at all in an ungrouped query
+            continue
+        item = dict(zip(names, row))
+        item.update(
+            total=total,
+            executed=executed,
+            blocked=blocked,
+            success_ratio=_ratio(executed, total),
+        )
+        out.append(item)
+    return out
+
+
+def _last_session_start() -> float | None:
+    with db.connection() as conn:
+        row = conn.execute("SELECT MAX(started_at) FROM sessions").fetchone()
+    if not row or row[0] is None:
+        return None
+    return datetime.fromisoformat(row[0]).replace(tzinfo=timezone.utc).timestamp()
+
+
+def session_summary(since: TimeLike = None, until: TimeLike = None, *, top: int = 5) -> Dict[str, Any]:
+    """
+    Events and decisions since the start of the latest session (or the last
+    24 hours when no session was recorded), read from the rollups only.
+    """
+    since_ts = to_epoch(since)
+    if since_ts is None:
+        since_ts = _last_session_start() or time.time() - BUCKETS["day"]
+    types = top_event_types(since_ts, until, limit=top)
+    events = event_counts(since_ts, until, bucket="day")
+    [overall] = decision_stats(since_ts, until, bucket=None, group_by=()) or [
+        {"total": 0, "executed": 0, "blocked": 0, "success_ratio": None}
+    ]
+    by_workspace = decision_stats(since_ts, until, bucket=None, group_by=("workspace",))
+    return {
+        "since": int(since_ts) // HOUR * HOUR,
+        "events": sum(row["count"] for row in events),
+        "top_event_types": types,
+        "decisions": overall,
+        "by_workspace": by_workspace,
+    }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    since = datetime.fromtimestamp(summary["since"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    decisions = summary["decisions"]
+    lines = [f"Since {since}", f"Events: {summary['events']}"]
+    for event_type, count in summary["top_event_types"]:
+        lines.append(f"  {count:>7}  {event_type}")
+
+    def _describe(stats: Dict[str, Any]) -> str:
+        ratio = stats["success_ratio"]
+        shown = "n/a" if ratio is None else f"{ratio:.0%}"
+        return f"{stats['total']} total, {stats['executed']} executed ({shown}), {stats['blocked']} blocked"
+
+    lines.append(f"Decisions: {_describe(decisions)}")
+    for row in summary["by_workspace"]:
+        lines.append(f"  {row['workspace'] or '(none)'}: {_describe(row)}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m corund.analytics", description="Etherea analytics")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", help="Print a summary of the current session.")
+    summary.add_argument("--hours", type=float, help="Summarize the last N hours instead of the last session.")
+    summary.add_argument("--json", action="store_true", help="Print JSON instead of text.")
+    args = parser.parse_args(argv)
+
+    if args.command == "summary":
+        since = time.time() - args.hours * HOUR if args.hours is not None else None
+        result = session_summary(since)
+        print(json.dumps(result, indent=2) if args.json else format_summary(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,6 @@ import json
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 import os
@@ -43,8 +42,13 @@ except Exception:  # headless/no-GL environments
         pass
 
 from corund.state import get_state
+from corund.state_history import get_history
+from corund.state_store import ei_readout, focus_drifting
+from corund.event_bus import event_bus
+from corund.event_journal import EventJournal
+from corund.memory_consolidation import ConsolidationWorker
+from corund.retention import RetentionWorker
 
-from corund.app_runtime import user_data_dir
 from corund.ei_engine import EIEngine
 from core.emotion import get_emotion_engine
 from core.voice import get_tts_engine
@@ -102,7 +106,9 @@ class AppController(QObject):
         self.workspace_registry = WorkspaceRegistry()
         self.ws_controller = WorkspaceController(self.workspace_manager)
         self.action_registry = ActionRegistry.default()
-        self.aurora_state_store = AuroraStateStore(self.action_registry)
+        self.aurora_state_store = AuroraStateStore(self.action_registry, history=get_history("aurora_runtime"))
+        self.store = self.aurora_state_store.store
+        self._ei_readout = None
         self.os_pipeline = OSPipeline(OSAdapter(dry_run=False))
         self.aurora_pipeline = AuroraDecisionPipeline(
             registry=self.action_registry,
@@ -122,6 +128,10 @@ class AppController(QObject):
         self._profile_logged = False
         self._last_callback_notif = 0.0
         self.capabilities = detect_capabilities()
+        self.event_journal = EventJournal()
+        self.event_journal.attach(event_bus)
+        self.retention_worker = RetentionWorker()
+        self.consolidation_worker = ConsolidationWorker()
         self.aurora_adaptation = AuroraAdaptationEngine()
         self._command_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="etherea-cmd")
 
@@ -149,7 +159,6 @@ class AppController(QObject):
         self.start()
 
     def _connect_signals(self) -> None:
-        signals.emotion_updated.connect(self.window.on_emotion_updated)
         signals.system_log.connect(self.window.log_ui)
         signals.system_log.connect(self._write_log)
         signals.proactive_trigger.connect(self.on_proactive_trigger)
@@ -159,17 +168,20 @@ class AppController(QObject):
         # Sync aurora state with the UI
         current_workspace = self.workspace_registry.get_current()
         emotion_tag = getattr(self.window.avatar_panel, "emotion_tag", "calm")
+        ei_state = self.ei_engine.snapshot()
         self.aurora_state_store.update(
             workspace_id=current_workspace.workspace_id if current_workspace else None,
             workspace_name=current_workspace.name if current_workspace else None,
             session_active=current_workspace is not None,
             last_saved=current_workspace.last_saved if current_workspace else None,
             emotion_tag=emotion_tag,
-            focus=self.ei_engine.state.get("focus", 0.5),
-            stress=self.ei_engine.state.get("stress", 0.2),
-            energy=self.ei_engine.state.get("energy", 0.5),
+            focus=ei_state.get("focus", 0.5),
+            stress=ei_state.get("stress", 0.2),
+            energy=ei_state.get("energy", 0.5),
         )
 
+        self._apply_state_changes()
+
         user_state = self.emotion_engine.tick()
         self.window.on_user_state_updated(user_state)
 
@@ -179,7 +191,7 @@ class AppController(QObject):
                 "variance": max(0.0, 1.0 - self.ei_engine.sub_states.get("typing_rhythm", 0.0)),
             },
             "mouse": {
-                "intensity": self.ei_engine.emotion_vector.get("curiosity", 0.0),
+                "intensity": ei_state.get("curiosity", 0.0),
                 "jitter": self.ei_engine.sub_states.get("physical_jitter", 0.0),
             },
         }
@@ -191,14 +203,23 @@ class AppController(QObject):
         )
         self.window.aurora_bar.setVisible(rec.visible)
         self.window.aurora_bar.status.setText(f"Aurora · {rec.color.title()}")
-        if time.time() - self._last_callback_notif > 300 and self.ei_engine.state.get("focus", 0.5) < 0.25:
+
+    def _apply_state_changes(self) -> None:
+        # Memoized selectors: while the emotion slice is unchanged these are
+        # version checks, and the window only hears about visible changes.
+        readout = self.store.select(ei_readout)
+        if readout != self._ei_readout:
+            self._ei_readout = readout
+            self.window.on_emotion_updated(dict(readout))
+        if self.store.select(focus_drifting) and time.time() - self._last_callback_notif > 300:
             if NotificationManager.instance().call_me_back("Focus is drifting. Want me to open Focus Canvas?"):
                 self._last_callback_notif = time.time()
     
     def _run_async_loop(self):
         """Runs the asyncio event loop in a separate thread."""
         asyncio.set_event_loop(asyncio.new_event_loop())
-        self._async_loop = asyncio.get_running_loop()
+        self._async_loop = asyncio.get_event_loop()
+        event_bus.attach_loop(self._async_loop)
         self._loop_started.set() # Signal that the loop is ready
         self._async_loop.run_forever()
         # Clean up after loop stops
@@ -230,6 +251,12 @@ class AppController(QObject):
 
                 self.log("Registering system tools...")
                 register_system_tools()
+                # State changes can be superseded while queued; OS/agent events must not be lost.
+                event_bus.set_overflow_policy("state.*.changed", "coalesce")
+                # Sensor-driven metrics: listeners only need the latest value.
+                event_bus.coalesce("state.focus_level.changed", 0.05)
+                event_bus.coalesce("state.cognitive_load.changed", 0.05)
+                self._async_loop.call_soon_threadsafe(event_bus.start_queue)
                 self._async_loop.call_soon_threadsafe(policy_engine.start)
                 self.log("✅ Agentic core is alive.")
                 get_startup_timer().mark("agentic")
@@ -247,6 +274,9 @@ class AppController(QObject):
         self.ei_engine.start()
         self._heartbeat.start()
         self.log("✅ EI Engine started.")
+        self._command_executor.submit(self._migrate_legacy_images)
+        self.retention_worker.start()
+        self.consolidation_worker.start()
         self.log(f"ℹ️ Capabilities: {self.capabilities.to_dict()}")
 
         if self.safe_mode:
@@ -272,6 +302,14 @@ class AppController(QObject):
         else:
             self._log_startup_profile()
 
+    def _migrate_legacy_images(self) -> None:
+        try:
+            from corund.memory_store import MemoryStore
+
+            MemoryStore().migrate_legacy_images()
+        except Exception as exc:
+            self.log(f"⚠️ Legacy image migration failed: {exc}")
+
     def _init_agentic_deferred(self) -> None:
         try:
             self._initialize_agentic_core()
@@ -315,9 +353,25 @@ class AppController(QObject):
         self.ei_engine.stop()
         self.log("🔌 Shutting down agentic core...")
         if self._async_loop and self._async_thread and self._async_thread.is_alive():
+            from corund.policy_engine import policy_engine
+
             self._async_loop.call_soon_threadsafe(policy_engine.stop)
+            try:
+                asyncio.run_coroutine_threadsafe(event_bus.stop_queue(), self._async_loop).result(timeout=1)
+            except Exception as exc:
+                self.log(f"⚠️ Event queue did not drain: {exc}")
             self._async_loop.call_soon_threadsafe(self._async_loop.stop)
             self._async_thread.join(timeout=2)
+        event_bus.attach_loop(None)
+        event_bus.shutdown_dispatcher()
+        self.event_journal.close()
+        self.retention_worker.stop(timeout=2)
+        self.consolidation_worker.stop(timeout=2)
+        if event_bus.instrumented:
+            try:
+                event_bus.dump_stats(ResourceManager.logs_dir() / "event_bus_stats.json")
+            except Exception as exc:
+                self.log(f"⚠️ Could not write event bus stats: {exc}")
         self.log("✅ Shutdown complete.")
 
     def get_available_workspaces(self) -> list[WorkspaceRecord]:
@@ -385,7 +439,7 @@ class AppController(QObject):
                 out = merged.get("router") or {}
                 emotion = brain.get("emotion_update")
                 if isinstance(emotion, dict):
-                    signals.emotion_updated.emit(emotion)
+                    self.window.on_emotion_updated(emotion)
                 response = str(brain.get("response", "")).strip()
                 if response:
                     self.window.avatar_panel.dialogue.setText(f"“{response}”")
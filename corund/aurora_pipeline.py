@@ -5,10 +5,8 @@ from typing import Callable, Dict, List, Optional
 
 from corund.aurora_actions import ActionRegistry, ActionSpec
 from corund.aurora_state import AuroraStateStore
-from corund.event_model import Event, create_event
+from corund.event_model import create_event
 from corund.event_bus import EventBus, event_bus
-from corund.workspace_manager import WorkspaceManager
-from corund.workspace_registry import WorkspaceRegistry
 from corund.os_pipeline import OSPipeline
 from corund.workspace_manager import WorkspaceManager
 from corund.workspace_registry import WorkspaceRegistry
@@ -35,30 +33,25 @@ class AuroraDecisionPipeline:
         self._workspace_registry = workspace_registry
         self._workspace_manager = workspace_manager
         self._state_store = state_store
-        self._listeners: List[Callable[[Event], None]] = []
+        self._listeners: List[Callable[[AuroraEvent], None]] = []
         self._bus = bus or event_bus
         self._os_pipeline = os_pipeline
         self._log_cb = log_cb
 
-    def subscribe(self, listener: Callable[[Event], None]) -> None:
-        self._listeners.append(listener)
-
-    def _emit(self, event_type: str, payload: Dict[str, object]) -> None:
-        event = create_event(
-            event_type,
-            source="aurora_pipeline",
-            payload=payload,
-            priority=40,
-            privacy_level="normal",
-        )
-        self._bus.emit(event)
-        self._listeners: List[Callable[[AuroraEvent], None]] = []
-        self._log_cb = log_cb
-
     def subscribe(self, listener: Callable[[AuroraEvent], None]) -> None:
         self._listeners.append(listener)
 
     def _emit(self, event_type: str, payload: Dict[str, object]) -> None:
+        # handle_intent is synchronous, so the bus event is posted rather than awaited.
+        self._bus.post(
+            create_event(
+                event_type,
+                source="aurora_pipeline",
+                payload=payload,
+                priority=40,
+                privacy_level="normal",
+            )
+        )
         event = AuroraEvent(event_type=event_type, payload=payload)
         for listener in self._listeners:
             listener(event)
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+
+from corund.state_history import StateHistory
+from corund.state_store import EmotionSlice, StateStore, get_store
+
+_EMOTION_KEYS = frozenset(f.name for f in fields(EmotionSlice))
 
 
 @dataclass
@@ -24,16 +29,45 @@ class AuroraRuntimeState:
 
 
 class AuroraStateStore:
-    """Simple mutable store consumed by AuroraDecisionPipeline."""
-
-    def __init__(self, _registry=None) -> None:
+    """
+    Simple mutable store consumed by AuroraDecisionPipeline.
+
+    Runtime fields are mirrored into the `aurora` slice of the unified
+    StateStore; EI keys (`focus`, `stress`, `emotion_tag`, ...) go to its
+    `emotion` slice instead of being dropped. Each store versions its
+    runtime in its own `history` unless one is passed in; the app-owned
+    store passes the global `aurora_runtime` history.
+    """
+
+    def __init__(
+        self,
+        _registry=None,
+        history: StateHistory | None = None,
+        store: StateStore | None = None,
+    ) -> None:
         self.visual = AuroraState()
         self.runtime = AuroraRuntimeState()
+        self.history = history if history is not None else StateHistory("aurora_runtime")
+        self.history.capture(self.runtime)
+        self.store = store if store is not None else get_store()
+        self.store.register_slice("aurora", AuroraRuntimeState, initial=self.runtime)
+        if not self.store.has_slice("emotion"):
+            self.store.register_slice("emotion", EmotionSlice)
 
     def update(self, **kwargs) -> AuroraRuntimeState:
+        runtime_changes = {}
+        emotion_changes = {}
         for key, value in kwargs.items():
             if hasattr(self.runtime, key):
                 setattr(self.runtime, key, value)
+                runtime_changes[key] = value
+            elif key in _EMOTION_KEYS:
+                emotion_changes[key] = value
+        self.history.capture(self.runtime)
+        if runtime_changes:
+            self.store.update("aurora", **runtime_changes)
+        if emotion_changes:
+            self.store.update("emotion", **emotion_changes)
         return self.runtime
 
 
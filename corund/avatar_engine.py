@@ -142,10 +142,12 @@ class AvatarEngine:
         tone = self._infer_tone(text, emotion_tag)
         emotion_update = self._emotion_for_tone(tone)
 
-        try:
-            memories = db.get_recent_memories(limit=1) or []
-        except Exception:
-            memories = []
+        memories = []
+        if "remember" in low:
+            try:
+                memories = db.search_memories(text, limit=1) or db.get_recent_memories(limit=1) or []
+            except Exception:
+                memories = []
 
         command: Optional[dict] = None
         save_memory: Optional[dict] = None
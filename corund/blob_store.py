@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from corund import db as storage
+from corund.app_runtime import user_data_dir
+
+CHUNK_SIZE = 64 * 1024
+PREFIX = "sha256:"
+
+
+class BlobStore:
+    """
+    Content-addressed store for images and other binary payloads.
+
+    Blobs live at `<root>/<aa>/<sha256 hex>` and are written by streaming
+    into a temporary file that is hashed on the fly and renamed into place,
+    so identical content is stored once. Reference counts are kept in the
+    storage engine's `blobs` table, so callers can change them in the same
+    transaction as the rows holding the references (pass `conn`); a blob
+    file is removed once its count is zero and the change has committed.
+    References are returned as `sha256:<hex>` strings, which is what
+    profile and memory rows store.
+    """
+
+    def __init__(self, root: str | Path | None = None, engine: storage.StorageEngine | None = None) -> None:
+        self.root = Path(root) if root else user_data_dir() / "blobs"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._engine = engine
+        # Serializes placing/collecting files with their refcount changes.
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> storage.StorageEngine:
+        return self._engine if self._engine is not None else storage.get_engine()
+
+    @staticmethod
+    def is_ref(value: object) -> bool:
+        return isinstance(value, str) and value.startswith(PREFIX) and len(value) == len(PREFIX) + 64
+
+    def _path(self, ref: str) -> Path:
+        if not self.is_ref(ref):
+            raise ValueError(f"not a blob reference: {ref!r}")
+        digest = ref[len(PREFIX):]
+        return self.root / digest[:2] / digest
+
+    # --- Writing ---
+
+    def put(self, data: bytes) -> str:
+        """Store `data` (or add a reference to identical content) and return its reference."""
+        return self.put_stream([data])
+
+    def put_stream(self, chunks: Iterable[bytes]) -> str:
+        """Store content from an iterable of byte chunks without holding it all in memory."""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".incoming-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in chunks:
+                    if chunk:
+                        hasher.update(chunk)
+                        handle.write(chunk)
+                        size += len(chunk)
+            ref = PREFIX + hasher.hexdigest()
+            path = self._path(ref)
+            with self._lock:
+                if path.exists():
+                    os.unlink(tmp)
+                else:
+                    path.parent.mkdir(exist_ok=True)
+                    os.replace(tmp, path)
+                self.engine.write(lambda conn: conn.execute(
+                    "INSERT INTO blobs(digest, size, refcount) VALUES (?, ?, 1) "
+                    "ON CONFLICT(digest) DO UPDATE SET refcount = refcount + 1",
+                    (ref, size),
+                ))
+            return ref
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def incref(self, ref: str, conn: sqlite3.Connection | None = None) -> None:
+        """Add a reference; with `conn`, as part of the caller's write transaction."""
+        if conn is None:
+            return self.engine.write(lambda c: self.incref(ref, c))
+        updated = conn.execute("UPDATE blobs SET refcount = refcount + 1 WHERE digest = ?", (ref,))
+        if updated.rowcount == 0:
+            raise KeyError(ref)
+
+    def decref(self, ref: str, conn: sqlite3.Connection | None = None) -> int:
+        """
+        Drop one reference and return the new count. Without `conn` the blob
+        is deleted right away when none remain; callers passing their own
+        write transaction call `collect()` after it commits.
+        """
+        if conn is None:
+            with self._lock:
+                count = self.engine.write(lambda c: self.decref(ref, c))
+                if count == 0:
+                    self._collect_locked([ref])
+            return count
+        conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE digest = ? AND refcount > 0", (ref,))
+        row = conn.execute("SELECT refcount FROM blobs WHERE digest = ?", (ref,)).fetchone()
+        return row[0] if row else 0
+
+    def collect(self, refs: Iterable[str]) -> int:
+        """Delete those of `refs` that have no references left; returns how many were removed."""
+        with self._lock:
+            return self._collect_locked([ref for ref in refs if self.is_ref(ref)])
+
+    def _collect_locked(self, refs: list) -> int:
+        if not refs:
+            return 0
+
+        def _delete(conn) -> list:
+            dead = []
+            for ref in refs:
+                if conn.execute("DELETE FROM blobs WHERE digest = ? AND refcount <= 0", (ref,)).rowcount:
+                    dead.append(ref)
+            return dead
+
+        dead = self.engine.write(_delete)
+        for ref in dead:
+            try:
+                self._path(ref).unlink()
+            except FileNotFoundError:
+                pass
+        return len(dead)
+
+    # --- Reading ---
+
+    def exists(self, ref: str) -> bool:
+        return self.is_ref(ref) and self._path(ref).exists()
+
+    def refcount(self, ref: str) -> int:
+        with self.engine.read() as conn:
+            row = conn.execute("SELECT refcount FROM blobs WHERE digest = ?", (ref,)).fetchone()
+        return row[0] if row else 0
+
+    def open(self, ref: str) -> BinaryIO:
+        return open(self._path(ref), "rb")
+
+    def iter_chunks(self, ref: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open(ref) as handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def read(self, ref: str) -> bytes:
+        with self.open(ref) as handle:
+            return handle.read()
+
+
+_blob_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Access the global BlobStore under `user_data_dir()`."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
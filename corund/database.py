@@ -1,120 +1,322 @@
-import sqlite3
 import os
 import json
+import threading
+import time
 try:
     import numpy as np
 except Exception:
     np = None  # optional on Termux/CI
 from datetime import datetime
+from types import MappingProxyType
 
-from corund.app_runtime import user_data_dir
+from corund import db as storage
+from corund.db import fts_query
+from corund.embedder import HashingEmbedder
+from corund.vector_index import IVFIndex, QuantizedMatrix
+
+_PROFILE_VERSION_SQL = "SELECT CAST(value AS INTEGER) FROM db_meta WHERE key = 'profile_version'"
 
 
 class Database:
-    def __init__(self, db_path: str | None = None):
-        if db_path is None:
-            db_path = str(user_data_dir() / "etherea.db")
-        self.db_path = db_path
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        # Ensure connection uses check_same_thread=False safely
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.execute("PRAGMA foreign_keys = ON")  # safe default
-        self.create_tables()
-
-    def create_tables(self):
-        cursor = self.conn.cursor()
-
-        # Memories Table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS memories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                type TEXT DEFAULT 'general',
-                embedding BLOB,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+    """
+    Memory, profile and embedding access on top of the storage engine.
 
-        # User Profile Table (Key-Value)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_profile (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        """)
+    With no `db_path` this shares the process-wide engine (`corund.db`);
+    with one it owns a private engine for that file. Reads use the engine's
+    read-only pool and writes go through its writer thread.
+    """
 
-        self.conn.commit()
+    def __init__(self, db_path: str | None = None):
+        if db_path is None:
+            self.engine = storage.get_engine()
+            self._owns_engine = False
+        else:
+            self.engine = storage.StorageEngine(db_path)
+            self._owns_engine = True
+        self.db_path = str(self.engine.path)
+        # Opened on first search, then kept in sync by add_memory.
+        self._embeddings: QuantizedMatrix | None = None
+        self._memory_index: IVFIndex | None = None
+        self._embeddings_lock = threading.Lock()
+        # Highest memory id seen by the sidecar's open-time backfill.
+        self._backfilled_id = 0
+        base = os.path.splitext(self.db_path)[0]
+        # int8 embedding sidecar searched through np.memmap.
+        self.embeddings_path = base + ".emb"
+        # Persisted IVF centroids/assignments, so startup does not re-cluster.
+        self.index_path = base + ".ivf.npz"
+        # Document frequencies of the local text embedder.
+        self.embedder_path = base + ".embedder.npz"
+        self._embedder: HashingEmbedder | None = None
+        # Write-through user_profile cache; reloaded when the profile change
+        # counter kept by triggers (db_meta 'profile_version') shows a write
+        # from elsewhere, checked at most every `preference_recheck` seconds.
+        # Each update swaps in a new dict, so views handed out stay stable.
+        self.preference_recheck = 1.0
+        self.preferences_version = 0
+        self._prefs: dict | None = None
+        self._prefs_view = MappingProxyType({})
+        self._prefs_profile_version = None
+        self._prefs_checked = 0.0
+        self._prefs_lock = threading.Lock()
 
     def add_memory(self, content: str, memory_type: str = "general", embedding=None):
-        cursor = self.conn.cursor()
         # Only convert embedding if not None
         emb_blob = None
         if embedding is not None:
             try:
                 emb_array = np.array(embedding, dtype=np.float32)
-                emb_blob = sqlite3.Binary(emb_array.tobytes())
+                emb_blob = emb_array.tobytes()
             except Exception as e:
                 print(f"Failed to convert embedding to blob: {e}")
                 emb_blob = None
-        cursor.execute(
+        row_id = self.engine.execute(
             "INSERT INTO memories (content, type, embedding) VALUES (?, ?, ?)",
             (content, memory_type, emb_blob)
         )
-        self.conn.commit()
+        if emb_blob is not None:
+            # Checked under the lock: a row the open-time backfill already saw
+            # is skipped, a later one is appended once the sidecar is published.
+            with self._embeddings_lock:
+                if self._embeddings is not None and row_id > self._backfilled_id:
+                    self._embeddings.add(row_id, emb_array)
+
+    @property
+    def embedder(self) -> HashingEmbedder:
+        """Local embedder for memories stored without an external embedding."""
+        if self._embedder is None:
+            embedder = HashingEmbedder()
+            embedder.load(self.embedder_path)
+            self._embedder = embedder
+        return self._embedder
+
+    def embed_memory(self, content: str):
+        """Embed text being stored (updating the embedder's IDF, saved periodically)."""
+        vector = self.embedder.embed(content, learn=True)
+        if self._embedder.needs_save:
+            self._embedder.save(self.embedder_path)
+        return vector
+
+    def embed_missing(self, limit: int = 256) -> int:
+        """
+        Embed up to `limit` stored memories that have no embedding yet
+        (e.g. saved before the local embedder existed), oldest first.
+        Returns how many were embedded; 0 once none are left.
+        """
+        # Open the sidecar first: its startup backfill only covers ids above
+        # the last stored one, so older rows must be appended here.
+        matrix = self._embedding_matrix()
+        with self.engine.read() as conn:
+            rows = conn.execute(
+                "SELECT id, content FROM memories WHERE embedding IS NULL ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        if not rows:
+            return 0
+        vectors = self.embedder.embed_batch([content for _, content in rows], learn=True)
+        if self._embedder.needs_save:
+            self._embedder.save(self.embedder_path)
+        ids = [row_id for row_id, _ in rows]
+        self.engine.write(lambda conn: conn.executemany(
+            "UPDATE memories SET embedding = ? WHERE id = ? AND embedding IS NULL",
+            [(vector.tobytes(), row_id) for row_id, vector in zip(ids, vectors)],
+        ))
+        matrix.add_many(ids, vectors)
+        return len(rows)
+
+    def _embedding_matrix(self) -> QuantizedMatrix:
+        if self._embeddings is None:
+            with self._embeddings_lock:
+                if self._embeddings is None:
+                    self._open_embeddings()
+        return self._embeddings
+
+    def _open_embeddings(self) -> None:
+        with self.engine.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM db_meta WHERE key = 'instance_token'")
+            matrix = QuantizedMatrix(self.embeddings_path, token=int(cursor.fetchone()[0]))
+            # Backfill rows written while the sidecar was closed (or before it
+            # existed). Not ids[-1]: embed_missing appends older ids late.
+            last_id = int(matrix.ids.max()) if len(matrix) else 0
+            cursor.execute(
+                "SELECT id, embedding FROM memories WHERE embedding IS NOT NULL AND id > ? ORDER BY id",
+                (last_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(4096)
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                matrix.add_many(
+                    (row_id for row_id, _ in rows),
+                    (np.frombuffer(blob, dtype=np.float32) for _, blob in rows),
+                )
+        index = IVFIndex(matrix)
+        if matrix.dim is not None and os.path.exists(self.index_path):
+            index.load(self.index_path)
+        # Published last: callers that see the matrix also see its index.
+        self._backfilled_id = last_id
+        self._memory_index = index
+        self._embeddings = matrix
+
+    def drop_from_memory_index(self, memory_ids):
+        """Remove embeddings of deleted memories from the sidecar and index."""
+        matrix = self._embedding_matrix()
+        keep = ~np.isin(matrix.ids, np.asarray(list(memory_ids), dtype=np.int64))
+        if self._memory_index.compact(keep) and self._memory_index.trained:
+            self._memory_index.save(self.index_path)
+
+    def rebuild_memory_index(self):
+        """Retrain the approximate memory index on every stored embedding and persist it."""
+        self._embedding_matrix()
+        self._memory_index.rebuild()
+        self._memory_index.save(self.index_path)
 
-    def search_memories(self, query_embedding, limit: int = 5):
+    def search_memories(self, query_embedding, limit: int = 5, exact: bool = False):
         """
         Search memories using cosine similarity of embeddings.
+
+        `query_embedding` may also be text, which is embedded with the
+        local `embedder`.
+        Candidates come from an int8, memory-mapped copy of the embeddings
+        (narrowed by an IVF index once there are enough of them; pass
+        `exact=True` to scan everything) and are rescored against the
+        full-precision blobs.
         """
         if query_embedding is None:
             return self.get_recent_memories(limit)
+        if isinstance(query_embedding, str):
+            query_embedding = self.embedder.embed(query_embedding)
 
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT content, embedding FROM memories WHERE embedding IS NOT NULL")
-        rows = cursor.fetchall()
-
-        if not rows:
+        self._embedding_matrix()
+        # int8 scores are approximate: over-fetch, then rescore at full precision.
+        ids, _ = self._memory_index.search(query_embedding, max(4 * limit, 32), exact=exact)
+        if self._memory_index.needs_save:
+            self._memory_index.save(self.index_path)
+        if len(ids) == 0:
+            return []
+        id_list = [int(i) for i in ids]
+        with self.engine.read() as conn:
+            cursor = conn.execute(
+                f"SELECT id, content, embedding FROM memories WHERE id IN ({','.join('?' * len(id_list))})", id_list)
+            rows = {row_id: (content, blob) for row_id, content, blob in cursor.fetchall()}
+        found = [i for i in id_list if i in rows]
+        candidates = [rows[i] for i in found]
+        if not candidates:
             return []
-
         search_vec = np.array(query_embedding, dtype=np.float32)
-        results = []
+        embs = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob in candidates])
+        # Cosine similarity: (A . B) / (||A|| * ||B||)
+        sims = embs @ search_vec / (np.linalg.norm(embs, axis=1) * np.linalg.norm(search_vec) + 1e-9)
+        order = np.argsort(-sims, kind="stable")[:limit]
+        hit_ids = [found[i] for i in order]
+        # Recall counts feed memory consolidation (salience); write-behind.
+        self.engine.submit(
+            f"UPDATE memories SET hits = hits + 1, last_hit_ts = ? WHERE id IN ({','.join('?' * len(hit_ids))})",
+            (int(time.time()), *hit_ids),
+        )
+        return [candidates[i][0] for i in order]
 
-        for content, emb_blob in rows:
-            try:
-                emb = np.frombuffer(emb_blob, dtype=np.float32)
-                # Cosine similarity: (A . B) / (||A|| * ||B||)
-                norm = np.linalg.norm(search_vec) * np.linalg.norm(emb) + 1e-9
-                sim = np.dot(search_vec, emb) / norm
-                results.append((content, sim))
-            except Exception as e:
-                print(f"Failed to compute similarity for a memory: {e}")
+    def search_text(self, query: str, since: float | None = None, limit: int = 20):
+        """
+        Ranked full-text search over memory content.
 
-        # Sort by similarity descending
-        results.sort(key=lambda x: x[1], reverse=True)
-        return [res[0] for res in results[:limit]]
+        Returns dicts with kind, id, type, snippet, rank (bm25, lower is
+        better) and created_ts, best first.
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        with self.engine.read() as conn:
+            rows = conn.execute(
+                """
+                SELECT m.id, m.type, snippet(memories_fts, 0, '[', ']', '…', 12),
+                       bm25(memories_fts), CAST(strftime('%s', m.created_at) AS INTEGER)
+                FROM memories_fts JOIN memories m ON m.id = memories_fts.rowid
+                WHERE memories_fts MATCH ? AND m.created_at >= datetime(?, 'unixepoch')
+                ORDER BY bm25(memories_fts) LIMIT ?
+                """,
+                (match, int(since or 0), limit)
+            ).fetchall()
+        return [
+            {"kind": "memories", "id": r[0], "type": r[1], "snippet": r[2], "rank": r[3], "created_ts": r[4]}
+            for r in rows
+        ]
 
     def get_recent_memories(self, limit: int = 5):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT content FROM memories ORDER BY created_at DESC LIMIT ?", (limit,))
-        return [row[0] for row in cursor.fetchall()]
-
-    def set_preference(self, key: str, value: str):
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT OR REPLACE INTO user_profile (key, value) VALUES (?, ?)",
-            (key, value)
-        )
-        self.conn.commit()
+        with self.engine.read() as conn:
+            rows = conn.execute(
+                "SELECT content FROM memories ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [row[0] for row in rows]
+
+    def _publish_preferences(self, prefs: dict, profile_version) -> None:
+        self._prefs = prefs
+        self._prefs_view = MappingProxyType(prefs)
+        self._prefs_profile_version = profile_version
+        self.preferences_version += 1
+
+    def _preferences(self):
+        now = time.monotonic()
+        with self._prefs_lock:
+            if self._prefs is not None and now - self._prefs_checked < self.preference_recheck:
+                return self._prefs_view
+            self._prefs_checked = now
+            with self.engine.read() as conn:
+                profile_version = conn.execute(_PROFILE_VERSION_SQL).fetchone()[0]
+                if self._prefs is None or profile_version != self._prefs_profile_version:
+                    rows = conn.execute("SELECT key, value FROM user_profile").fetchall()
+                    self._publish_preferences(dict(rows), profile_version)
+            return self._prefs_view
+
+    def set_preference(self, key: str, value: str, apply=None):
+        """
+        Store one preference. `apply(conn, previous_value)` runs in the same
+        transaction (e.g. to adjust blob reference counts); its result is returned.
+        """
+        def _write(conn):
+            previous = None
+            if apply is not None:
+                row = conn.execute("SELECT value FROM user_profile WHERE key = ?", (key,)).fetchone()
+                previous = row[0] if row else None
+            conn.execute("INSERT OR REPLACE INTO user_profile (key, value) VALUES (?, ?)", (key, value))
+            result = apply(conn, previous) if apply is not None else None
+            return conn.execute(_PROFILE_VERSION_SQL).fetchone()[0], result
+
+        profile_version, result = self.engine.write(_write)
+        with self._prefs_lock:
+            if self._prefs is not None:
+                # Only skip the next reload if nobody else wrote in between.
+                known = self._prefs_profile_version
+                fresh = known is not None and profile_version == known + 1
+                self._publish_preferences({**self._prefs, key: value}, profile_version if fresh else None)
+        return result
+
+    def get_preference(self, key: str, default=None, cast=None):
+        """
+        One cached preference value, optionally converted with `cast`
+        (e.g. `int`, `json.loads`); `default` if missing or not convertible.
+        """
+        value = self._preferences().get(key)
+        if value is None:
+            return default
+        if cast is None:
+            return value
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            return default
 
     def get_profile_context(self):
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT key, value FROM user_profile")
-        rows = cursor.fetchall()
-        if rows is None:
-            return {}
-        return {row[0]: row[1] for row in rows}
+        """Read-only view of every preference, served from the cache."""
+        return self._preferences()
+
+    def close(self):
+        if self._embeddings is not None:
+            self._embeddings.close()
+        if self._embedder is not None and self._embedder.docs != self._embedder._saved_docs:
+            self._embedder.save(self.embedder_path)
+        if self._owns_engine:
+            self.engine.close()
 
 
 # Global Instance
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import atexit
+import logging
+import os
+import queue
+import re
 import sqlite3
 import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
 
 from corund.app_runtime import user_data_dir
 
-_DB_LOCK = threading.Lock()
+logger = logging.getLogger(__name__)
+
 _DB_PATH: Path | None = None
 
+POOL_SIZE = int(os.environ.get("ETHEREA_DB_POOL_SIZE", "4"))
+STATEMENT_CACHE = 128
+
 
 def db_path() -> Path:
     global _DB_PATH
@@ -19,19 +31,724 @@ def db_path() -> Path:
     return _DB_PATH
 
 
+def _open(
+    path: Path,
+    *,
+    cached_statements: int = STATEMENT_CACHE,
+    check_same_thread: bool = True,
+    readonly: bool = False,
+) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        str(path),
+        timeout=30,
+        isolation_level=None,  # autocommit
+        check_same_thread=check_same_thread,
+        cached_statements=cached_statements,
+    )
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    conn.execute("PRAGMA busy_timeout=30000;")
+    # So INSERT OR REPLACE fires the delete triggers that keep FTS indexes in sync.
+    conn.execute("PRAGMA recursive_triggers=ON;")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON;")
+    return conn
+
+
 def connect() -> sqlite3.Connection:
     """
     Returns a sqlite3 connection with sane defaults.
     - WAL for concurrency
     - foreign keys enabled
+
+    The caller owns (and must close) the connection. Prefer the storage
+    engine: `connection()` for reads, `execute()`/`write()`/`submit()` for
+    writes, which all go through its single writer thread.
     """
-    path = db_path()
-    path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(path), timeout=30, isolation_level=None)  # autocommit
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA foreign_keys=ON;")
-    conn.execute("PRAGMA busy_timeout=30000;")
-    return conn
+    return _open(db_path())
+
+
+class ConnectionPool:
+    """
+    Bounded pool of configured SQLite connections.
+
+    Connections are opened lazily up to `size` (read-only when `readonly`
+    is set) and configured once, so the
+    PRAGMAs are not re-issued per statement. Each connection keeps its own
+    prepared-statement cache (`cached_statements`), which pays off because
+    callers reuse the same SQL text. A thread that already holds a
+    connection gets the same one back from a nested `connection()` block.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        size: int = POOL_SIZE,
+        *,
+        statement_cache: int = STATEMENT_CACHE,
+        readonly: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.size = max(1, size)
+        self.statement_cache = statement_cache
+        self.readonly = readonly
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._all: list[sqlite3.Connection] = []
+        self._closed = False
+        self._acquires = 0
+        self._waits = 0
+        self._wait_s = 0.0
+        self._wait_max_s = 0.0
+        self._use_s = 0.0
+        self._use_max_s = 0.0
+        self._in_use = 0
+
+    def _checkout(self, timeout: float | None) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = _open(
+                    self.path,
+                    cached_statements=self.statement_cache,
+                    check_same_thread=False,
+                    readonly=self.readonly,
+                )
+                self._all.append(conn)
+                return conn
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no SQLite connection free within {timeout}s (pool size {self.size})") from None
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._waits += 1
+            self._wait_s += waited
+            self._wait_max_s = max(self._wait_max_s, waited)
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection, used: float) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._in_use -= 1
+            self._use_s += used
+            self._use_max_s = max(self._use_max_s, used)
+            closed = self._closed
+        if closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout: float | None = 30.0) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the block."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = self._checkout(timeout)
+        with self._lock:
+            self._acquires += 1
+            self._in_use += 1
+        self._local.conn = conn
+        started = time.perf_counter()
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._checkin(conn, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy plus wait/use timings in milliseconds."""
+        with self._lock:
+            acquires = self._acquires
+            return {
+                "size": self.size,
+                "open": len(self._all),
+                "in_use": self._in_use,
+                "acquires": acquires,
+                "waits": self._waits,
+                "wait_ms_total": round(self._wait_s * 1000, 3),
+                "wait_ms_max": round(self._wait_max_s * 1000, 3),
+                "use_ms_avg": round(self._use_s * 1000 / acquires, 3) if acquires else 0.0,
+                "use_ms_max": round(self._use_max_s * 1000, 3),
+            }
+
+    def close(self) -> None:
+        """Close idle connections now and borrowed ones when they are returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_STOP = object()
+
+
+class _Call:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn: Callable[[sqlite3.Connection], Any]) -> None:
+        self.fn = fn
+        self.future: Future = Future()
+
+
+class BatchWriter:
+    """
+    The single writer for one database file, on its own thread and connection.
+
+    `submit()` enqueues a statement and returns immediately (write-behind);
+    `call(fn)` runs `fn(conn)` on the writer and returns a Future with its
+    result. The writer collects up to `max_batch` items, or whatever
+    arrived within `max_latency` seconds of the first one (a `call()` ends
+    the wait so synchronous callers are not delayed), and commits them in
+    one transaction. Consecutive statements with the same SQL go through
+    `executemany`; each group and each call runs in a savepoint, so a
+    failing row or call is rolled back alone. When `max_pending` items are
+    queued, `submit()` blocks (backpressure) and raises TimeoutError once
+    `timeout` passes. `flush()` returns after everything queued before it
+    is committed.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_batch: int = 256,
+        max_latency: float = 0.05,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.path = Path(path)
+        self.max_batch = max(1, max_batch)
+        self.max_latency = max(0.0, max_latency)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_pending))
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self._submitted = 0
+        self._written = 0
+        self._calls = 0
+        self._batches = 0
+        self._errors = 0
+        self._largest_batch = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="etherea-db-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _put(self, item: Any, timeout: float | None) -> None:
+        if self._closed:
+            raise RuntimeError("batch writer is closed")
+        self._ensure_thread()
+        try:
+            self._queue.put(item, timeout=timeout)
+        except queue.Full:
+            raise TimeoutError(f"write queue full ({self._queue.maxsize} pending)") from None
+
+    def submit(self, sql: str, params: tuple = (), timeout: float | None = None) -> None:
+        self._put((sql, params), timeout)
+        self._submitted += 1
+
+    def call(self, fn: Callable[[sqlite3.Connection], Any], timeout: float | None = None) -> Future:
+        item = _Call(fn)
+        self._put(item, timeout)
+        return item.future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything queued so far is committed; False on timeout."""
+        if self._thread is None:
+            return True
+        if self._closed:
+            # Nothing reads the queue after _STOP; just wait for the drain.
+            self._thread.join(timeout)
+            return not self._thread.is_alive()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "submitted": self._submitted,
+            "written": self._written,
+            "calls": self._calls,
+            "batches": self._batches,
+            "errors": self._errors,
+            "largest_batch": self._largest_batch,
+        }
+
+    def _run(self) -> None:
+        conn = _open(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch, barriers, stop = [], [], False
+                deadline = time.monotonic() + self.max_latency
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        barriers.append(item)
+                    else:
+                        batch.append(item)
+                    if stop or barriers or isinstance(item, _Call) or len(batch) >= self.max_batch:
+                        break
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._commit(conn, batch)
+                for barrier in barriers:
+                    barrier.set()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list) -> None:
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            start = 0
+            while start < len(batch):
+                item = batch[start]
+                if isinstance(item, _Call):
+                    results.append((item.future, *self._savepoint(conn, lambda: item.fn(conn))))
+                    self._calls += 1
+                    start += 1
+                    continue
+                end = start
+                while end < len(batch) and not isinstance(batch[end], _Call) and batch[end][0] == item[0]:
+                    end += 1
+                group = batch[start:end]
+                _, error = self._savepoint(conn, lambda: conn.executemany(item[0], [params for _, params in group]))
+                if error is None:
+                    self._written += len(group)
+                else:
+                    # Retry the group row by row so one bad row does not drop the rest.
+                    for sql, params in group:
+                        _, error = self._savepoint(conn, lambda: conn.execute(sql, params))
+                        if error is None:
+                            self._written += 1
+                        else:
+                            self._errors += 1
+                            logger.warning("Dropped write-behind statement: %s", error)
+                start = end
+            conn.execute("COMMIT")
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            self._errors += len(batch)
+            logger.exception("Write batch of %d items lost", len(batch))
+            results = [(item.future, None, exc) for item in batch if isinstance(item, _Call)]
+        self._batches += 1
+        self._largest_batch = max(self._largest_batch, len(batch))
+        for future, value, error in results:
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    @staticmethod
+    def _savepoint(conn: sqlite3.Connection, fn: Callable[[], Any]) -> Tuple[Any, BaseException | None]:
+        conn.execute("SAVEPOINT batch_item")
+        try:
+            value = fn()
+        except Exception as exc:
+            conn.execute("ROLLBACK TO batch_item")
+            conn.execute("RELEASE batch_item")
+            return None, exc
+        conn.execute("RELEASE batch_item")
+        return value, None
+
+
+# Migrations, applied in order; each runs in one transaction and is
+# recorded in schema_migrations.
+
+_MIGRATION_001_CORE_TABLES = [
+    # sessions
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        started_at TEXT NOT NULL DEFAULT (datetime('now')),
+        ended_at   TEXT,
+        workspace  TEXT,
+        privacy_mode TEXT DEFAULT 'normal'
+    );
+    """,
+    # events
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        event_id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        payload_json TEXT NOT NULL
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_type ON events(type);",
+    "CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at);",
+    # agent decisions
+    """
+    CREATE TABLE IF NOT EXISTS agent_decisions (
+        decision_id TEXT PRIMARY KEY,
+        created_at TEXT NOT NULL DEFAULT (datetime('now')),
+        agent TEXT NOT NULL,
+        workspace TEXT,
+        tool_name TEXT NOT NULL,
+        args_json TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        executed INTEGER NOT NULL DEFAULT 0,
+        execution_result TEXT,
+        blocked_by_privacy INTEGER NOT NULL DEFAULT 0
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_decisions_created ON agent_decisions(created_at);",
+    "CREATE INDEX IF NOT EXISTS idx_decisions_tool ON agent_decisions(tool_name);",
+    # user controls (privacy + learning)
+    """
+    CREATE TABLE IF NOT EXISTS user_controls (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    """,
+]
+
+# Integer epoch timestamps, (type, time) indexes, daily aggregates for retention.
+_MIGRATION_002_RETENTION = [
+    "ALTER TABLE events ADD COLUMN created_ts INTEGER;",
+    "UPDATE events SET created_ts = CAST(strftime('%s', created_at) AS INTEGER);",
+    "ALTER TABLE agent_decisions ADD COLUMN created_ts INTEGER;",
+    "UPDATE agent_decisions SET created_ts = CAST(strftime('%s', created_at) AS INTEGER);",
+    # Rows inserted without created_ts get it from created_at.
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_events_created_ts AFTER INSERT ON events
+    WHEN NEW.created_ts IS NULL BEGIN
+        UPDATE events SET created_ts = CAST(strftime('%s', NEW.created_at) AS INTEGER)
+        WHERE rowid = NEW.rowid;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_created_ts AFTER INSERT ON agent_decisions
+    WHEN NEW.created_ts IS NULL BEGIN
+        UPDATE agent_decisions SET created_ts = CAST(strftime('%s', NEW.created_at) AS INTEGER)
+        WHERE rowid = NEW.rowid;
+    END;
+    """,
+    "DROP INDEX IF EXISTS idx_events_type;",
+    "DROP INDEX IF EXISTS idx_events_created;",
+    "CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events(type, created_ts);",
+    "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(created_ts);",
+    "DROP INDEX IF EXISTS idx_decisions_created;",
+    "DROP INDEX IF EXISTS idx_decisions_tool;",
+    "CREATE INDEX IF NOT EXISTS idx_decisions_tool_ts ON agent_decisions(tool_name, created_ts);",
+    "CREATE INDEX IF NOT EXISTS idx_decisions_ts ON agent_decisions(created_ts);",
+    """
+    CREATE TABLE IF NOT EXISTS event_daily (
+        day TEXT NOT NULL,
+        type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (day, type, source)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS decision_daily (
+        day TEXT NOT NULL,
+        tool_name TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        executed INTEGER NOT NULL,
+        blocked INTEGER NOT NULL,
+        PRIMARY KEY (day, tool_name)
+    ) WITHOUT ROWID;
+    """,
+]
+
+# FTS5 indexes over event payloads and decision reasons, kept in sync by
+# triggers (external-content tables, no text duplication).
+_MIGRATION_003_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+        type, payload_json, content='events', tokenize='porter unicode61'
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_events_fts_ai AFTER INSERT ON events BEGIN
+        INSERT INTO events_fts(rowid, type, payload_json)
+        VALUES (NEW.rowid, NEW.type, NEW.payload_json);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_events_fts_ad AFTER DELETE ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, type, payload_json)
+        VALUES ('delete', OLD.rowid, OLD.type, OLD.payload_json);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_events_fts_au AFTER UPDATE OF type, payload_json ON events BEGIN
+        INSERT INTO events_fts(events_fts, rowid, type, payload_json)
+        VALUES ('delete', OLD.rowid, OLD.type, OLD.payload_json);
+        INSERT INTO events_fts(rowid, type, payload_json)
+        VALUES (NEW.rowid, NEW.type, NEW.payload_json);
+    END;
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS decisions_fts USING fts5(
+        tool_name, reason, content='agent_decisions', tokenize='porter unicode61'
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_fts_ai AFTER INSERT ON agent_decisions BEGIN
+        INSERT INTO decisions_fts(rowid, tool_name, reason)
+        VALUES (NEW.rowid, NEW.tool_name, NEW.reason);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_fts_ad AFTER DELETE ON agent_decisions BEGIN
+        INSERT INTO decisions_fts(decisions_fts, rowid, tool_name, reason)
+        VALUES ('delete', OLD.rowid, OLD.tool_name, OLD.reason);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_fts_au AFTER UPDATE OF tool_name, reason ON agent_decisions BEGIN
+        INSERT INTO decisions_fts(decisions_fts, rowid, tool_name, reason)
+        VALUES ('delete', OLD.rowid, OLD.tool_name, OLD.reason);
+        INSERT INTO decisions_fts(rowid, tool_name, reason)
+        VALUES (NEW.rowid, NEW.tool_name, NEW.reason);
+    END;
+    """,
+    "INSERT INTO events_fts(events_fts) VALUES ('rebuild');",
+    "INSERT INTO decisions_fts(decisions_fts) VALUES ('rebuild');",
+]
+
+# Long-term memories and the user profile, formerly a separate etherea.db.
+_MIGRATION_004_MEMORIES = [
+    """
+    CREATE TABLE IF NOT EXISTS memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        content TEXT NOT NULL,
+        type TEXT DEFAULT 'general',
+        embedding BLOB,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_profile (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS db_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """,
+    "INSERT OR IGNORE INTO db_meta (key, value) VALUES ('instance_token', abs(random()));",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+        content, type, content='memories', content_rowid='id', tokenize='porter unicode61'
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memories_fts_ai AFTER INSERT ON memories BEGIN
+        INSERT INTO memories_fts(rowid, content, type) VALUES (NEW.id, NEW.content, NEW.type);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memories_fts_ad AFTER DELETE ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, content, type)
+        VALUES ('delete', OLD.id, OLD.content, OLD.type);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_memories_fts_au AFTER UPDATE OF content, type ON memories BEGIN
+        INSERT INTO memories_fts(memories_fts, rowid, content, type)
+        VALUES ('delete', OLD.id, OLD.content, OLD.type);
+        INSERT INTO memories_fts(rowid, content, type) VALUES (NEW.id, NEW.content, NEW.type);
+    END;
+    """,
+    "INSERT INTO memories_fts(memories_fts) VALUES ('rebuild');",
+]
+
+# Hourly rollups for analytics, maintained by triggers as rows are written.
+# Buckets are UTC epoch hours. Deletions (retention) leave them untouched;
+# the backfill places rows already compacted into *_daily at the day's
+# first hour.
+_ROW_HOUR = "(COALESCE(NEW.created_ts, CAST(strftime('%s', NEW.created_at) AS INTEGER)) / 3600) * 3600"
+
+_MIGRATION_006_ROLLUPS = [
+    """
+    CREATE TABLE IF NOT EXISTS event_hourly (
+        hour INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        source TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (hour, type, source)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS decision_hourly (
+        hour INTEGER NOT NULL,
+        workspace TEXT NOT NULL,
+        tool_name TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        executed INTEGER NOT NULL,
+        blocked INTEGER NOT NULL,
+        PRIMARY KEY (hour, workspace, tool_name)
+    ) WITHOUT ROWID;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_events_rollup_ai AFTER INSERT ON events BEGIN
+        INSERT INTO event_hourly(hour, type, source, count)
+        VALUES ({_ROW_HOUR}, NEW.type, NEW.source, 1)
+        ON CONFLICT(hour, type, source) DO UPDATE SET count = count + 1;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_rollup_ai AFTER INSERT ON agent_decisions BEGIN
+        INSERT INTO decision_hourly(hour, workspace, tool_name, total, executed, blocked)
+        VALUES ({_ROW_HOUR}, COALESCE(NEW.workspace, ''), NEW.tool_name, 1,
+                NEW.executed != 0, NEW.blocked_by_privacy != 0)
+        ON CONFLICT(hour, workspace, tool_name) DO UPDATE SET
+            total = total + 1,
+            executed = executed + excluded.executed,
+            blocked = blocked + excluded.blocked;
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_decisions_rollup_au
+    AFTER UPDATE OF executed, blocked_by_privacy ON agent_decisions BEGIN
+        UPDATE decision_hourly SET
+            executed = executed + (NEW.executed != 0) - (OLD.executed != 0),
+            blocked = blocked + (NEW.blocked_by_privacy != 0) - (OLD.blocked_by_privacy != 0)
+        WHERE hour = {_ROW_HOUR}
+          AND workspace = COALESCE(NEW.workspace, '') AND tool_name = NEW.tool_name;
+    END;
+    """,
+    """
+    INSERT INTO event_hourly(hour, type, source, count)
+    SELECT hour, type, source, SUM(n) FROM (
+        SELECT (created_ts / 3600) * 3600 AS hour, type, source, COUNT(*) AS n
+        FROM events WHERE created_ts IS NOT NULL GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT CAST(strftime('%s', day) AS INTEGER), type, source, count FROM event_daily
+    ) GROUP BY 1, 2, 3;
+    """,
+    """
+    INSERT INTO decision_hourly(hour, workspace, tool_name, total, executed, blocked)
+    SELECT hour, workspace, tool_name, SUM(total), SUM(executed), SUM(blocked) FROM (
+        SELECT (created_ts / 3600) * 3600 AS hour, COALESCE(workspace, '') AS workspace, tool_name,
+               COUNT(*) AS total, SUM(executed != 0) AS executed, SUM(blocked_by_privacy != 0) AS blocked
+        FROM agent_decisions WHERE created_ts IS NOT NULL GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT CAST(strftime('%s', day) AS INTEGER), '', tool_name, total, executed, blocked FROM decision_daily
+    ) GROUP BY 1, 2, 3;
+    """,
+]
+
+# Memory consolidation: per-memory salience (merged duplicates, recalls),
+# cluster centroids, and an archive for merged or stale memories.
+_MIGRATION_007_MEMORY_CONSOLIDATION = [
+    "ALTER TABLE memories ADD COLUMN weight INTEGER NOT NULL DEFAULT 1;",
+    "ALTER TABLE memories ADD COLUMN hits INTEGER NOT NULL DEFAULT 0;",
+    "ALTER TABLE memories ADD COLUMN last_hit_ts INTEGER;",
+    "ALTER TABLE memories ADD COLUMN cluster_id INTEGER;",
+    """
+    CREATE TABLE IF NOT EXISTS memory_clusters (
+        cluster_id INTEGER PRIMARY KEY,
+        centroid BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        seen INTEGER NOT NULL,
+        representative_id INTEGER
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS memories_archive (
+        id INTEGER PRIMARY KEY,
+        content TEXT NOT NULL,
+        type TEXT,
+        embedding BLOB,
+        created_at DATETIME,
+        weight INTEGER NOT NULL,
+        hits INTEGER NOT NULL,
+        cluster_id INTEGER,
+        reason TEXT NOT NULL,
+        merged_into INTEGER,
+        archived_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    """,
+]
+
+# Change counter for user_profile alone, so preference caches can tell
+# profile writes apart from the rest of the database's traffic.
+_MIGRATION_008_PROFILE_VERSION = [
+    "INSERT OR IGNORE INTO db_meta (key, value) VALUES ('profile_version', 0);",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_user_profile_version_{suffix} AFTER {op} ON user_profile BEGIN
+        UPDATE db_meta SET value = value + 1 WHERE key = 'profile_version';
+    END;
+    """
+    for suffix, op in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+]
+
+# Reference counts of the content-addressed blob store (corund.blob_store),
+# kept here so they commit together with the rows that hold the references.
+_MIGRATION_009_BLOBS = [
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    );
+    """,
+]
+
+MIGRATIONS: List[Tuple[str, List[str]]] = [
+    ("001_core_tables", _MIGRATION_001_CORE_TABLES),
+    ("002_retention", _MIGRATION_002_RETENTION),
+    ("003_fts", _MIGRATION_003_FTS),
+    ("004_memories", _MIGRATION_004_MEMORIES),
+    # 005 is the one-time legacy import (`_import_legacy`).
+    ("006_rollups", _MIGRATION_006_ROLLUPS),
+    ("007_memory_consolidation", _MIGRATION_007_MEMORY_CONSOLIDATION),
+    ("008_profile_version", _MIGRATION_008_PROFILE_VERSION),
+    ("009_blobs", _MIGRATION_009_BLOBS),
+]
 
 
 def _exec_many(conn: sqlite3.Connection, stmts: Iterable[str]) -> None:
@@ -41,77 +758,223 @@ def _exec_many(conn: sqlite3.Connection, stmts: Iterable[str]) -> None:
     cur.close()
 
 
-def migrate() -> None:
+def _apply_migrations(conn: sqlite3.Connection, legacy_path: Path | None = None) -> None:
     """
     Idempotent migrations. Safe to call on every startup.
+
+    `legacy_path` names a pre-engine `etherea.db` whose memories and
+    profile are imported once.
     """
-    with _DB_LOCK:
-        conn = connect()
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "  id INTEGER PRIMARY KEY,"
+        "  name TEXT UNIQUE NOT NULL,"
+        "  applied_at TEXT DEFAULT (datetime('now'))"
+        ");"
+    )
+    applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+    for name, stmts in MIGRATIONS:
+        if name in applied:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            conn.execute(
-                "CREATE TABLE IF NOT EXISTS schema_migrations ("
-                "  id INTEGER PRIMARY KEY,"
-                "  name TEXT UNIQUE NOT NULL,"
-                "  applied_at TEXT DEFAULT (datetime('now'))"
-                ");"
-            )
+            _exec_many(conn, stmts)
+            conn.execute("INSERT INTO schema_migrations(name) VALUES (?)", (name,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if legacy_path is not None and "005_import_etherea_db" not in applied:
+        _import_legacy(conn, legacy_path)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # Switching an existing database to incremental mode needs one full VACUUM.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        conn.execute("VACUUM;")
 
-            # Migration 001: sessions/events/decisions/user_controls
-            conn.execute(
-                "INSERT OR IGNORE INTO schema_migrations(name) VALUES ('001_core_tables');"
-            )
 
-            _exec_many(
-                conn,
-                [
-                    # sessions
-                    """
-                    CREATE TABLE IF NOT EXISTS sessions (
-                        session_id TEXT PRIMARY KEY,
-                        started_at TEXT NOT NULL DEFAULT (datetime('now')),
-                        ended_at   TEXT,
-                        workspace  TEXT,
-                        privacy_mode TEXT DEFAULT 'normal'
-                    );
-                    """,
-                    # events
-                    """
-                    CREATE TABLE IF NOT EXISTS events (
-                        event_id TEXT PRIMARY KEY,
-                        type TEXT NOT NULL,
-                        source TEXT NOT NULL,
-                        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                        payload_json TEXT NOT NULL
-                    );
-                    """,
-                    "CREATE INDEX IF NOT EXISTS idx_events_type ON events(type);",
-                    "CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at);",
-                    # agent decisions
-                    """
-                    CREATE TABLE IF NOT EXISTS agent_decisions (
-                        decision_id TEXT PRIMARY KEY,
-                        created_at TEXT NOT NULL DEFAULT (datetime('now')),
-                        agent TEXT NOT NULL,
-                        workspace TEXT,
-                        tool_name TEXT NOT NULL,
-                        args_json TEXT NOT NULL,
-                        reason TEXT NOT NULL,
-                        executed INTEGER NOT NULL DEFAULT 0,
-                        execution_result TEXT,
-                        blocked_by_privacy INTEGER NOT NULL DEFAULT 0
-                    );
-                    """,
-                    "CREATE INDEX IF NOT EXISTS idx_decisions_created ON agent_decisions(created_at);",
-                    "CREATE INDEX IF NOT EXISTS idx_decisions_tool ON agent_decisions(tool_name);",
-                    # user controls (privacy + learning)
-                    """
-                    CREATE TABLE IF NOT EXISTS user_controls (
-                        key TEXT PRIMARY KEY,
-                        value TEXT NOT NULL,
-                        updated_at TEXT NOT NULL DEFAULT (datetime('now'))
-                    );
-                    """,
-                ],
-            )
+def _import_legacy(conn: sqlite3.Connection, legacy_path: Path) -> None:
+    if legacy_path.exists():
+        conn.execute("ATTACH DATABASE ? AS legacy", (str(legacy_path),))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if legacy_path.exists():
+                tables = {row[0] for row in conn.execute("SELECT name FROM legacy.sqlite_master WHERE type = 'table'")}
+                if "memories" in tables:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO memories (id, content, type, embedding, created_at) "
+                        "SELECT id, content, type, embedding, created_at FROM legacy.memories ORDER BY id"
+                    )
+                if "user_profile" in tables:
+                    conn.execute("INSERT OR IGNORE INTO user_profile (key, value) SELECT key, value FROM legacy.user_profile")
+            conn.execute("INSERT INTO schema_migrations(name) VALUES ('005_import_etherea_db')")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        if legacy_path.exists():
+            conn.execute("DETACH DATABASE legacy")
+
+
+class StorageEngine:
+    """
+    One SQLite file behind one writer thread and a pool of read-only connections.
+
+    Reads borrow from `reader` (`read()`); writes are serialized through
+    `writer`, either synchronously (`execute()`/`write()`, which return once
+    committed) or write-behind (`submit()`, made durable by `flush()`).
+    Migrations run once when the engine is created.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        read_pool_size: int = POOL_SIZE,
+        max_batch: int = 256,
+        max_latency: float = 0.05,
+        max_pending: int = 10_000,
+        legacy_path: Path | None = None,
+    ) -> None:
+        self.path = Path(path)
+        conn = _open(self.path)
+        try:
+            _apply_migrations(conn, legacy_path)
         finally:
             conn.close()
+        self.reader = ConnectionPool(self.path, read_pool_size, readonly=True)
+        self.writer = BatchWriter(self.path, max_batch=max_batch, max_latency=max_latency, max_pending=max_pending)
+
+    def read(self, timeout: float | None = 30.0):
+        """Borrow a read-only connection for the duration of a `with` block."""
+        return self.reader.connection(timeout)
+
+    def write(self, fn: Callable[[sqlite3.Connection], Any], timeout: float | None = None) -> Any:
+        """Run `fn(conn)` on the writer thread in a transaction and return its result."""
+        return self.writer.call(fn).result(timeout)
+
+    def execute(self, sql: str, params: tuple = (), timeout: float | None = None) -> int:
+        """Execute one statement on the writer; returns its lastrowid."""
+        return self.write(lambda conn: conn.execute(sql, params).lastrowid, timeout)
+
+    def submit(self, sql: str, params: tuple = (), timeout: float | None = None) -> None:
+        """Queue a statement without waiting for it (see `BatchWriter`)."""
+        self.writer.submit(sql, params, timeout)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return self.writer.flush(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"reads": self.reader.stats(), "writes": self.writer.stats()}
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.closed
+
+    def close(self, timeout: float | None = None) -> None:
+        self.writer.close(timeout)
+        self.reader.close()
+
+
+_ENGINE: StorageEngine | None = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_engine() -> StorageEngine:
+    """The shared engine for `db_path()`; a new one is created if the path changed."""
+    global _ENGINE
+    path = db_path()
+    with _ENGINE_LOCK:
+        if _ENGINE is None or _ENGINE.path != path or _ENGINE.closed:
+            legacy = path.with_name("etherea.db")
+            _ENGINE = StorageEngine(path, legacy_path=legacy if legacy != path else None)
+        return _ENGINE
+
+
+def get_pool() -> ConnectionPool:
+    return get_engine().reader
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats()
+
+
+@contextmanager
+def connection(timeout: float | None = 30.0) -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled read-only connection to the main database."""
+    with get_engine().read(timeout) as conn:
+        yield conn
+
+
+def write(fn: Callable[[sqlite3.Connection], Any], timeout: float | None = None) -> Any:
+    return get_engine().write(fn, timeout)
+
+
+def execute(sql: str, params: tuple = (), timeout: float | None = None) -> int:
+    return get_engine().execute(sql, params, timeout)
+
+
+def migrate() -> None:
+    """Create the shared engine, applying any pending migrations."""
+    get_engine()
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word is quoted (so FTS syntax
+    characters are inert) and terms are OR-ed, leaving ranking to bm25.
+    """
+    return " OR ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def search_text(
+    query: str,
+    *,
+    kinds: Iterable[str] = ("events", "decisions"),
+    since: float | None = None,
+    limit: int = 20,
+) -> list[Dict[str, Any]]:
+    """
+    Ranked full-text hits over event payloads and decision reasons.
+
+    Returns dicts with kind, id, type, snippet, rank (bm25, lower is
+    better) and created_ts, best first.
+    """
+    match = fts_query(query)
+    if not match:
+        return []
+    since_ts = int(since) if since is not None else 0
+    hits: list[Dict[str, Any]] = []
+    with connection() as conn:
+        if "events" in kinds:
+            rows = conn.execute(
+                """
+                SELECT e.event_id, e.type, snippet(events_fts, 1, '[', ']', '…', 12), bm25(events_fts), e.created_ts
+                FROM events_fts JOIN events e ON e.rowid = events_fts.rowid
+                WHERE events_fts MATCH ? AND e.created_ts >= ?
+                ORDER BY bm25(events_fts) LIMIT ?
+                """,
+                (match, since_ts, limit),
+            )
+            hits += [
+                {"kind": "events", "id": r[0], "type": r[1], "snippet": r[2], "rank": r[3], "created_ts": r[4]}
+                for r in rows
+            ]
+        if "decisions" in kinds:
+            rows = conn.execute(
+                """
+                SELECT d.decision_id, d.tool_name, snippet(decisions_fts, 1, '[', ']', '…', 12),
+                       bm25(decisions_fts), d.created_ts
+                FROM decisions_fts JOIN agent_decisions d ON d.rowid = decisions_fts.rowid
+                WHERE decisions_fts MATCH ? AND d.created_ts >= ?
+                ORDER BY bm25(decisions_fts) LIMIT ?
+                """,
+                (match, since_ts, limit),
+            )
+            hits += [
+                {"kind": "decisions", "id": r[0], "type": r[1], "snippet": r[2], "rank": r[3], "created_ts": r[4]}
+                for r in rows
+            ]
+    hits.sort(key=lambda hit: hit["rank"])
+    return hits[:limit]
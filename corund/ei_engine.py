@@ -4,13 +4,36 @@ import logging
 import math
 from typing import Dict
 from corund.signals import signals
+from corund.state_store import get_store
 
 logger = logging.getLogger("etherea_internal")
 logger.setLevel(logging.WARNING)
 
+# Drift per second while idle.
+STRESS_DRIFT = -0.05
+FOCUS_DRIFT = -0.02
+ENERGY_DRIFT = 0.01
+FLOW_DRIFT = -0.01
+# While focus > 0.8 stress also decays exponentially at this rate (1/s);
+# matches the former 0.9 factor applied on every 50 ms tick.
+FOCUS_SHIELD_RATE = 20.0 * math.log(1.0 / 0.9)
+FOCUS_SHIELD_LEVEL = 0.8
+
 
 class EIEngine:
-    def __init__(self):
+    """
+    Emotional-intelligence state driven by input activity.
+
+    Idle decay is applied analytically from the elapsed time whenever the
+    state is touched (`_advance`), so nothing needs to poll. The background
+    thread sleeps until an input event wakes it or until decay can next
+    move a value by `emit_threshold`, running at most one pass per
+    `min_interval` however fast input arrives; it emits `signals.emotion_updated`
+    only when a value moved at least that far from the last emission (or
+    the state came to rest), and sleeps indefinitely once nothing drifts.
+    """
+
+    def __init__(self, emit_threshold: float = 0.02, min_interval: float = 0.05):
         self.emotion_vector: Dict[str, float] = {
             "focus": 0.5,
             "stress": 0.2,
@@ -24,11 +47,17 @@ class EIEngine:
             "typing_rhythm": 0.5,
             "physical_jitter": 0.0,
         }
-        self.last_update = time.time()
+        self.last_update = time.monotonic()
         self.running = False
         self._lock = threading.Lock()
         self._thread = None
         self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self.emit_threshold = emit_threshold
+        self.min_interval = min_interval
+        self._last_emitted: Dict[str, float] | None = None
+        self.wakeups = 0
+        self.emissions = 0
         self.last_proactive_trigger = 0.0
         self.trigger_cooldown = 120.0
 
@@ -36,6 +65,7 @@ class EIEngine:
         self.last_save_time = 0.0
         self.save_interval = 30.0
         self.last_saved_stress = 0.0
+        self._last_saved: Dict[str, float] | None = None
 
         try:
             if hasattr(signals, "input_activity"):
@@ -53,8 +83,57 @@ class EIEngine:
         except Exception:
             return 0.5
 
+    # --- Decay ---
+
+    def _advance(self, now: float | None = None) -> None:
+        """Apply idle decay for the time since the last call (lock held)."""
+        now = time.monotonic() if now is None else now
+        dt = max(0.0, now - self.last_update)
+        self.last_update = now
+        if dt == 0.0:
+            return
+        ev = self.emotion_vector
+        stress = ev["stress"]
+        # Time spent above the focus-shield level, given the linear focus drift.
+        shielded = min(dt, (ev["focus"] - FOCUS_SHIELD_LEVEL) / -FOCUS_DRIFT) if ev["focus"] > FOCUS_SHIELD_LEVEL else 0.0
+        if shielded > 0.0:
+            # ds/dt = STRESS_DRIFT - k * s  =>  s(t) = (s0 + c) e^(-kt) - c
+            c = -STRESS_DRIFT / FOCUS_SHIELD_RATE
+            stress = (stress + c) * math.exp(-FOCUS_SHIELD_RATE * shielded) - c
+            if stress < 0.1:
+                stress = 0.0
+        ev["stress"] = self._clamp(stress + STRESS_DRIFT * (dt - shielded))
+        ev["focus"] = self._clamp(ev["focus"] + FOCUS_DRIFT * dt)
+        ev["energy"] = self._clamp(ev["energy"] + ENERGY_DRIFT * dt)
+        self.sub_states["flow_intensity"] = self._clamp(self.sub_states["flow_intensity"] + FLOW_DRIFT * dt)
+        ev["flow"] = self.sub_states["flow_intensity"]
+
+    def _next_wake(self) -> float | None:
+        """Seconds until decay can move a value by `emit_threshold`; None when at rest."""
+        ev = self.emotion_vector
+        rates = []
+        if ev["stress"] > 0.0:
+            shield = FOCUS_SHIELD_RATE * ev["stress"] if ev["focus"] > FOCUS_SHIELD_LEVEL else 0.0
+            rates.append(-STRESS_DRIFT + shield)
+        if ev["focus"] > 0.0:
+            rates.append(-FOCUS_DRIFT)
+        if ev["energy"] < 1.0:
+            rates.append(ENERGY_DRIFT)
+        if self.sub_states["flow_intensity"] > 0.0:
+            rates.append(-FLOW_DRIFT)
+        if not rates:
+            return None
+        return max(self.min_interval, self.emit_threshold / max(rates))
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current emotion vector with decay applied up to now."""
+        with self._lock:
+            self._advance()
+            return self.emotion_vector.copy()
+
     def on_input_activity(self, activity_type: str, payload):
         with self._lock:
+            self._advance()
             intensity = 0.0
             jitter = 0.0
             variance = 0.0
@@ -93,6 +172,7 @@ class EIEngine:
 
             for k in self.emotion_vector:
                 self.emotion_vector[k] = self._clamp(self.emotion_vector[k])
+        self._wake.set()
 
     def start(self):
         if self.running:
@@ -105,46 +185,65 @@ class EIEngine:
     def stop(self):
         self.running = False
         self._stop_event.set()
+        self._wake.set()
         if self._thread:
             self._thread.join(1.0)
 
+    def _changed_since(self, previous: Dict[str, float] | None) -> float:
+        if previous is None:
+            return math.inf
+        return max(abs(value - previous[key]) for key, value in self.emotion_vector.items())
+
     def _loop(self):
+        last_pass = -math.inf
         while not self._stop_event.is_set():
-            now = time.time()
-            dt = max(0.0, min(now - self.last_update, 1.0))
-            self.last_update = now
+            # Passes are at least `min_interval` apart; wakes arriving in
+            # between are merged into the next pass.
+            delay = last_pass + self.min_interval - time.monotonic()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            self._wake.clear()
+            last_pass = time.monotonic()
+            self.wakeups += 1
+            emit = save = None
             with self._lock:
-                self.emotion_vector["stress"] -= 0.05 * dt
-                self.emotion_vector["focus"] -= 0.02 * dt
-                self.emotion_vector["energy"] += 0.01 * dt
-                self.sub_states["flow_intensity"] = self._clamp(
-                    self.sub_states["flow_intensity"] - 0.01 * dt)
-                self.emotion_vector["flow"] = self.sub_states["flow_intensity"]
-
-                if self.emotion_vector["focus"] > 0.8:
-                    self.emotion_vector["stress"] *= 0.9
-                    if self.emotion_vector["stress"] < 0.1:
-                        self.emotion_vector["stress"] = 0.0
+                self._advance()
+                timeout = self._next_wake()
+                moved = self._changed_since(self._last_emitted)
+                if moved >= self.emit_threshold or (moved > 0.0 and timeout is None):
+                    emit = self.emotion_vector.copy()
+                    self._last_emitted = emit
 
-                for k in self.emotion_vector:
-                    self.emotion_vector[k] = self._clamp(self.emotion_vector[k])
+                now = time.time()
+                stress_diff = abs(self.emotion_vector["stress"] - self.last_saved_stress)
+                if stress_diff > 0.15 or (
+                    now - self.last_save_time > self.save_interval and self._changed_since(self._last_saved) > 0.0
+                ):
+                    save = self.emotion_vector.copy()
+                    self._last_saved = save
+                    self.last_save_time = now
+                    self.last_saved_stress = save["stress"]
 
-                try:
-                    current_stress = self.emotion_vector["stress"]
-                    stress_diff = abs(current_stress - self.last_saved_stress)
-                    if (now - self.last_save_time > self.save_interval) or (stress_diff > 0.15):
-                        from corund.database import db
+                trigger_wait = self._check_triggers(now)
+                if trigger_wait is not None:
+                    timeout = trigger_wait if timeout is None else min(timeout, trigger_wait)
 
-                        db.set_preference("last_emotion", str(self.emotion_vector))
-                        self.last_save_time = now
-                        self.last_saved_stress = current_stress
+            try:
+                if save is not None:
+                    from corund.database import db
 
-                    signals.emotion_updated.emit(self.emotion_vector.copy())
-                except Exception:
-                    pass
+                    db.set_preference("last_emotion", str(save))
+                if emit is not None:
+                    self.emissions += 1
+                    get_store().update("emotion", **emit)
+                    signals.emotion_updated.emit(emit.copy())
+            except Exception:
+                pass
 
-                self._check_triggers(now)
-            time.sleep(0.05)
+            if timeout is None and self._last_saved != self.emotion_vector:
+                # At rest but not persisted yet: come back once the save interval allows it.
+                timeout = max(self.min_interval, self.save_interval - (time.time() - self.last_save_time))
+            self._wake.wait(timeout)
 
     def on_pattern_detected(self, patterns: dict):
         with self._lock:
@@ -181,16 +280,24 @@ class EIEngine:
             # Normalize state without advice (Manifest Rule)
             for k in self.emotion_vector:
                 self.emotion_vector[k] = self._clamp(self.emotion_vector[k])
+        self._wake.set()
 
-    def _check_triggers(self, now):
-        if now - self.last_proactive_trigger < self.trigger_cooldown:
-            return
-        if self.emotion_vector["stress"] > 0.85:
-            signals.proactive_trigger.emit("stress_relief")
-            self.last_proactive_trigger = now
-        elif self.emotion_vector["focus"] > 0.9:
-            signals.proactive_trigger.emit("focus_shield_active")
-            self.last_proactive_trigger = now
+    def _check_triggers(self, now) -> float | None:
+        """Fire a proactive trigger if due; returns seconds until one could fire again."""
+        if self.emotion_vector["stress"] <= 0.85 and self.emotion_vector["focus"] <= 0.9:
+            return None
+        remaining = self.trigger_cooldown - (now - self.last_proactive_trigger)
+        if remaining > 0:
+            return remaining
+        try:
+            if self.emotion_vector["stress"] > 0.85:
+                signals.proactive_trigger.emit("stress_relief")
+            else:
+                signals.proactive_trigger.emit("focus_shield_active")
+        except Exception:
+            pass
+        self.last_proactive_trigger = now
+        return self.trigger_cooldown
 
 
     def update_from_activity(self, keyboard_stats: dict | None = None, mouse_stats: dict | None = None) -> Dict[str, float]:
@@ -209,12 +316,15 @@ class EIEngine:
         self.on_input_activity("mouse", {"intensity": mouse_intensity, "jitter": mouse_jitter})
 
         with self._lock:
+            self._advance()
             # Heuristic stabilization for deterministic desktop behavior.
             pressure = (0.55 * mouse_jitter) + (0.25 * mouse_intensity) + (0.20 * max(0.0, key_intensity - 0.7))
             flow_support = max(0.0, key_intensity - key_variance)
             self.emotion_vector["stress"] = self._clamp(self.emotion_vector["stress"] + (pressure * 0.12) - (flow_support * 0.05))
             self.emotion_vector["focus"] = self._clamp(self.emotion_vector["focus"] + (flow_support * 0.09) - (mouse_jitter * 0.05))
-            return self.emotion_vector.copy()
+            snapshot = self.emotion_vector.copy()
+        self._wake.set()
+        return snapshot
 
     def tick(self, mood: str | None = None) -> Dict[str, float]:
         """
@@ -223,6 +333,7 @@ class EIEngine:
         now = time.localtime()
         hour = now.tm_hour
         with self._lock:
+            self._advance()
             # Circadian modulation
             if hour < 6 or hour >= 22:
                 self.emotion_vector["energy"] = self._clamp(self.emotion_vector["energy"] - 0.04)
@@ -242,4 +353,6 @@ class EIEngine:
                 self.emotion_vector["focus"] = self._clamp(self.emotion_vector["focus"] + 0.06)
                 self.emotion_vector["flow"] = self._clamp(self.emotion_vector.get("flow", 0.0) + 0.05)
 
-            return self.emotion_vector.copy()
+            snapshot = self.emotion_vector.copy()
+        self._wake.set()
+        return snapshot
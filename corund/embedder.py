@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import zlib
+from typing import Iterable, List, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # optional on Termux/CI
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder: hashed TF-IDF over words, word bigrams
+    and character n-grams.
+
+    Every feature is hashed (CRC32, stable across processes) into one of
+    `dim` signed buckets, so there is no vocabulary to grow and the cost of
+    a text is linear in its length. Term frequencies are dampened with
+    `log1p` and weighted by a smoothed IDF over the buckets; document
+    frequencies are updated by `embed(..., learn=True)` and can be saved
+    next to the database. Character n-grams (with word boundary markers)
+    make misspellings and inflections land close together. The features of
+    each distinct word are cached, up to `cache_size` words.
+    """
+
+    def __init__(
+        self,
+        dim: int = 512,
+        *,
+        char_ngrams: Tuple[int, int] = (3, 5),
+        cache_size: int = 50_000,
+        save_every: int = 256,
+    ) -> None:
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+        self.cache_size = cache_size
+        self.save_every = save_every
+        self.df = np.zeros(dim, dtype=np.float64)
+        self.docs = 0
+        self._saved_docs = 0
+        self._cache: dict = {}
+        self._lock = threading.Lock()
+
+    # --- Features ---
+
+    def _hash(self, features: Iterable[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32)
+        index = (hashes % self.dim).astype(np.int64)
+        sign = np.where(hashes & 0x80000000, -1.0, 1.0)
+        return index, sign
+
+    def _word(self, word: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        cached = self._cache.get(word)
+        if cached is None:
+            lo, hi = self.char_ngrams
+            marked = f"<{word}>"
+            grams = [marked[i : i + n] for n in range(lo, hi + 1) for i in range(len(marked) - n + 1)]
+            cached = self._hash(["w:" + word, *("c:" + g for g in grams)])
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[word] = cached
+        return cached
+
+    def _features(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        words = _WORD.findall(text.lower())
+        parts = [self._word(word) for word in words]
+        if len(words) > 1:
+            parts.append(self._hash(f"b:{a} {b}" for a, b in zip(words, words[1:])))
+        if not parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    # --- Embedding ---
+
+    def idf(self):
+        return np.log((1.0 + self.docs) / (1.0 + self.df)) + 1.0
+
+    def embed_batch(self, texts: Iterable[str], *, learn: bool = False):
+        """
+        Unit-length float32 embeddings, one row per text (empty texts give
+        zero rows). With `learn`, the texts first update the document
+        frequencies, as for documents being stored; leave it off for queries.
+        """
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float64)
+        with self._lock:
+            rows: List["np.ndarray"] = []
+            indices: List["np.ndarray"] = []
+            signs: List["np.ndarray"] = []
+            for row, text in enumerate(texts):
+                index, sign = self._features(text or "")
+                rows.append(np.full(len(index), row, dtype=np.int64))
+                indices.append(index)
+                signs.append(sign)
+            if texts:
+                np.add.at(out, (np.concatenate(rows), np.concatenate(indices)), np.concatenate(signs))
+            if learn:
+                self.df += np.count_nonzero(out, axis=0)
+                self.docs += len(texts)
+            idf = self.idf()
+        out = np.sign(out) * np.log1p(np.abs(out)) * idf
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return (out / np.where(norms > 0, norms, 1.0)).astype(np.float32)
+
+    def embed(self, text: str, *, learn: bool = False):
+        """Embedding of one text (see `embed_batch`)."""
+        return self.embed_batch([text], learn=learn)[0]
+
+    # --- Persistence ---
+
+    @property
+    def needs_save(self) -> bool:
+        return self.docs - self._saved_docs >= self.save_every
+
+    def save(self, path: str) -> None:
+        """Write document frequencies to `path` atomically."""
+        with self._lock:
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as handle:
+                np.savez(handle, df=self.df, docs=np.int64(self.docs), dim=np.int64(self.dim))
+            os.replace(tmp, path)
+            self._saved_docs = self.docs
+
+    def load(self, path: str) -> bool:
+        """Restore saved document frequencies; False if missing or for another `dim`."""
+        try:
+            with np.load(path) as data:
+                df, docs, dim = data["df"], int(data["docs"]), int(data["dim"])
+        except (OSError, KeyError, ValueError):
+            return False
+        if dim != self.dim or df.shape != (self.dim,):
+            return False
+        with self._lock:
+            self.df, self.docs, self._saved_docs = df.astype(np.float64), docs, docs
+        return True
@@ -1,41 +1,324 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
-from typing import Any, Callable, Coroutine, DefaultDict, List
+import concurrent.futures
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from itertools import count
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Pattern, Tuple
 
 from corund.event_model import Event
 
+logger = logging.getLogger("etherea.event_bus")
+
 # Define a listener type that can be a regular function or a coroutine
 Listener = Callable[[Event], Coroutine[Any, Any, None] | None]
 
+# Overflow policies for the queued dispatch mode.
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+BLOCK = "block"
+OVERFLOW_POLICIES = {DROP_OLDEST, COALESCE, BLOCK}
+
+# Upper bounds (ms) of the per-listener latency histogram buckets.
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, float("inf"))
+SLOW_LISTENER_EVENT = "bus.slow_listener"
+
+
+def compile_pattern(pattern: str) -> Pattern[str] | None:
+    """
+    Compile a subscription pattern into a regex, or return None for exact types.
+
+    `*` matches any run of characters inside one dotted segment
+    (`state.*.changed`, `OS_ACTION_*`); `**` also crosses dots (`state.**`).
+    """
+    if "*" not in pattern:
+        return None
+    parts = []
+    for i, chunk in enumerate(pattern.split("**")):
+        if i:
+            parts.append(".*")
+        parts.append("[^.]*".join(re.escape(piece) for piece in chunk.split("*")))
+    return re.compile("".join(parts) + r"\Z")
+
+
+def listener_name(listener: Listener) -> str:
+    """Stable, human-readable name for a listener (`module.Class.method`)."""
+    qualname = getattr(listener, "__qualname__", None) or type(listener).__qualname__
+    module = getattr(listener, "__module__", None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+class _LatencyStats:
+    """Call count and latency histogram for one listener and event type."""
+
+    __slots__ = ("calls", "total", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def add(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        elapsed_ms = elapsed * 1000.0
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000.0, 3),
+            "mean_ms": round(self.total * 1000.0 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000.0, 3),
+            "histogram_ms": {
+                f"<={bound:g}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets) if n
+            },
+        }
+
+
+@dataclass(frozen=True)
+class DeadLetter:
+    """A delivery that failed or timed out; kept in `EventBus.dead_letters`."""
+
+    event: Event
+    listener: str
+    error: str
+    timed_out: bool
+    failed_at: float
+
+
+class _Subscription:
+    """A single listener registration; ordered by `seq` for stable dispatch."""
+
+    __slots__ = ("listener", "event_type", "regex", "seq", "name", "stats", "timeout", "background")
+
+    def __init__(
+        self,
+        listener: Listener,
+        event_type: str | None,
+        seq: int,
+        timeout: float | None = None,
+        background: bool = False,
+    ) -> None:
+        self.listener = listener
+        self.event_type = event_type
+        self.regex = compile_pattern(event_type) if event_type else None
+        self.seq = seq
+        self.name = listener_name(listener)
+        self.stats: Dict[str, _LatencyStats] = {}
+        self.timeout = timeout
+        self.background = background
+
+    def matches(self, event_type: str) -> bool:
+        if self.event_type is None:
+            return True
+        if self.regex is None:
+            return self.event_type == event_type
+        return self.regex.match(event_type) is not None
+
+
+class _DispatchQueue:
+    """
+    Bounded priority queue used by the queued dispatch mode.
+
+    Lower `Event.priority` values are dispatched first and FIFO order is kept
+    within a priority. Entries are `[priority, seq, event]`; evicted entries
+    keep their heap slot with `event=None` and are skipped on `get()`.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.coalesced = 0
+        self._heap: List[list] = []
+        self._live: Dict[int, list] = {}
+        self._coalesce_slots: Dict[str, list] = {}
+        self._seq = count()
+        self._cond = asyncio.Condition()
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def _evict_oldest(self) -> None:
+        seq = next(iter(self._live))
+        entry = self._live.pop(seq)
+        event = entry[2]
+        if self._coalesce_slots.get(event.type) is entry:
+            del self._coalesce_slots[event.type]
+        entry[2] = None
+        self.dropped += 1
+        self._task_done()
+
+    async def put(self, event: Event, policy: str) -> None:
+        async with self._cond:
+            if policy == COALESCE:
+                slot = self._coalesce_slots.get(event.type)
+                if slot is not None:
+                    slot[2] = event
+                    self.coalesced += 1
+                    return
+            while len(self._live) >= self.maxsize:
+                if policy == BLOCK:
+                    await self._cond.wait()
+                else:
+                    self._evict_oldest()
+            entry = [event.priority, next(self._seq), event]
+            heapq.heappush(self._heap, entry)
+            self._live[entry[1]] = entry
+            if policy == COALESCE:
+                self._coalesce_slots[event.type] = entry
+            self._unfinished += 1
+            self._idle.clear()
+            self._cond.notify_all()
+
+    async def get(self) -> Event:
+        async with self._cond:
+            while True:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                if self._heap:
+                    break
+                await self._cond.wait()
+            entry = heapq.heappop(self._heap)
+            event = entry[2]
+            del self._live[entry[1]]
+            if self._coalesce_slots.get(event.type) is entry:
+                del self._coalesce_slots[event.type]
+            self._cond.notify_all()
+            return event
+
+    def _task_done(self) -> None:
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._idle.set()
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+
+class _CoalesceWindow:
+    """
+    Per-type coalescing state: the latest pending event and counters.
+
+    The window is open until the monotonic `deadline`. A timer on the loop
+    that opened it delivers the pending event on time; if that loop is gone
+    the next emit finds the deadline passed and starts a fresh window.
+    """
+
+    __slots__ = ("window", "pending", "deadline", "received", "delivered", "merged")
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self.pending: Event | None = None
+        self.deadline = 0.0
+        self.received = 0
+        self.delivered = 0
+        self.merged = 0
+
+
 class EventBus:
     """
     A robust EventBus that allows subscription to specific event types
     and supports both synchronous and asynchronous listeners.
+
+    Subscriptions may be exact types, dotted wildcard patterns
+    (`state.*.changed`, `OS_ACTION_*`, `state.**`) or everything (None).
+    Matching is resolved once per event type into a dispatch index that is
+    only invalidated when subscriptions change.
+
+    By default `emit` delivers inline. After `start_queue()` emitters only
+    enqueue into a bounded priority queue drained by dispatcher tasks, with
+    per-type overflow policies set through `set_overflow_policy()`.
+
+    Types registered with `coalesce()` are throttled before either path: the
+    first event of a window is delivered at once, later ones only replace a
+    pending event that is delivered when the window closes.
+
+    `instrument()` turns on per-listener call counts and latency histograms
+    per event type (see `stats()`), and optionally emits `bus.slow_listener`
+    when a listener exceeds a threshold.
+
+    Listener failures never reach the emitter: exceptions and timeouts are
+    logged and recorded in `dead_letters`. Subscriptions may set a `timeout`
+    for async listeners, or `background=True` so emit does not wait for them.
+
+    Code without a running loop (Qt slots, worker threads) uses `post()` or
+    `emit_threadsafe()`, which hand the event to one long-lived dispatcher
+    loop: the loop given to `attach_loop()`, or a lazily started daemon thread.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, dead_letter_limit: int = 256) -> None:
         """Initializes the EventBus."""
-        self._listeners: DefaultDict[str, List[Listener]] = defaultdict(list)
-        self._wildcard_listeners: List[Listener] = []
+        self._exact: Dict[str, List[_Subscription]] = {}
+        self._patterns: List[_Subscription] = []
+        self._index: Dict[str, Tuple[_Subscription, ...]] = {}
+        self._seq = count()
+        self._overflow: Dict[str, str] = {}
+        self._overflow_index: Dict[str, str] = {}
+        self._queue: _DispatchQueue | None = None
+        self._queue_loop: asyncio.AbstractEventLoop | None = None
+        self._workers: List[asyncio.Task] = []
+        self._coalesce: Dict[str, float] = {}
+        self._coalesce_index: Dict[str, float] = {}
+        self._windows: Dict[str, _CoalesceWindow] = {}
+        # Fire-and-forget tasks per loop, so join() only waits for its own.
+        self._background: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._instrumented = False
+        self.slow_listener_threshold: float | None = None
+        self.dead_letters: Deque[DeadLetter] = deque(maxlen=dead_letter_limit)
+        self._post_loop: asyncio.AbstractEventLoop | None = None
+        self._own_loop: asyncio.AbstractEventLoop | None = None
+        self._own_thread: threading.Thread | None = None
+        self._post_lock = threading.Lock()
+        self._posted: set[concurrent.futures.Future] = set()
 
-    def subscribe(self, listener: Listener, event_type: str | None = None) -> Callable[[], None]:
+    def subscribe(
+        self,
+        listener: Listener,
+        event_type: str | None = None,
+        *,
+        timeout: float | None = None,
+        background: bool = False,
+    ) -> Callable[[], None]:
         """
-        Subscribe a listener to a specific event type or all events.
+        Subscribe a listener to a specific event type, a wildcard pattern or all events.
 
         Args:
             listener: The function to call when the event is emitted.
-            event_type: The type of event to listen for. If None, the listener
-                        will receive all events.
+            event_type: The type or pattern of event to listen for. If None,
+                        the listener will receive all events.
+            timeout: Seconds an async listener may run before it is cancelled
+                     and dead-lettered.
+            background: Run an async listener as a fire-and-forget task
+                        instead of awaiting it in `emit`.
 
         Returns:
             A function that can be called to unsubscribe the listener.
         """
-        if event_type:
-            self._listeners[event_type].append(listener)
+        sub = _Subscription(listener, event_type or None, next(self._seq), timeout, background)
+        if sub.event_type is not None and sub.regex is None:
+            self._exact.setdefault(sub.event_type, []).append(sub)
         else:
-            self._wildcard_listeners.append(listener)
+            self._patterns.append(sub)
+        self._index.clear()
 
         def unsubscribe() -> None:
             """Removes the listener from the bus."""
@@ -45,45 +328,433 @@ class EventBus:
 
     def unsubscribe(self, listener: Listener, event_type: str | None = None) -> None:
         """
-        Unsubscribe a listener from an event type or all events.
+        Unsubscribe a listener from an event type, pattern or all events.
 
         Args:
             listener: The listener function to remove.
-            event_type: The event type from which to unsubscribe. If None,
-                        unsubscribes from the wildcard listeners.
+            event_type: The event type or pattern from which to unsubscribe.
+                        If None, unsubscribes from the wildcard listeners.
         """
+        event_type = event_type or None
+        if event_type is not None and compile_pattern(event_type) is None:
+            bucket = self._exact.get(event_type, [])
+        else:
+            bucket = self._patterns
+        for sub in bucket:
+            if sub.listener == listener and sub.event_type == event_type:
+                bucket.remove(sub)
+                if not bucket and event_type in self._exact:
+                    del self._exact[event_type]
+                self._index.clear()
+                return
+        # Listener not found, which can happen and is not an error.
+
+    def _resolve(self, event_type: str) -> Tuple[_Subscription, ...]:
+        """Build and cache the ordered subscription tuple for one event type."""
+        subs = list(self._exact.get(event_type, ()))
+        subs.extend(sub for sub in self._patterns if sub.matches(event_type))
+        subs.sort(key=lambda sub: sub.seq)
+        resolved = tuple(subs)
+        self._index[event_type] = resolved
+        return resolved
+
+    def listeners_for(self, event_type: str) -> Tuple[Listener, ...]:
+        """Return the listeners an event of `event_type` would be delivered to."""
+        subs = self._index.get(event_type)
+        if subs is None:
+            subs = self._resolve(event_type)
+        return tuple(sub.listener for sub in subs)
+
+    def set_overflow_policy(self, event_type: str, policy: str) -> None:
+        """
+        Choose what a full dispatch queue does with events of a type or pattern.
+
+        Args:
+            event_type: Exact event type or wildcard pattern.
+            policy: `block` (default) waits for space, `drop_oldest` evicts the
+                    oldest queued event, `coalesce` replaces a still-queued event
+                    of the same type and otherwise behaves like `drop_oldest`.
+        """
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self._overflow[event_type] = policy
+        self._overflow_index.clear()
+
+    def _overflow_policy(self, event_type: str) -> str:
+        policy = self._overflow_index.get(event_type)
+        if policy is None:
+            policy = self._overflow.get(event_type)
+            if policy is None:
+                policy = BLOCK
+                # The most recently configured matching pattern wins.
+                for pattern, candidate in self._overflow.items():
+                    regex = compile_pattern(pattern)
+                    if regex is not None and regex.match(event_type):
+                        policy = candidate
+            self._overflow_index[event_type] = policy
+        return policy
+
+    def start_queue(self, maxsize: int = 1024, workers: int = 2) -> None:
+        """
+        Switch to queued dispatch on the running loop.
+
+        Args:
+            maxsize: Maximum number of queued events.
+            workers: Number of dispatcher tasks draining the queue.
+        """
+        if self._queue is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._queue = _DispatchQueue(maxsize)
+        self._queue_loop = loop
+        self._workers = [loop.create_task(self._drain(self._queue)) for _ in range(max(1, workers))]
+
+    async def stop_queue(self, drain: bool = True) -> None:
+        """Return to inline dispatch, delivering queued events first if `drain`."""
+        queue, workers = self._queue, self._workers
+        if queue is None:
+            return
+        if drain:
+            await queue.join()
+        self._queue = None
+        self._queue_loop = None
+        self._workers = []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def join(self) -> None:
+        """Wait until every queued event and background listener has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+        await self._join_background()
+
+    def _spawn(self, coro: Coroutine) -> asyncio.Task:
+        """Run `coro` as a background task of the running loop."""
+        loop = asyncio.get_running_loop()
+        tasks = self._background.get(loop)
+        if tasks is None:
+            tasks = self._background[loop] = set()
+        task = loop.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return task
+
+    async def _join_background(self) -> None:
+        tasks = self._background.get(asyncio.get_running_loop())
+        while tasks:
+            await asyncio.gather(*list(tasks), return_exceptions=True)
+
+    def queue_stats(self) -> Dict[str, int]:
+        """Depth and overflow counters of the dispatch queue (empty when inline)."""
+        queue = self._queue
+        if queue is None:
+            return {}
+        return {
+            "depth": len(queue),
+            "maxsize": queue.maxsize,
+            "dropped": queue.dropped,
+            "coalesced": queue.coalesced,
+            "workers": len(self._workers),
+        }
+
+    async def _drain(self, queue: _DispatchQueue) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                await self._dispatch(event)
+            except Exception:
+                logger.exception("Listener failed while dispatching %s", event.type)
+            finally:
+                queue._task_done()
+
+    def coalesce(self, event_type: str, window: float = 0.05) -> None:
+        """
+        Deliver at most one event per `window` seconds for a type or pattern,
+        keeping only the latest value. A window of 0 disables coalescing.
+        """
+        if window > 0:
+            self._coalesce[event_type] = window
+        else:
+            self._coalesce.pop(event_type, None)
+        self._coalesce_index.clear()
+
+    def _coalesce_window(self, event_type: str) -> float:
+        window = self._coalesce_index.get(event_type)
+        if window is None:
+            window = self._coalesce.get(event_type)
+            if window is None:
+                window = 0.0
+                for pattern, candidate in self._coalesce.items():
+                    regex = compile_pattern(pattern)
+                    if regex is not None and regex.match(event_type):
+                        window = candidate
+            self._coalesce_index[event_type] = window
+        return window
+
+    def _open_window(self, event_type: str, state: _CoalesceWindow) -> None:
+        loop = asyncio.get_running_loop()
+        state.deadline = time.monotonic() + state.window
+        loop.call_later(state.window, self._close_window, event_type, state.deadline)
+
+    def _close_window(self, event_type: str, deadline: float) -> None:
+        state = self._windows[event_type]
+        if state.deadline != deadline:
+            return  # superseded by a newer window or a flush
+        event, state.pending = state.pending, None
+        if event is None:
+            state.deadline = 0.0
+            return
+        # Keep the window open while events keep arriving.
+        self._open_window(event_type, state)
+        state.delivered += 1
+        self._spawn(self._deliver(event))
+
+    async def flush_coalesced(self) -> None:
+        """Deliver every pending coalesced event now and close all windows."""
+        pending = []
+        for state in self._windows.values():
+            # A timer left on another loop sees the deadline change and does nothing.
+            state.deadline = 0.0
+            if state.pending is not None:
+                pending.append(state.pending)
+                state.pending = None
+                state.delivered += 1
+        for event in pending:
+            await self._deliver(event)
+        await self._join_background()
+
+    def coalesce_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-type counts of received, delivered and merged (superseded) events."""
+        return {
+            event_type: {"received": state.received, "delivered": state.delivered, "merged": state.merged}
+            for event_type, state in self._windows.items()
+        }
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        """Deliver posted events on `loop` (e.g. the app's agentic loop); None detaches."""
+        self._post_loop = loop
+
+    def _post_target(self) -> asyncio.AbstractEventLoop:
+        loop = self._post_loop
+        if loop is not None and not loop.is_closed():
+            return loop
+        with self._post_lock:
+            if self._own_loop is None:
+                self._own_loop = asyncio.new_event_loop()
+                self._own_thread = threading.Thread(
+                    target=self._own_loop.run_forever, name="etherea-event-bus", daemon=True
+                )
+                self._own_thread.start()
+            return self._own_loop
+
+    def post(self, event: Event) -> concurrent.futures.Future:
+        """
+        Emit from any thread without blocking.
+
+        Returns:
+            A Future that completes once `emit` has finished on the dispatcher loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.emit(event), self._post_target())
+        self._posted.add(future)
+        future.add_done_callback(self._posted.discard)
+        return future
+
+    def emit_threadsafe(self, event: Event, timeout: float | None = None) -> None:
+        """Emit from a thread without a running loop and wait for delivery."""
+        loop = self._post_target()
+        if self._loop_thread_is_current(loop):
+            raise RuntimeError("emit_threadsafe() would deadlock on the dispatcher loop; await emit() instead")
+        self.post(event).result(timeout)
+
+    @staticmethod
+    def _loop_thread_is_current(loop: asyncio.AbstractEventLoop) -> bool:
         try:
-            if event_type:
-                if listener in self._listeners[event_type]:
-                    self._listeners[event_type].remove(listener)
-            else:
-                if listener in self._wildcard_listeners:
-                    self._wildcard_listeners.remove(listener)
-        except ValueError:
-            # Listener not found, which can happen and is not an error.
-            pass
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def wait_posted(self, timeout: float | None = None) -> bool:
+        """Block until every posted event is delivered; False on timeout."""
+        pending = list(self._posted)
+        if not pending:
+            return True
+        _, not_done = concurrent.futures.wait(pending, timeout)
+        return not not_done
+
+    def shutdown_dispatcher(self, timeout: float = 1.0) -> None:
+        """Stop the bus-owned dispatcher thread, if one was started."""
+        with self._post_lock:
+            loop, thread = self._own_loop, self._own_thread
+            self._own_loop = self._own_thread = None
+        if loop is None:
+            return
+        self.wait_posted(timeout)
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        if not loop.is_running():
+            loop.close()
 
     async def emit(self, event: Event) -> None:
         """
-        Emit an event, calling all subscribed listeners for the event's type
-        and all wildcard listeners. Runs async listeners concurrently.
+        Emit an event, calling all subscribed listeners whose type or pattern
+        matches the event's type. Runs async listeners concurrently.
+
+        Coalesced types return immediately while their window is open. In
+        queued mode this only enqueues the event, unless called from a loop
+        other than the one the queue was started on.
+        """
+        if self._coalesce:
+            window = self._coalesce_window(event.type)
+            if window:
+                state = self._windows.get(event.type)
+                if state is None:
+                    state = self._windows[event.type] = _CoalesceWindow(window)
+                state.received += 1
+                if state.pending is not None:
+                    state.merged += 1
+                if time.monotonic() < state.deadline:
+                    state.pending = event
+                    return
+                # Window closed, or its timer was lost with the loop that
+                # opened it: `event` supersedes anything still pending.
+                state.pending = None
+                state.window = window
+                self._open_window(event.type, state)
+                state.delivered += 1
+        await self._deliver(event)
+
+    async def _deliver(self, event: Event) -> None:
+        """Enqueue in queued mode, otherwise dispatch inline."""
+        queue = self._queue
+        if queue is not None and asyncio.get_running_loop() is self._queue_loop:
+            await queue.put(event, self._overflow_policy(event.type))
+            return
+        await self._dispatch(event)
+
+    def instrument(self, enabled: bool = True, slow_threshold: float | None = None) -> None:
+        """
+        Toggle per-listener latency tracking.
+
+        Args:
+            enabled: Record call counts and latency histograms while True.
+            slow_threshold: Seconds after which a `bus.slow_listener` event is
+                            emitted for the offending listener; None disables it.
         """
-        listeners_to_call = self._listeners[event.type] + self._wildcard_listeners
+        self._instrumented = enabled
+        self.slow_listener_threshold = slow_threshold
+
+    @property
+    def instrumented(self) -> bool:
+        return self._instrumented
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Latency stats as `{event_type: {listener_name: {...}}}`."""
+        merged: Dict[str, Dict[str, _LatencyStats]] = {}
+        subs = [sub for bucket in self._exact.values() for sub in bucket] + self._patterns
+        for sub in subs:
+            for event_type, stats in sub.stats.items():
+                into = merged.setdefault(event_type, {}).setdefault(sub.name, _LatencyStats())
+                into.calls += stats.calls
+                into.total += stats.total
+                into.max = max(into.max, stats.max)
+                into.buckets = [a + b for a, b in zip(into.buckets, stats.buckets)]
+        return {
+            event_type: {name: stats.to_dict() for name, stats in listeners.items()}
+            for event_type, listeners in sorted(merged.items())
+        }
+
+    def dump_stats(self, path: str | os.PathLike) -> None:
+        """Write `stats()` to a JSON file."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.stats(), handle, indent=2)
+
+    def reset_stats(self) -> None:
+        for bucket in list(self._exact.values()) + [self._patterns]:
+            for sub in bucket:
+                sub.stats.clear()
+
+    def _record(self, sub: _Subscription, event: Event, elapsed: float) -> None:
+        stats = sub.stats.get(event.type)
+        if stats is None:
+            stats = sub.stats[event.type] = _LatencyStats()
+        stats.add(elapsed)
+        threshold = self.slow_listener_threshold
+        if threshold is not None and elapsed >= threshold and event.type != SLOW_LISTENER_EVENT:
+            diagnostic = Event(
+                type=SLOW_LISTENER_EVENT,
+                source="event_bus",
+                payload={
+                    "listener": sub.name,
+                    "event_type": event.type,
+                    "event_seq": event.seq,
+                    "elapsed_ms": round(elapsed * 1000.0, 3),
+                    "threshold_ms": round(threshold * 1000.0, 3),
+                },
+                priority=90,
+            )
+            self._spawn(self.emit(diagnostic))
+
+    def _dead_letter(self, sub: _Subscription, event: Event, error: BaseException) -> None:
+        timed_out = isinstance(error, asyncio.TimeoutError)
+        detail = f"timed out after {sub.timeout}s" if timed_out else repr(error)
+        logger.warning("Listener %s failed on %s: %s", sub.name, event.type, detail)
+        self.dead_letters.append(DeadLetter(event, sub.name, detail, timed_out, time.time()))
+
+    async def _guarded(self, sub: _Subscription, event: Event, coro: Coroutine, start: float) -> None:
+        """Await one async listener with its timeout, timing and failure isolation."""
+        try:
+            if sub.timeout is not None:
+                await asyncio.wait_for(coro, sub.timeout)
+            else:
+                await coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._dead_letter(sub, event, exc)
+        finally:
+            if self._instrumented:
+                self._record(sub, event, time.perf_counter() - start)
+
+    async def _dispatch(self, event: Event) -> None:
+        """Deliver an event to its listeners inline."""
+        subs = self._index.get(event.type)
+        if subs is None:
+            subs = self._resolve(event.type)
 
-        if not listeners_to_call:
+        if not subs:
             return
 
-        # Separate sync and async listeners
-        async_tasks = []
+        timed = self._instrumented
+        start = 0.0
+        # Separate sync and async listeners; the list is only built when needed.
+        async_tasks = None
 
-        for listener in listeners_to_call:
-            result = listener(event)
+        for sub in subs:
+            if timed:
+                start = time.perf_counter()
+            try:
+                result = sub.listener(event)
+            except Exception as exc:
+                self._dead_letter(sub, event, exc)
+                continue
             if asyncio.iscoroutine(result):
-                async_tasks.append(result)
+                guarded = self._guarded(sub, event, result, start)
+                if sub.background:
+                    self._spawn(guarded)
+                    continue
+                if async_tasks is None:
+                    async_tasks = []
+                async_tasks.append(guarded)
+            elif timed:
+                self._record(sub, event, time.perf_counter() - start)
 
-        # Await all async tasks concurrently
+        # Await all async tasks concurrently; failures are already isolated.
         if async_tasks:
             await asyncio.gather(*async_tasks)
 
 # Global singleton instance of the EventBus.
 event_bus = EventBus()
+if os.environ.get("ETHEREA_PROFILE_BUS") == "1":
+    event_bus.instrument(slow_threshold=float(os.environ.get("ETHEREA_SLOW_LISTENER_MS", "50")) / 1000.0)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import json
+import struct
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Tuple
+
+from corund.app_runtime import user_data_dir
+from corund.event_bus import EventBus, compile_pattern, event_bus
+from corund.event_model import Event, create_event, to_epoch, to_iso
+
+# Record: little-endian u32 length + UTF-8 JSON body.
+_LEN = struct.Struct("<I")
+# Sparse index entry: f64 event time + u64 record offset in the segment.
+_IDX = struct.Struct("<dQ")
+
+
+class EventJournal:
+    """
+    Append-only event journal stored as rotating segment files.
+
+    Each segment `segment-NNNNNN.log` holds length-prefixed JSON records and
+    has a sparse `segment-NNNNNN.idx` of (event time, offset) pairs written
+    every `index_every` records, so `replay(since=...)` seeks instead of
+    scanning. Events with a privacy level other than `normal` are skipped
+    unless `include_sensitive` is set.
+
+    Whole segments (log and index) older than `max_age` seconds, and the
+    oldest ones while the journal exceeds `max_bytes`, are deleted when a
+    new segment is opened or on `prune()`; None disables either limit.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        *,
+        segment_bytes: int = 4 * 1024 * 1024,
+        index_every: int = 64,
+        flush_every: int = 32,
+        include_sensitive: bool = False,
+        max_age: float | None = 30 * 86_400,
+        max_bytes: int | None = 256 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory) if directory else user_data_dir() / "journal"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.index_every = max(1, index_every)
+        self.flush_every = max(1, flush_every)
+        self.include_sensitive = include_sensitive
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._log: BinaryIO | None = None
+        self._idx: BinaryIO | None = None
+        self._segment_no = max((n for n, _ in self._segments()), default=0)
+        self._segment_size = 0
+        self._segment_records = 0
+        self._unflushed = 0
+        self._max_ts = 0.0
+        self._replaying: set[int] = set()
+
+    # --- Writing ---
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        found = []
+        for path in self.directory.glob("segment-*.log"):
+            try:
+                found.append((int(path.stem.split("-", 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    def _open_segment(self) -> None:
+        self._close_segment()
+        self._prune_locked(time.time())
+        self._segment_no += 1
+        stem = self.directory / f"segment-{self._segment_no:06d}"
+        self._log = open(stem.with_suffix(".log"), "ab")
+        self._idx = open(stem.with_suffix(".idx"), "ab")
+        self._segment_size = 0
+        self._segment_records = 0
+
+    def _close_segment(self) -> None:
+        for handle in (self._log, self._idx):
+            if handle is not None:
+                handle.close()
+        self._log = self._idx = None
+
+    def append(self, event: Event) -> None:
+        """Write one event; safe to call from any thread."""
+        if id(event) in self._replaying:
+            return
+        if event.privacy_level != "normal" and not self.include_sensitive:
+            return
+        ts = event.wall_time
+        body = json.dumps(
+            {
+                "ts": ts,
+                "type": event.type,
+                "source": event.source,
+                "payload": event.payload,
+                "priority": event.priority,
+                "privacy_level": event.privacy_level,
+            },
+            ensure_ascii=False,
+            default=str,
+        ).encode("utf-8")
+        with self._lock:
+            if self._log is None or self._segment_size >= self.segment_bytes:
+                self._open_segment()
+            # Delivery order can differ slightly from creation order; index the
+            # running maximum so every record before an entry is older than it.
+            self._max_ts = max(self._max_ts, ts)
+            if self._segment_records % self.index_every == 0:
+                self._idx.write(_IDX.pack(self._max_ts, self._segment_size))
+            self._log.write(_LEN.pack(len(body)))
+            self._log.write(body)
+            self._segment_size += _LEN.size + len(body)
+            self._segment_records += 1
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush_locked()
+
+    def _prune_locked(self, now: float) -> int:
+        segments = []
+        for number, path in self._segments():
+            if self._log is not None and number == self._segment_no:
+                continue  # never the segment being written
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            segments.append((path, stat.st_mtime, stat.st_size))
+        total = sum(size for _, _, size in segments) + self._segment_size
+        removed = 0
+        for path, mtime, size in segments:  # oldest first
+            expired = self.max_age is not None and mtime < now - self.max_age
+            oversized = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversized):
+                break
+            for part in (path, path.with_suffix(".idx")):
+                try:
+                    part.unlink()
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def prune(self, now: float | None = None) -> int:
+        """Delete segments past `max_age` or `max_bytes`; returns how many were removed."""
+        with self._lock:
+            return self._prune_locked(time.time() if now is None else now)
+
+    def _flush_locked(self) -> None:
+        for handle in (self._log, self._idx):
+            if handle is not None:
+                handle.flush()
+        self._unflushed = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._close_segment()
+
+    def attach(self, bus: EventBus | None = None, event_type: str | None = None) -> Callable[[], None]:
+        """Journal every event (or one type/pattern) emitted on `bus`."""
+        return (bus or event_bus).subscribe(self.append, event_type)
+
+    # --- Reading ---
+
+    @staticmethod
+    def _start_offset(idx_path: Path, since: float | None) -> int:
+        if since is None:
+            return 0
+        try:
+            raw = idx_path.read_bytes()
+        except FileNotFoundError:
+            return 0
+        entries = [_IDX.unpack_from(raw, pos) for pos in range(0, len(raw) - _IDX.size + 1, _IDX.size)]
+        # Records before the last entry older than `since` are all older too.
+        pos = bisect_left([ts for ts, _ in entries], since)
+        return entries[pos - 1][1] if pos else 0
+
+    @staticmethod
+    def _read_records(path: Path, offset: int) -> Iterator[dict]:
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return  # pruned since the segment list was taken
+        with handle:
+            handle.seek(offset)
+            while True:
+                head = handle.read(_LEN.size)
+                if len(head) < _LEN.size:
+                    return
+                (size,) = _LEN.unpack(head)
+                body = handle.read(size)
+                if len(body) < size:
+                    return  # torn tail from an interrupted write
+                yield json.loads(body)
+
+    def iter_events(
+        self,
+        since: float | str | datetime | None = None,
+        *,
+        types: Iterable[str] | None = None,
+    ) -> Iterator[Event]:
+        """
+        Yield journaled events in write order.
+
+        Args:
+            since: Epoch seconds, ISO-8601 string or datetime; older records are skipped.
+            types: Exact event types or wildcard patterns to keep.
+        """
+        since_ts = to_epoch(since)
+        exact, patterns = set(), []
+        for event_type in types or ():
+            regex = compile_pattern(event_type)
+            if regex is None:
+                exact.add(event_type)
+            else:
+                patterns.append(regex)
+        self.flush()
+        for _, path in self._segments():
+            for record in self._read_records(path, self._start_offset(path.with_suffix(".idx"), since_ts)):
+                if since_ts is not None and record["ts"] < since_ts:
+                    continue
+                event_type = record["type"]
+                if types is not None and event_type not in exact and not any(p.match(event_type) for p in patterns):
+                    continue
+                yield create_event(
+                    event_type,
+                    source=record["source"],
+                    payload=record["payload"],
+                    priority=record["priority"],
+                    privacy_level=record["privacy_level"],
+                    timestamp=to_iso(record["ts"]),
+                )
+
+    async def replay(
+        self,
+        since: float | str | datetime | None = None,
+        *,
+        types: Iterable[str] | None = None,
+        bus: EventBus | None = None,
+    ) -> int:
+        """
+        Re-emit journaled events through `bus` and return how many were sent.
+        Replayed events are not journaled again.
+        """
+        bus = bus or event_bus
+        replayed: List[Event] = []
+        try:
+            for event in self.iter_events(since, types=types):
+                replayed.append(event)
+                self._replaying.add(id(event))
+                await bus.emit(event)
+            # Queued buses deliver after emit returns; keep ids until they drain.
+            await bus.join()
+        finally:
+            for event in replayed:
+                self._replaying.discard(id(event))
+        return len(replayed)
@@ -1,24 +1,102 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+import time
 from datetime import datetime, timezone
+from itertools import count
 from typing import Any, Dict
 
+_SEQ = count(1)
+_intern = sys.intern
+_time_ns = time.time_ns
+
 
-@dataclass(frozen=True)
 class Event:
-    type: str
-    timestamp: str
-    source: str
-    payload: Dict[str, Any]
-    priority: int = 50
-    privacy_level: str = "normal"
+    """
+    Bus event.
+
+    Compact `__slots__` representation: the type string is interned, creation
+    time is kept as epoch nanoseconds and the ISO-8601 `timestamp` is only
+    formatted when first read. `seq` is a process-wide creation counter.
+
+    One instance is shared by every listener, so treat it as read-only; it is
+    not frozen at runtime because guarded attribute writes would more than
+    double construction cost.
+    """
+
+    __slots__ = ("type", "source", "payload", "priority", "privacy_level", "seq", "ts_ns", "_iso")
+
+    def __init__(
+        self,
+        type: str,
+        timestamp: str | None = None,
+        source: str = "",
+        payload: Dict[str, Any] | None = None,
+        priority: int = 50,
+        privacy_level: str = "normal",
+    ) -> None:
+        self.type = _intern(type)
+        self.source = source
+        self.payload = payload if payload is not None else {}
+        self.priority = priority
+        self.privacy_level = privacy_level
+        self.seq = next(_SEQ)
+        self.ts_ns = _time_ns()
+        self._iso = timestamp
+
+    @property
+    def timestamp(self) -> str:
+        iso = self._iso
+        if iso is None:
+            iso = self._iso = to_iso(self.ts_ns / 1e9)
+        return iso
+
+    @property
+    def wall_time(self) -> float:
+        """Creation time as epoch seconds (parsed back from an explicit timestamp)."""
+        iso = self._iso
+        if iso is not None:
+            return to_epoch(iso)
+        return self.ts_ns / 1e9
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return (
+            self.type == other.type
+            and self.timestamp == other.timestamp
+            and self.source == other.source
+            and self.payload == other.payload
+            and self.priority == other.priority
+            and self.privacy_level == other.privacy_level
+        )
+
+    __hash__ = None  # payload is a dict
+
+    def __repr__(self) -> str:
+        return (
+            f"Event(type={self.type!r}, timestamp={self.timestamp!r}, source={self.source!r}, "
+            f"payload={self.payload!r}, priority={self.priority!r}, privacy_level={self.privacy_level!r})"
+        )
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+
+def to_epoch(value: float | str | datetime | None) -> float | None:
+    """Normalize epoch seconds, ISO-8601 strings or datetimes to epoch seconds."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value.timestamp()
+
+
 def create_event(
     event_type: str,
     source: str,
@@ -28,11 +106,4 @@ def create_event(
     privacy_level: str = "normal",
     timestamp: str | None = None,
 ) -> Event:
-    return Event(
-        type=event_type,
-        timestamp=timestamp or now_iso(),
-        source=source,
-        payload=payload,
-        priority=priority,
-        privacy_level=privacy_level,
-    )
+    return Event(event_type, timestamp, source, payload, priority, privacy_level)
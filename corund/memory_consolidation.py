@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # optional on Termux/CI
+
+from corund.vector_index import normalize
+
+logger = logging.getLogger(__name__)
+
+DAY = 86_400
+
+UNSEEN = -1  # not clustered yet
+REMOVED = -2  # merged or archived in this pass
+
+
+class MemoryConsolidator:
+    """
+    Keeps the live long-term memory set small.
+
+    Each `run()` works through memories not clustered yet, in mini-batches,
+    until its time budget is spent:
+
+    - every embedding is assigned to the nearest of `clusters` centroids,
+      which are refined with mini-batch k-means updates (empty slots are
+      seeded from incoming rows);
+    - a memory whose cosine similarity to a member of its cluster reaches
+      `duplicate_threshold` is merged into that older memory, whose
+      `weight` and `hits` absorb it;
+    - memories not recalled for `stale_after` seconds whose salience
+      (`weight + hits`) is at most `archive_salience` are archived.
+
+    Merged and stale rows move to `memories_archive` and leave the
+    embedding sidecar, so `Database.search_memories` scans only live
+    memories. Centroids, live sizes and a representative memory (the member
+    closest to the centroid) are kept per cluster in `memory_clusters`.
+    Duplicate scores come from the int8 sidecar, so they are accurate to
+    about 0.01.
+    """
+
+    def __init__(
+        self,
+        database=None,
+        *,
+        clusters: int = 64,
+        batch_size: int = 256,
+        duplicate_threshold: float = 0.95,
+        stale_after: float = 90 * DAY,
+        archive_salience: int = 1,
+        archive_batch: int = 500,
+    ) -> None:
+        self._database = database
+        self.clusters = max(1, clusters)
+        self.batch_size = max(1, batch_size)
+        self.duplicate_threshold = duplicate_threshold
+        self.stale_after = stale_after
+        self.archive_salience = archive_salience
+        self.archive_batch = archive_batch
+        self._centroids = None
+        self._seen = None
+        self._sizes = None
+        # Cluster per sidecar row, valid while the sidecar ids still match.
+        self._assign = None
+        self._assign_ids = None
+        self._lock = threading.Lock()
+
+    @property
+    def database(self):
+        if self._database is None:
+            from corund.database import db
+
+            self._database = db
+        return self._database
+
+    # --- State ---
+
+    def _load_clusters(self, dim: int) -> None:
+        with self.database.engine.read() as conn:
+            rows = conn.execute(
+                "SELECT centroid, size, seen FROM memory_clusters ORDER BY cluster_id"
+            ).fetchall()
+        centroids = [np.frombuffer(blob, dtype=np.float32) for blob, _, _ in rows]
+        if rows and all(len(c) == dim for c in centroids):
+            self._centroids = np.stack(centroids)
+            self._sizes = np.array([r[1] for r in rows], dtype=np.int64)
+            self._seen = np.array([r[2] for r in rows], dtype=np.int64)
+        else:
+            self._centroids = np.empty((0, dim), dtype=np.float32)
+            self._sizes = np.empty(0, dtype=np.int64)
+            self._seen = np.empty(0, dtype=np.int64)
+
+    def _assignments(self, matrix):
+        """
+        Snapshot of the sidecar ids and the cluster of each; cached between
+        runs while the sidecar only grew. Rows appended later are left for
+        the next run.
+        """
+        ids = matrix.ids.copy()
+        cached = 0 if self._assign_ids is None else len(self._assign_ids)
+        if self._assign is not None and len(ids) >= cached and np.array_equal(ids[:cached], self._assign_ids):
+            tail = np.full(len(ids) - cached, UNSEEN, dtype=np.int64)
+            return ids, np.concatenate([self._assign, tail])
+        with self.database.engine.read() as conn:
+            rows = conn.execute(
+                "SELECT id, COALESCE(cluster_id, ?) FROM memories WHERE embedding IS NOT NULL", (UNSEEN,)
+            ).fetchall()
+        known = dict(rows)
+        missing = [int(i) for i in ids if int(i) not in known]
+        if missing:
+            # Rows deleted while the sidecar was not compacted (e.g. an interrupted pass).
+            self.database.drop_from_memory_index(missing)
+            ids = matrix.ids.copy()
+        return ids, np.array([known.get(int(i), UNSEEN) for i in ids], dtype=np.int64)
+
+    # --- Pass ---
+
+    def _seed(self, block) -> None:
+        need = min(self.clusters - len(self._centroids), len(block))
+        if need > 0:
+            self._centroids = np.concatenate([self._centroids, block[:need]])
+            self._sizes = np.concatenate([self._sizes, np.zeros(need, dtype=np.int64)])
+            self._seen = np.concatenate([self._seen, np.zeros(need, dtype=np.int64)])
+
+    def _cluster(self, matrix, ids, assign, deadline: float) -> Tuple[List[Tuple[int, int]], Dict[int, int], set]:
+        """Assign pending rows and find duplicates until `deadline`."""
+        pending = np.flatnonzero(assign == UNSEEN)
+        assigned: List[Tuple[int, int]] = []
+        merges: Dict[int, int] = {}
+        touched: set = set()
+        for start in range(0, len(pending), self.batch_size):
+            if time.monotonic() >= deadline:
+                break
+            positions = pending[start : start + self.batch_size]
+            block = normalize(matrix.rows(positions))
+            self._seed(block)
+            labels = np.argmax(block @ self._centroids.T, axis=1)
+            members = {c: list(np.flatnonzero(assign == c)) for c in np.unique(labels)}
+            kept = np.zeros(len(positions), dtype=bool)
+            for offset, (pos, label) in enumerate(zip(positions, labels)):
+                group = members[label]
+                if group:
+                    scores = matrix.scores(block[offset], np.asarray(group))
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.duplicate_threshold:
+                        merges[int(ids[pos])] = int(ids[group[best]])
+                        assign[pos] = REMOVED
+                        continue
+                assign[pos] = label
+                group.append(pos)
+                kept[offset] = True
+                assigned.append((int(label), int(ids[pos])))
+            # Mini-batch k-means: move each centroid toward its new members
+            # with a per-centroid learning rate of 1 / (rows seen).
+            labels = labels[kept]
+            counts = np.bincount(labels, minlength=len(self._centroids))
+            sums = np.zeros_like(self._centroids)
+            np.add.at(sums, labels, block[kept])
+            self._seen += counts
+            self._sizes += counts
+            moved = counts > 0
+            step = (sums[moved] - counts[moved, None] * self._centroids[moved]) / self._seen[moved, None]
+            self._centroids[moved] = normalize(self._centroids[moved] + step)
+            touched.update(int(c) for c in np.flatnonzero(moved))
+        return assigned, merges, touched
+
+    def _stale(self, now: float, exclude: set) -> List[int]:
+        with self.database.engine.read() as conn:
+            rows = conn.execute(
+                """
+                SELECT id FROM memories
+                WHERE weight + hits <= ?
+                  AND COALESCE(last_hit_ts, CAST(strftime('%s', created_at) AS INTEGER)) < ?
+                ORDER BY id LIMIT ?
+                """,
+                (self.archive_salience, int(now - self.stale_after), self.archive_batch),
+            ).fetchall()
+        return [row[0] for row in rows if row[0] not in exclude]
+
+    def run(self, budget: float = 0.2, now: float | None = None) -> Dict[str, Any]:
+        """
+        One consolidation pass of at most about `budget` seconds of clustering.
+
+        Returns:
+            Counts of newly embedded, clustered, merged and archived
+            memories and of memories still waiting to be clustered.
+        """
+        with self._lock:
+            return self._run(budget, time.time() if now is None else now)
+
+    def _run(self, budget: float, now: float) -> Dict[str, Any]:
+        database = self.database
+        # Memories stored without an embedding cannot be clustered or searched.
+        embedded = database.embed_missing(self.batch_size)
+        matrix = database._embedding_matrix()
+        assigned: List[Tuple[int, int]] = []
+        merges: Dict[int, int] = {}
+        touched: set = set()
+        ids = np.empty(0, dtype=np.int64)
+        assign = np.empty(0, dtype=np.int64)
+        if matrix.dim is not None:
+            if self._centroids is None or self._centroids.shape[1] != matrix.dim:
+                self._load_clusters(matrix.dim)
+            # `ids` and `assign` are position-aligned for the rest of the pass.
+            ids, assign = self._assignments(matrix)
+            # The budget covers clustering; opening the sidecar is a one-time cost.
+            assigned, merges, touched = self._cluster(matrix, ids, assign, time.monotonic() + budget)
+
+        stale = self._stale(now, set(merges) | set(merges.values()))
+        if stale:
+            positions = np.flatnonzero(np.isin(ids, stale))
+            for label in assign[positions]:
+                if label >= 0:
+                    self._sizes[label] -= 1
+                    touched.add(int(label))
+            assign[positions] = REMOVED
+
+        cluster_rows = []
+        for label in sorted(touched):
+            group = np.flatnonzero(assign == label)
+            representative = None
+            if len(group):
+                representative = int(ids[group[int(np.argmax(matrix.scores(self._centroids[label], group)))]])
+            cluster_rows.append((
+                label,
+                self._centroids[label].astype(np.float32).tobytes(),
+                int(self._sizes[label]),
+                int(self._seen[label]),
+                representative,
+            ))
+
+        def _apply(conn) -> None:
+            conn.executemany("UPDATE memories SET cluster_id = ? WHERE id = ?", assigned)
+            for duplicate, survivor in merges.items():
+                conn.execute(
+                    """
+                    UPDATE memories SET
+                        weight = weight + (SELECT weight FROM memories WHERE id = :dup),
+                        hits = hits + (SELECT hits FROM memories WHERE id = :dup)
+                    WHERE id = :survivor AND EXISTS (SELECT 1 FROM memories WHERE id = :dup)
+                    """,
+                    {"dup": duplicate, "survivor": survivor},
+                )
+            archived = [(i, "duplicate", survivor) for i, survivor in merges.items()]
+            archived += [(i, "stale", None) for i in stale]
+            for memory_id, reason, merged_into in archived:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO memories_archive
+                        (id, content, type, embedding, created_at, weight, hits, cluster_id, reason, merged_into)
+                    SELECT id, content, type, embedding, created_at, weight, hits, cluster_id, ?, ?
+                    FROM memories WHERE id = ?
+                    """,
+                    (reason, merged_into, memory_id),
+                )
+                conn.execute("DELETE FROM memories WHERE id = ?", (memory_id,))
+            conn.executemany(
+                """
+                INSERT INTO memory_clusters(cluster_id, centroid, size, seen, representative_id)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(cluster_id) DO UPDATE SET
+                    centroid = excluded.centroid, size = excluded.size,
+                    seen = excluded.seen, representative_id = excluded.representative_id
+                """,
+                cluster_rows,
+            )
+
+        database.engine.write(_apply)
+        removed = list(merges) + stale
+        if removed:
+            database.drop_from_memory_index(removed)
+        live = assign != REMOVED
+        self._assign = assign[live]
+        self._assign_ids = ids[live]
+        return {
+            "embedded": embedded,
+            "clustered": len(assigned),
+            "merged": len(merges),
+            "archived": len(stale),
+            "pending": int(np.count_nonzero(self._assign == UNSEEN)),
+        }
+
+
+class ConsolidationWorker:
+    """Daemon thread that runs `MemoryConsolidator.run()` every `interval` seconds."""
+
+    def __init__(self, consolidator: MemoryConsolidator | None = None, interval: float = 300.0, budget: float = 0.2) -> None:
+        self.consolidator = consolidator or MemoryConsolidator()
+        self.interval = interval
+        self.budget = budget
+        self.last_stats: Dict[str, Any] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="etherea-memory-consolidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.last_stats = self.consolidator.run(self.budget)
+            except Exception:
+                logger.exception("Memory consolidation pass failed")
+                self.last_stats = None
+            # Keep going while a backlog remains, yielding between passes.
+            stats = self.last_stats or {}
+            backlog = stats.get("pending", 0) or stats.get("embedded", 0)
+            self._stop.wait(self.budget if backlog else self.interval)
@@ -5,35 +5,39 @@ Memory Store for Etherea
 - Supports real-time, dynamic, multi-modal outputs
 """
 
-import os
 import json
 import base64
 try:
     import requests
 except Exception:
     requests = None  # optional on Termux/CI
-from corund.utils import ensure_folder, debug_print
+from corund.utils import debug_print
+from corund.blob_store import BlobStore, get_blob_store
 from corund.database import db
 
 
 class MemoryStore:
-    def __init__(self):
+    def __init__(self, blobs: BlobStore | None = None):
         # Leverage the global 'db' instance for SQLite persistence
         self.db = db
+        # Binary payloads live in the blob store; profile rows keep the hash.
+        self._blobs = blobs
         debug_print("MemoryStore", "Initialized with SQLite LTM")
 
     # --- LTM Methods ---
     def add_to_ltm(self, content: str, memory_type: str = "general", embedding=None):
-        """Add a persistent memory with optional embedding"""
+        """Add a persistent memory; embedded locally unless `embedding` is given"""
         if not content:
             debug_print("MemoryStore",
                         "Warning: Empty content not added to LTM")
             return
+        if embedding is None:
+            embedding = self.db.embed_memory(content)
         self.db.add_memory(content, memory_type, embedding)
         debug_print("MemoryStore", f"Added to LTM: {content[:30]}...")
 
     def search_ltm(self, query_embedding, limit: int = 5):
-        """Search LTM using semantic similarity"""
+        """Search LTM using semantic similarity (an embedding or query text)"""
         if query_embedding is None:
             debug_print("MemoryStore",
                         "No embedding provided, returning recent memories")
@@ -65,8 +69,7 @@ class MemoryStore:
 
     def get_emotion(self):
         """Retrieve last known emotional state"""
-        pref = self.db.get_profile_context()
-        raw = pref.get("last_emotion")
+        raw = self.db.get_preference("last_emotion")
         if raw:
             try:
                 return json.loads(raw)
@@ -76,9 +79,29 @@ class MemoryStore:
         return {"tone": "neutral", "intensity": 0.5}
 
     # --- Image Handling ---
+    @property
+    def blobs(self) -> BlobStore:
+        if self._blobs is None:
+            self._blobs = get_blob_store()
+        return self._blobs
+
+    def _set_image_ref(self, key: str, ref: str) -> None:
+        blobs = self.blobs
+
+        def _release_previous(conn, previous):
+            # `ref` already holds a reference of its own, even when unchanged.
+            if blobs.is_ref(previous):
+                blobs.decref(previous, conn)
+                return previous
+
+        # The profile row and the refcount change commit together.
+        released = self.db.set_preference(f"img_{key}", ref, apply=_release_previous)
+        if released:
+            blobs.collect([released])
+
     def save_image_from_url(self, key: str, url: str, timeout: int = 5) -> bool:
         """
-        Fetch image from URL, convert to base64, and store in preferences.
+        Stream an image from URL into the blob store and keep its hash in preferences.
         Returns True if successful, False on error.
         """
         if not key or not url:
@@ -86,11 +109,57 @@ class MemoryStore:
             return False
 
         try:
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
-            b64 = base64.b64encode(response.content).decode("utf-8")
-            self.update_preference(f"img_{key}", b64)
+            with requests.get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                ref = self.blobs.put_stream(response.iter_content(chunk_size=64 * 1024))
+            self._set_image_ref(key, ref)
             return True
         except Exception as e:
             debug_print("MemoryStore", f"save_image_from_url error: {e}")
             return False
+
+    def migrate_legacy_images(self) -> int:
+        """
+        Move base64 image preferences saved by older versions into the blob store.
+        Returns the number of images moved; 0 once everything is migrated.
+        """
+        legacy = [
+            (name[len("img_"):], value)
+            for name, value in self.get_all_preferences().items()
+            if name.startswith("img_") and value and not self.blobs.is_ref(value)
+        ]
+        moved = 0
+        for key, value in legacy:
+            try:
+                data = base64.b64decode(value)
+            except Exception as e:
+                debug_print("MemoryStore", f"migrate_legacy_images: cannot decode {key}: {e}")
+                continue
+            self._set_image_ref(key, self.blobs.put(data))
+            moved += 1
+        if moved:
+            debug_print("MemoryStore", f"Moved {moved} legacy images into the blob store")
+        return moved
+
+    def load_image(self, key: str) -> bytes | None:
+        """
+        Image bytes saved under `key`, or None.
+        Legacy base64 values left over (see `migrate_legacy_images`) are
+        moved into the blob store on first read.
+        """
+        value = self.db.get_preference(f"img_{key}")
+        if not value:
+            return None
+        if self.blobs.is_ref(value):
+            try:
+                return self.blobs.read(value)
+            except FileNotFoundError:
+                debug_print("MemoryStore", f"load_image: blob missing for {key}")
+                return None
+        try:
+            data = base64.b64decode(value)
+        except Exception as e:
+            debug_print("MemoryStore", f"load_image decode error: {e}")
+            return None
+        self._set_image_ref(key, self.blobs.put(data))
+        return data
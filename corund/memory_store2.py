@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import time
 import uuid
 from dataclasses import dataclass
 from typing import Any
@@ -22,25 +23,46 @@ class DecisionRecord:
 class MemoryStore:
     """
     Local-first memory store backed by SQLite.
+
+    Writes go through the storage engine's writer thread. By default they
+    are write-behind, so callers on the event loop never wait on disk; call
+    `flush()` when a read must see them. Pass `write_behind=False` to wait
+    for each write to commit.
     """
 
-    def __init__(self) -> None:
-        db.migrate()
+    def __init__(self, *, write_behind: bool = True, engine: db.StorageEngine | None = None) -> None:
+        self._engine = engine
+        self.write_behind = write_behind
+
+    @property
+    def engine(self) -> db.StorageEngine:
+        return self._engine if self._engine is not None else db.get_engine()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        if self.write_behind:
+            self.engine.submit(sql, params)
+        else:
+            self.engine.execute(sql, params)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Durability barrier: wait until every queued write is committed."""
+        return self.engine.flush(timeout)
+
+    def close(self) -> None:
+        """Flush pending writes; the engine itself stays open for other users."""
+        self.flush()
 
     def put_event(self, event: Event) -> None:
-        conn = db.connect()
-        try:
-            conn.execute(
-                "INSERT OR REPLACE INTO events(event_id, type, source, payload_json) VALUES (?, ?, ?, ?)",
-                (
-                    event.id,
-                    event.type,
-                    event.source,
-                    json.dumps(event.payload, ensure_ascii=False),
-                ),
-            )
-        finally:
-            conn.close()
+        self._write(
+            "INSERT OR REPLACE INTO events(event_id, type, source, payload_json, created_ts) VALUES (?, ?, ?, ?, ?)",
+            (
+                getattr(event, "id", None) or str(uuid.uuid4()),
+                event.type,
+                event.source,
+                json.dumps(event.payload, ensure_ascii=False),
+                int(time.time()),
+            ),
+        )
 
     def new_decision(self, *, agent: str, workspace: str | None, tool_name: str, args: dict, reason: str) -> DecisionRecord:
         rec = DecisionRecord(
@@ -51,53 +73,42 @@ class MemoryStore:
             args=args,
             reason=reason,
         )
-        conn = db.connect()
-        try:
-            conn.execute(
-                """
-                INSERT INTO agent_decisions(decision_id, agent, workspace, tool_name, args_json, reason)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    rec.decision_id,
-                    rec.agent,
-                    rec.workspace,
-                    rec.tool_name,
-                    json.dumps(rec.args, ensure_ascii=False),
-                    rec.reason,
-                ),
-            )
-        finally:
-            conn.close()
+        self._write(
+            """
+            INSERT INTO agent_decisions(decision_id, agent, workspace, tool_name, args_json, reason, created_ts)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                rec.decision_id,
+                rec.agent,
+                rec.workspace,
+                rec.tool_name,
+                json.dumps(rec.args, ensure_ascii=False),
+                rec.reason,
+                int(time.time()),
+            ),
+        )
         return rec
 
     def mark_decision_executed(self, decision_id: str, result: str = "") -> None:
-        conn = db.connect()
-        try:
-            conn.execute(
-                """
-                UPDATE agent_decisions
-                SET executed=1, execution_result=?
-                WHERE decision_id=?
-                """,
-                (result, decision_id),
-            )
-        finally: 
-            conn.close()
+        self._write(
+            """
+            UPDATE agent_decisions
+            SET executed=1, execution_result=?
+            WHERE decision_id=?
+            """,
+            (result, decision_id),
+        )
 
     def mark_decision_blocked(self, decision_id: str, reason: str) -> None:
-        conn = db.connect()
-        try:
-            conn.execute(
-                """
-                UPDATE agent_decisions
-                SET blocked_by_privacy=1, execution_result=?
-                WHERE decision_id=?
-                """,
-                (reason, decision_id),
-            )
-        finally:
-            conn.close()
+        self._write(
+            """
+            UPDATE agent_decisions
+            SET blocked_by_privacy=1, execution_result=?
+            WHERE decision_id=?
+            """,
+            (reason, decision_id),
+        )
 
 
 memory_store = MemoryStore()
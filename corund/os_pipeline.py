@@ -97,12 +97,11 @@ class OSPipeline:
             priority=35,
             privacy_level="normal",
         )
-        coroutine = self._bus.emit(event)
-
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
-            asyncio.run(coroutine)
+            # No loop in this thread: hand off to the bus's long-lived dispatcher loop.
+            self._bus.post(event)
             return
 
-        loop.create_task(coroutine)
+        loop.create_task(self._bus.emit(event))
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Mapping
+
+from corund import db
+from corund.event_bus import compile_pattern
+
+logger = logging.getLogger(__name__)
+
+DAY = 86_400
+
+# Seconds to keep raw rows, by event type or wildcard pattern ("**" is the fallback).
+DEFAULT_EVENT_TTLS: Dict[str, int] = {
+    "state.**": 7 * DAY,
+    "OS_ACTION_*": 30 * DAY,
+    "**": 90 * DAY,
+}
+DEFAULT_DECISION_TTL = 180 * DAY
+
+
+def ttl_for(event_type: str, ttls: Mapping[str, int]) -> int | None:
+    """TTL for one type: an exact entry wins, then the longest matching pattern."""
+    if event_type in ttls:
+        return ttls[event_type]
+    best = None
+    for pattern, ttl in ttls.items():
+        regex = compile_pattern(pattern)
+        if regex is not None and regex.match(event_type) and (best is None or len(pattern) > len(best[0])):
+            best = (pattern, ttl)
+    return best[1] if best else None
+
+
+def compact(
+    now: float | None = None,
+    *,
+    event_ttls: Mapping[str, int] | None = None,
+    decision_ttl: int | None = DEFAULT_DECISION_TTL,
+    vacuum_pages: int = 1024,
+) -> Dict[str, Any]:
+    """
+    Roll expired rows into the daily aggregate tables and delete them.
+
+    Each event type is handled in its own short write on the engine's writer
+    thread, so queued writes interleave with the pass instead of waiting for
+    all of it. Afterwards up to `vacuum_pages` free pages are returned to
+    the OS with `PRAGMA incremental_vacuum`.
+
+    Returns:
+        Counts of removed events/decisions and vacuumed pages.
+    """
+    now = int(time.time() if now is None else now)
+    ttls = DEFAULT_EVENT_TTLS if event_ttls is None else event_ttls
+    stats = {"events": 0, "decisions": 0, "vacuumed_pages": 0}
+    with db.connection() as conn:
+        types = [row[0] for row in conn.execute("SELECT DISTINCT type FROM events")]
+
+    def _roll_events(conn, event_type: str, cutoff: int) -> int:
+        conn.execute(
+            """
+            INSERT INTO event_daily(day, type, source, count)
+            SELECT date(created_ts, 'unixepoch'), type, source, COUNT(*)
+            FROM events WHERE type = ? AND created_ts < ?
+            GROUP BY 1, 2, 3
+            ON CONFLICT(day, type, source) DO UPDATE SET count = count + excluded.count
+            """,
+            (event_type, cutoff),
+        )
+        return conn.execute("DELETE FROM events WHERE type = ? AND created_ts < ?", (event_type, cutoff)).rowcount
+
+    def _roll_decisions(conn, cutoff: int) -> int:
+        conn.execute(
+            """
+            INSERT INTO decision_daily(day, tool_name, total, executed, blocked)
+            SELECT date(created_ts, 'unixepoch'), tool_name, COUNT(*),
+                   SUM(executed), SUM(blocked_by_privacy)
+            FROM agent_decisions WHERE created_ts < ?
+            GROUP BY 1, 2
+            ON CONFLICT(day, tool_name) DO UPDATE SET
+                total = total + excluded.total,
+                executed = executed + excluded.executed,
+                blocked = blocked + excluded.blocked
+            """,
+            (cutoff,),
+        )
+        return conn.execute("DELETE FROM agent_decisions WHERE created_ts < ?", (cutoff,)).rowcount
+
+    def _vacuum(conn) -> int:
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not free:
+            return 0
+        conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+        return free - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    for event_type in types:
+        ttl = ttl_for(event_type, ttls)
+        if ttl is not None:
+            stats["events"] += db.write(lambda conn: _roll_events(conn, event_type, now - ttl))
+    if decision_ttl is not None:
+        stats["decisions"] = db.write(lambda conn: _roll_decisions(conn, now - decision_ttl))
+    if vacuum_pages > 0:
+        stats["vacuumed_pages"] = db.write(_vacuum)
+    return stats
+
+
+class RetentionWorker:
+    """Daemon thread that runs `compact()` every `interval` seconds."""
+
+    def __init__(self, interval: float = 3600.0, **compact_kwargs: Any) -> None:
+        self.interval = interval
+        self.compact_kwargs = compact_kwargs
+        self.last_stats: Dict[str, Any] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="etherea-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.last_stats = compact(**self.compact_kwargs)
+            except Exception:
+                logger.exception("Retention pass failed")
+            self._stop.wait(self.interval)
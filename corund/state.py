@@ -1,10 +1,14 @@
 from __future__ import annotations
 import time
-from dataclasses import dataclass, field
-from typing import Dict, List, Any
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from corund.event_bus import event_bus
 from corund.event_model import create_event
+from corund.state_history import StateHistory, get_history
+from corund.state_store import StateStore, get_store
 # Import the single source of truth for workspaces
 from corund.workspace_registry import CORE_WORKSPACES
 
@@ -13,6 +17,39 @@ VALID_WORKSPACES = set(CORE_WORKSPACES.keys())
 VALID_ACTIVITY_STATES = {"idle", "active", "flow"}
 VALID_PRIVACY_MODES = {"normal", "strict", "private"}
 
+# Fields covered by batch diffs and rollback.
+BATCH_FIELDS = (
+    "focus_level",
+    "cognitive_load",
+    "activity_state",
+    "current_workspace",
+    "open_documents",
+    "open_pdfs",
+    "open_code_projects",
+    "privacy_mode",
+)
+
+
+def _copy_value(value: Any) -> Any:
+    return list(value) if isinstance(value, list) else value
+
+
+class _StateBatch:
+    """An open `EthereaState.batch()` transaction."""
+
+    def __init__(self, before: Dict[str, Any]) -> None:
+        self.before = before
+        self.field_events: List[Tuple[str, Dict[str, Any], str]] = []
+
+    def touched(self) -> List[str]:
+        """Batched fields changed by setters inside this batch."""
+        return [name for name in self.before if any(event[0] == name for event in self.field_events)]
+
+
+# Open batches of the current task (or thread), keyed by id(state): a batch
+# in one coroutine does not swallow setter calls made by another.
+_BATCHES: ContextVar[Dict[int, _StateBatch]] = ContextVar("etherea_state_batches", default={})
+
 @dataclass
 class EthereaState:
     """
@@ -36,8 +73,36 @@ class EthereaState:
     session_start_time: float = field(default_factory=time.time)
     user_preferences: Dict[str, Any] = field(default_factory=dict)
 
-    async def _emit_state_change(self, event_type: str, payload: Dict[str, Any], source: str):
-        """Helper to create and emit a state change event."""
+    _history: StateHistory | None = field(default=None, init=False, repr=False, compare=False)
+    _store: StateStore | None = field(default=None, init=False, repr=False, compare=False)
+
+    def attach_history(self, history: StateHistory) -> None:
+        """Record a versioned snapshot in `history` after every committed change."""
+        self._history = history
+        history.capture(self)
+
+    def attach_store(self, store: StateStore) -> None:
+        """Mirror committed changes into the `etherea` slice of `store`."""
+        store.register_slice("etherea", EthereaState, initial=self)
+        self._store = store
+
+    def _committed_fields(self, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if event_type == "batch":
+            return {name: change["new"] for name, change in payload["changes"].items()}
+        if event_type in BATCH_FIELDS:
+            return {event_type: getattr(self, event_type)}
+        return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+    def _commit(self, event_type: str, payload: Dict[str, Any]) -> None:
+        """Record a committed change in the attached history and store."""
+        if self._history is not None or self._store is not None:
+            committed = self._committed_fields(event_type, payload)
+            if self._history is not None:
+                self._history.record(committed)
+            if self._store is not None:
+                self._store.update("etherea", **committed)
+
+    async def _publish(self, event_type: str, payload: Dict[str, Any], source: str) -> None:
         full_event_type = f"state.{event_type}.changed"
         event = create_event(
             event_type=full_event_type,
@@ -46,6 +111,15 @@ class EthereaState:
         )
         await event_bus.emit(event)
 
+    async def _emit_state_change(self, event_type: str, payload: Dict[str, Any], source: str):
+        """Helper to create and emit a state change event."""
+        batch = _BATCHES.get().get(id(self))
+        if batch is not None:
+            batch.field_events.append((event_type, payload, source))
+            return
+        self._commit(event_type, payload)
+        await self._publish(event_type, payload, source)
+
     async def set_focus_level(self, level: float, source: str):
         level = max(0.0, min(1.0, level))
         if abs(self.focus_level - level) > 0.001:
@@ -89,6 +163,61 @@ class EthereaState:
     
     # (Similar methods for PDFs and code projects would follow)
 
+    # --- Transactions ---
+
+    @asynccontextmanager
+    async def batch(self, source: str, *, per_field_events: bool = False) -> AsyncIterator["EthereaState"]:
+        """
+        Apply several setter calls as one change.
+
+        Setters inside the block update the state without emitting; on exit a
+        single `state.batch.changed` event carries `{"changes": {field: {"old",
+        "new"}}}`. Setters do not yield to the loop while batching, so other
+        coroutines never observe a half-applied batch unless the block itself
+        awaits something else. An exception restores the previous values and
+        emits nothing. Nested batches join the outermost one.
+
+        The batch belongs to the task that opened it: setters called from
+        other tasks meanwhile commit and emit as usual and are neither part
+        of the diff nor rolled back. History and store record one version
+        per committed batch.
+
+        Args:
+            source: Source recorded on the batch event.
+            per_field_events: Also emit the usual `state.<field>.changed`
+                              events (before the batch event) for listeners
+                              that have not moved to the batch event yet.
+        """
+        open_batches = _BATCHES.get()
+        if id(self) in open_batches:
+            yield self
+            return
+
+        batch = _StateBatch({name: _copy_value(getattr(self, name)) for name in BATCH_FIELDS})
+        token = _BATCHES.set({**open_batches, id(self): batch})
+        try:
+            yield self
+        except BaseException:
+            for name in batch.touched():
+                setattr(self, name, batch.before[name])
+            raise
+        finally:
+            _BATCHES.reset(token)
+
+        changes = {}
+        for name in batch.touched():
+            old = batch.before[name]
+            if getattr(self, name) != old:
+                changes[name] = {"old": old, "new": _copy_value(getattr(self, name))}
+        if not changes:
+            return
+        payload = {"changes": changes}
+        self._commit("batch", payload)
+        if per_field_events:
+            for event_type, field_payload, field_source in batch.field_events:
+                await self._publish(event_type, field_payload, field_source)
+        await self._publish("batch", payload, source)
+
     def get_session_duration(self) -> float:
         return time.time() - self.session_start_time
 
@@ -102,4 +231,6 @@ def get_state() -> EthereaState:
     global _state_instance
     if _state_instance is None:
         _state_instance = EthereaState()
+        _state_instance.attach_history(get_history("etherea"))
+        _state_instance.attach_store(get_store())
     return _state_instance
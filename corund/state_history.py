@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Deque, Dict, Iterable, Iterator, Mapping, Optional
+
+from corund.event_model import to_epoch
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:
+    """Return an immutable view of `value`: dataclasses and dicts become read-only mappings."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return MappingProxyType({f.name: freeze(getattr(value, f.name)) for f in fields(value)})
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, frozenset):
+        return sorted(value, key=str)
+    return str(value)
+
+
+class Snapshot:
+    """
+    One immutable version of a tracked state object.
+
+    `values` maps top-level field names to frozen values. Fields that did not
+    change are the very same objects as in the previous snapshot.
+    """
+
+    __slots__ = ("version", "ts", "values")
+
+    def __init__(self, version: int, ts: float, values: Mapping[str, Any]) -> None:
+        self.version = version
+        self.ts = ts
+        self.values = values
+
+    def __getitem__(self, name: str) -> Any:
+        return self.values[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    def __repr__(self) -> str:
+        return f"Snapshot(version={self.version}, ts={self.ts:.3f}, values={dict(self.values)!r})"
+
+
+class StateHistory:
+    """
+    Bounded, copy-on-write version history for one state object.
+
+    Each change produces a new `Snapshot` whose top-level mapping is copied
+    but whose unchanged field values are shared with the previous version,
+    so memory grows with the volume of changes rather than the state size.
+    The newest `capacity` snapshots stay in memory; older ones are appended
+    to `spill_path` as JSON lines when it is set, and dropped otherwise.
+    """
+
+    def __init__(self, name: str, capacity: int = 1024, spill_path: str | Path | None = None) -> None:
+        self.name = name
+        self._ring: Deque[Snapshot] = deque(maxlen=max(1, capacity))
+        self._spill_path = Path(spill_path) if spill_path else None
+        self._lock = threading.Lock()
+        self._version = 0
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        return self._ring[-1] if self._ring else None
+
+    def record(self, changes: Mapping[str, Any], ts: float | None = None) -> Optional[Snapshot]:
+        """
+        Record changed top-level fields; returns the new snapshot, or None if
+        every value equals the current one.
+        """
+        with self._lock:
+            latest = self._ring[-1] if self._ring else None
+            base = latest.values if latest else _EMPTY
+            updated: Dict[str, Any] | None = None
+            for name, value in changes.items():
+                frozen = freeze(value)
+                if name in base and base[name] == frozen:
+                    continue
+                if updated is None:
+                    updated = dict(base)
+                updated[name] = frozen
+            if updated is None:
+                return None
+            self._version += 1
+            snapshot = Snapshot(self._version, time.time() if ts is None else ts, MappingProxyType(updated))
+            if self._spill_path is not None and len(self._ring) == self._ring.maxlen:
+                self._spill(self._ring[0])
+            self._ring.append(snapshot)
+            return snapshot
+
+    def capture(self, obj: Any, ts: float | None = None) -> Optional[Snapshot]:
+        """Record every dataclass field of `obj` that differs from the latest snapshot."""
+        return self.record(
+            {f.name: getattr(obj, f.name) for f in fields(obj) if not f.name.startswith("_")},
+            ts,
+        )
+
+    def _spill(self, snapshot: Snapshot) -> None:
+        self._spill_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(
+            {"version": snapshot.version, "ts": snapshot.ts, "values": snapshot.values},
+            default=_json_default,
+            ensure_ascii=False,
+        )
+        with open(self._spill_path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    def _from_spill(self, ts: float) -> Optional[Snapshot]:
+        if self._spill_path is None or not self._spill_path.exists():
+            return None
+        found = None
+        with open(self._spill_path, encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                if record["ts"] > ts:
+                    break
+                found = record
+        if found is None:
+            return None
+        return Snapshot(found["version"], found["ts"], MappingProxyType(found["values"]))
+
+    def state_at(self, when: float | str | datetime) -> Optional[Snapshot]:
+        """Snapshot in effect at `when` (epoch seconds, ISO-8601 or datetime)."""
+        ts = to_epoch(when)
+        with self._lock:
+            ring = list(self._ring)
+        if ring and ring[0].ts <= ts:
+            lo, hi = 0, len(ring)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if ring[mid].ts <= ts:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return ring[lo - 1]
+        return self._from_spill(ts)
+
+    def get_version(self, version: int) -> Optional[Snapshot]:
+        with self._lock:
+            for snapshot in self._ring:
+                if snapshot.version == version:
+                    return snapshot
+        return None
+
+    def diff(self, a: Snapshot | int, b: Snapshot | int) -> Dict[str, Dict[str, Any]]:
+        """Fields that differ between two snapshots (or versions) as `{field: {"old", "new"}}`."""
+        old = a if isinstance(a, Snapshot) else self.get_version(a)
+        new = b if isinstance(b, Snapshot) else self.get_version(b)
+        if old is None or new is None:
+            raise KeyError(f"{self.name}: version not in history")
+        return diff(old, new)
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __iter__(self) -> Iterator[Snapshot]:
+        with self._lock:
+            return iter(list(self._ring))
+
+
+def diff(a: Snapshot, b: Snapshot) -> Dict[str, Dict[str, Any]]:
+    """Compare two snapshots; shared (identical) field values are skipped without comparison."""
+    changes: Dict[str, Dict[str, Any]] = {}
+    for name in a.values.keys() | b.values.keys():
+        old, new = a.values.get(name), b.values.get(name)
+        if old is new or old == new:
+            continue
+        changes[name] = {"old": old, "new": new}
+    return changes
+
+
+_histories: Dict[str, StateHistory] = {}
+
+
+def get_history(name: str, **kwargs: Any) -> StateHistory:
+    """Access (creating on first use) the named global history."""
+    history = _histories.get(name)
+    if history is None:
+        history = _histories[name] = StateHistory(name, **kwargs)
+    return history
+
+
+def state_at(when: float | str | datetime, names: Iterable[str] | None = None) -> Dict[str, Optional[Snapshot]]:
+    """Snapshots of every (or the named) global histories at `when`."""
+    selected = names if names is not None else list(_histories)
+    return {name: _histories[name].state_at(when) for name in selected if name in _histories}
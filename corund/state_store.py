@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+from corund.state_history import freeze
+
+
+@dataclass
+class EmotionSlice:
+    """EI signals: the `EIEngine.emotion_vector` plus the avatar's emotion tag."""
+
+    focus: float = 0.5
+    stress: float = 0.2
+    energy: float = 0.5
+    curiosity: float = 0.5
+    flow: float = 0.0
+    emotion_tag: str = "calm"
+
+
+class Selector:
+    """
+    A derived value computed from named store slices.
+
+    The store memoizes each selector on the versions of the slices it reads,
+    so it is only re-run after one of those slices changed.
+    """
+
+    __slots__ = ("fn", "slices", "name")
+
+    def __init__(self, fn: Callable[..., Any], slices: Tuple[str, ...]) -> None:
+        self.fn = fn
+        self.slices = slices
+        self.name = getattr(fn, "__name__", "selector")
+
+    def __call__(self, *values: Mapping[str, Any]) -> Any:
+        return self.fn(*values)
+
+    def __repr__(self) -> str:
+        return f"Selector({self.name}, slices={self.slices})"
+
+
+def selector(*slices: str) -> Callable[[Callable[..., Any]], Selector]:
+    """Decorator: `@selector("emotion", "aurora")` passes those slices positionally."""
+
+    def wrap(fn: Callable[..., Any]) -> Selector:
+        return Selector(fn, slices)
+
+    return wrap
+
+
+@selector("emotion")
+def ei_readout(emotion: Mapping[str, Any]) -> Mapping[str, float]:
+    """Focus, stress and energy at the precision the UI shows them."""
+    return MappingProxyType({key: round(float(emotion[key]), 2) for key in ("focus", "stress", "energy")})
+
+
+@selector("emotion")
+def focus_drifting(emotion: Mapping[str, Any]) -> bool:
+    """Focus is low enough to offer the Focus Canvas."""
+    return emotion["focus"] < 0.25
+
+
+class _Subscription:
+    __slots__ = ("selector", "callback", "last")
+
+    def __init__(self, sel: Selector, callback: Callable[[Any], None], last: Any) -> None:
+        self.selector = sel
+        self.callback = callback
+        self.last = last
+
+
+class StateStore:
+    """
+    Single reactive store for runtime state.
+
+    State lives in named, typed slices whose schema is a dataclass: keys are
+    checked against its fields and values are frozen, so a slice can be read
+    without copying. `update()` bumps a slice's version only when a value
+    actually changed; subscriptions re-run only the selectors that read that
+    slice and call back only when the selector's output changed.
+    Callbacks run synchronously on the updating thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._schemas: Dict[str, Tuple[str, ...]] = {}
+        self._slices: Dict[str, Mapping[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._memo: Dict[Selector, Tuple[Tuple[int, ...], Any]] = {}
+        self._subs: Dict[str, List[_Subscription]] = {}
+
+    def register_slice(self, name: str, schema: type, initial: Any = None) -> None:
+        """Add a slice typed by dataclass `schema`; a no-op if it already exists."""
+        with self._lock:
+            if name in self._schemas:
+                return
+            keys = tuple(f.name for f in fields(schema) if not f.name.startswith("_"))
+            source = initial if initial is not None else schema()
+            self._schemas[name] = keys
+            self._slices[name] = MappingProxyType({key: freeze(getattr(source, key)) for key in keys})
+            self._versions[name] = 0
+            self._subs.setdefault(name, [])
+
+    def has_slice(self, name: str) -> bool:
+        return name in self._schemas
+
+    def get(self, name: str) -> Mapping[str, Any]:
+        """Read-only view of one slice."""
+        return self._slices[name]
+
+    def version(self, name: str) -> int:
+        return self._versions[name]
+
+    def update(self, name: str, **changes: Any) -> bool:
+        """
+        Apply field changes to one slice.
+
+        Returns:
+            True if any value changed.
+
+        Raises:
+            KeyError: for an unknown slice or a field the slice schema lacks.
+        """
+        with self._lock:
+            keys = self._schemas[name]
+            current = self._slices[name]
+            updated: Dict[str, Any] | None = None
+            for key, value in changes.items():
+                if key not in keys:
+                    raise KeyError(f"Slice '{name}' has no field '{key}'")
+                frozen = freeze(value)
+                if current[key] == frozen:
+                    continue
+                if updated is None:
+                    updated = dict(current)
+                updated[key] = frozen
+            if updated is None:
+                return False
+            self._slices[name] = MappingProxyType(updated)
+            self._versions[name] += 1
+            notify = []
+            for sub in self._subs[name]:
+                value = self._select_locked(sub.selector)
+                if value != sub.last:
+                    sub.last = value
+                    notify.append((sub.callback, value))
+        for callback, value in notify:
+            callback(value)
+        return True
+
+    def _select_locked(self, sel: Selector) -> Any:
+        versions = tuple(self._versions[name] for name in sel.slices)
+        memo = self._memo.get(sel)
+        if memo is not None and memo[0] == versions:
+            return memo[1]
+        value = sel(*(self._slices[name] for name in sel.slices))
+        self._memo[sel] = (versions, value)
+        return value
+
+    def select(self, sel: Selector) -> Any:
+        """Current value of `sel`, recomputed only if a slice it reads changed."""
+        with self._lock:
+            return self._select_locked(sel)
+
+    def subscribe(
+        self,
+        sel: Selector,
+        callback: Callable[[Any], None],
+        *,
+        fire_immediately: bool = False,
+    ) -> Callable[[], None]:
+        """
+        Call `callback(value)` whenever the output of `sel` changes.
+
+        Returns:
+            A function that removes the subscription.
+        """
+        with self._lock:
+            sub = _Subscription(sel, callback, self._select_locked(sel))
+            for name in sel.slices:
+                self._subs[name].append(sub)
+            current = sub.last
+        if fire_immediately:
+            callback(current)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                for name in sel.slices:
+                    if sub in self._subs[name]:
+                        self._subs[name].remove(sub)
+
+        return unsubscribe
+
+
+_store_instance: StateStore | None = None
+
+
+def get_store() -> StateStore:
+    """Access the global StateStore singleton instance."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = StateStore()
+        _store_instance.register_slice("emotion", EmotionSlice)
+    return _store_instance
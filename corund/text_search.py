@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from corund import db
+from corund.event_model import to_epoch
+
+KINDS = ("memories", "events", "decisions")
+
+
+def search_text(
+    query: str,
+    *,
+    kinds: Iterable[str] = KINDS,
+    since: float | str | datetime | None = None,
+    limit: int = 20,
+    database=None,
+) -> List[Dict[str, Any]]:
+    """
+    Ranked full-text search across memories, events and agent decisions.
+
+    Memories are searched through `Database`, events and decisions through
+    `corund.db`; all three are FTS5-indexed and each hit carries `kind`,
+    `id`, `type`, a highlighted `snippet`, its bm25 `rank` (lower is better)
+    and `created_ts`. `since` accepts epoch seconds, ISO-8601 or a datetime.
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown search kinds: {sorted(unknown)}")
+    since_ts = to_epoch(since)
+    hits: List[Dict[str, Any]] = []
+    if "memories" in kinds:
+        if database is None:
+            from corund.database import db as database
+        hits += database.search_text(query, since=since_ts, limit=limit)
+    if kinds & {"events", "decisions"}:
+        hits += db.search_text(query, kinds=kinds, since=since_ts, limit=limit)
+    hits.sort(key=lambda hit: hit["rank"])
+    return hits[:limit]
@@ -13,11 +13,20 @@ class ToolRouter:
     It maps a tool name to an executable function.
     """
 
+    # Seconds a tool may run before the bus cancels it and records a dead letter.
+    TOOL_TIMEOUT = 30.0
+
     def __init__(self):
         self._tool_registry: Dict[str, Tool] = {}
         print("ToolRouter initialized.")
-        # Subscribe to decision events from agents/policy engine
-        event_bus.subscribe(self._handle_decision, event_type="agent.decision")
+        # Subscribe to decision events from agents/policy engine. Tools run in the
+        # background so the emitting PolicyEngine loop is never held up by them.
+        event_bus.subscribe(
+            self._handle_decision,
+            event_type="agent.decision",
+            timeout=self.TOOL_TIMEOUT,
+            background=True,
+        )
 
     def register_tool(self, name: str, func: Tool):
         """
@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # optional on Termux/CI
+
+logger = logging.getLogger(__name__)
+_warned_dims: set = set()
+
+
+def normalize(vectors):
+    """Scale rows (or a single vector) to unit length; zero vectors stay zero."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / (norms + 1e-9)
+
+
+def top_k(scores, k: int):
+    """Indices of the `k` highest scores, best first (ties keep row order)."""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates.sort()
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _unit_rows(row_ids: Iterable[int], vectors: Iterable, dim: int | None) -> Tuple[int | None, List[int], "np.ndarray | None"]:
+    """Keep vectors matching `dim` (the first one fixes it) and normalize them."""
+    kept_ids, kept = [], []
+    for row_id, vector in zip(row_ids, vectors):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        if dim is None:
+            dim = len(vector)
+        if len(vector) == dim:
+            kept_ids.append(row_id)
+            kept.append(vector)
+        elif (len(vector), dim) not in _warned_dims:
+            _warned_dims.add((len(vector), dim))
+            logger.warning(
+                "Skipping %d-d embeddings (e.g. memory %s): the index holds %d-d vectors; "
+                "rebuild the embedding sidecar to switch embedders", len(vector), row_id, dim,
+            )
+    return dim, kept_ids, normalize(np.stack(kept)) if kept else None
+
+
+def _empty_result():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+# Sidecar header: magic, embedding dimension, owner token.
+_HEADER = struct.Struct("<4sIQ")
+_MAGIC = b"EMB8"
+# Packed (memory id, scale) entries of the `.ids` file.
+_ENTRY = np.dtype([("id", "<i8"), ("scale", "<f4")]) if np is not None else None
+_CHUNK = 16384
+
+
+class QuantizedMatrix:
+    """
+    Append-only int8 embedding sidecar, memory-mapped for search.
+
+    `path` holds a small header and one int8 row per unit-length embedding
+    (quantized with a per-row scale); `<path>.ids` holds the matching
+    memory ids and scales. Only ids and scales live on the heap: rows are
+    read through `np.memmap`, a quarter of the float32 footprint, and are
+    never copied out of SQLite. Scores carry int8 rounding error, so
+    callers should rescore their top candidates at full precision.
+    Torn tails from an interrupted append are dropped on open, and a
+    sidecar whose header carries a different `token` (it belonged to
+    another database) is discarded.
+    """
+
+    def __init__(self, path: str | Path, dim: int | None = None, *, token: int = 0) -> None:
+        self.path = Path(path)
+        self._ids_path = self.path.with_name(self.path.name + ".ids")
+        self.dim = dim
+        self.token = token
+        self._ids = np.empty(0, dtype=np.int64)
+        self._scales = np.empty(0, dtype=np.float32)
+        self._count = 0
+        self._map = None
+        self._data = None
+        self._index = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if self.path.exists() and self.path.stat().st_size >= _HEADER.size:
+            with open(self.path, "rb") as handle:
+                magic, dim, token = _HEADER.unpack(handle.read(_HEADER.size))
+            if magic == _MAGIC and dim > 0 and token == self.token and self.dim in (None, dim):
+                self.dim = dim
+                rows = (self.path.stat().st_size - _HEADER.size) // dim
+                raw = self._ids_path.read_bytes() if self._ids_path.exists() else b""
+                entries = np.frombuffer(raw, dtype=_ENTRY, count=len(raw) // _ENTRY.itemsize)
+                count = min(rows, len(entries))
+                self._ids = entries["id"][:count].copy()
+                self._scales = entries["scale"][:count].copy()
+                self._count = count
+                self._truncate()
+                return
+        for stale in (self.path, self._ids_path):
+            if stale.exists():
+                stale.unlink()
+
+    def _truncate(self) -> None:
+        with open(self.path, "r+b") as handle:
+            handle.truncate(_HEADER.size + self._count * self.dim)
+        with open(self._ids_path, "ab") as handle:
+            handle.truncate(self._count * _ENTRY.itemsize)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def ids(self):
+        return self._ids[: self._count]
+
+    def _mapped(self):
+        if self._map is None or len(self._map) < self._count:
+            if self._data is not None:
+                self._data.flush()
+            self._map = np.memmap(self.path, dtype=np.int8, mode="r", offset=_HEADER.size, shape=(self._count, self.dim))
+        return self._map
+
+    def rows(self, index):
+        """Dequantized vectors at positions `index` (a slice or index array)."""
+        return self._mapped()[index].astype(np.float32) * self._scales[: self._count][index, None]
+
+    def scores(self, unit, index=None):
+        """Approximate cosine similarity of `unit` with every row, or the rows at `index`."""
+        mapped, scales = self._mapped(), self._scales[: self._count]
+        if index is not None:
+            return (mapped[index].astype(np.float32) @ unit) * scales[index]
+        out = np.empty(self._count, dtype=np.float32)
+        for start in range(0, self._count, _CHUNK):
+            stop = min(start + _CHUNK, self._count)
+            out[start:stop] = (mapped[start:stop].astype(np.float32) @ unit) * scales[start:stop]
+        return out
+
+    def add(self, row_id: int, vector) -> bool:
+        """Append one embedding; returns False if its dimension does not match."""
+        return self.add_many([row_id], [vector]) == 1
+
+    def add_many(self, row_ids: Iterable[int], vectors: Iterable) -> int:
+        """Quantize and append embeddings; returns how many were kept."""
+        self.dim, kept_ids, block = _unit_rows(row_ids, vectors, self.dim)
+        if block is None:
+            return 0
+        scales = (np.abs(block).max(axis=1) / 127.0).astype(np.float32)
+        safe = np.where(scales > 0, scales, 1.0)[:, None]
+        quantized = np.clip(np.rint(block / safe), -127, 127).astype(np.int8)
+        entries = np.empty(len(kept_ids), dtype=_ENTRY)
+        entries["id"] = kept_ids
+        entries["scale"] = scales
+        with self._lock:
+            if self._data is None:
+                new = not self.path.exists()
+                self._data = open(self.path, "ab")
+                self._index = open(self._ids_path, "ab")
+                if new:
+                    self._data.write(_HEADER.pack(_MAGIC, self.dim, self.token))
+            self._data.write(quantized.tobytes())
+            self._index.write(entries.tobytes())
+            self._data.flush()
+            self._index.flush()
+            self._ids = np.concatenate([self._ids[: self._count], np.asarray(kept_ids, dtype=np.int64)])
+            self._scales = np.concatenate([self._scales[: self._count], scales])
+            self._count += len(kept_ids)
+        return len(kept_ids)
+
+    def search(self, query, k: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Row ids and approximate cosine similarities of the `k` closest embeddings."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        with self._lock:
+            if self._count == 0 or len(query) != self.dim:
+                return _empty_result()
+            scores = self.scores(normalize(query))
+            order = top_k(scores, k)
+            return self._ids[order].copy(), scores[order]
+
+    def compact(self, keep) -> int:
+        """
+        Rewrite the sidecar with only the rows where boolean mask `keep` is
+        true; returns how many were dropped.
+
+        The old data file is removed before the new files are moved into
+        place, so a crash part-way leaves no sidecar (rebuilt by the owner)
+        rather than ids that no longer match their rows.
+        """
+        keep = np.asarray(keep, dtype=bool)
+        with self._lock:
+            dropped = self._count - int(keep.sum())
+            if dropped == 0:
+                return 0
+            mapped = self._mapped()
+            tmp_data = self.path.with_name(self.path.name + ".tmp")
+            tmp_ids = self._ids_path.with_name(self._ids_path.name + ".tmp")
+            with open(tmp_data, "wb") as handle:
+                handle.write(_HEADER.pack(_MAGIC, self.dim, self.token))
+                for start in range(0, self._count, _CHUNK):
+                    stop = min(start + _CHUNK, self._count)
+                    handle.write(np.ascontiguousarray(mapped[start:stop][keep[start:stop]]).tobytes())
+            entries = np.empty(self._count - dropped, dtype=_ENTRY)
+            entries["id"] = self._ids[: self._count][keep]
+            entries["scale"] = self._scales[: self._count][keep]
+            tmp_ids.write_bytes(entries.tobytes())
+            for handle in (self._data, self._index):
+                if handle is not None:
+                    handle.close()
+            self._data = self._index = self._map = None
+            os.unlink(self.path)
+            os.replace(tmp_ids, self._ids_path)
+            os.replace(tmp_data, self.path)
+            self._ids = entries["id"].copy()
+            self._scales = entries["scale"].copy()
+            self._count = len(entries)
+            return dropped
+
+    def close(self) -> None:
+        with self._lock:
+            for handle in (self._data, self._index):
+                if handle is not None:
+                    handle.close()
+            self._data = self._index = self._map = None
+
+
+def kmeans(vectors, k: int, *, iters: int = 10, seed: int = 0):
+    """Spherical k-means on unit-length rows; returns `k` unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters with random rows so every list is used.
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate index over a `QuantizedMatrix`.
+
+    Rows are assigned to the nearest of `nlist` k-means centroids; a search
+    scores the query against the centroids and only scans the rows of the
+    `nprobe` closest lists. Rows appended to the matrix after training are
+    assigned incrementally, and the centroids are retrained once the matrix
+    has grown by `rebuild_factor`. Below `min_train` rows search is exact.
+    Centroids and assignments can be saved to an `.npz` file so a restart
+    neither re-clusters nor re-assigns; `needs_save` turns true after a
+    rebuild or once `save_every` rows were assigned since the last save.
+    """
+
+    def __init__(
+        self,
+        matrix: QuantizedMatrix,
+        *,
+        nlist: int | None = None,
+        nprobe: int = 8,
+        min_train: int = 2048,
+        rebuild_factor: float = 2.0,
+        save_every: int = 1024,
+    ) -> None:
+        self.matrix = matrix
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.rebuild_factor = rebuild_factor
+        self.centroids = None
+        self._assign = np.empty(0, dtype=np.int32)
+        self.save_every = save_every
+        self._trained_rows = 0
+        self._saved = (0, 0)  # (trained rows, assigned rows) at the last save
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def needs_save(self) -> bool:
+        trained_rows, assigned = self._saved
+        return self.trained and (
+            trained_rows != self._trained_rows or len(self._assign) - assigned >= self.save_every
+        )
+
+    def _lists_for(self, n: int) -> int:
+        return self.nlist or int(min(4096, max(16, np.sqrt(n))))
+
+    def rebuild(self, *, seed: int = 0) -> None:
+        """Retrain centroids on the current rows and reassign every row."""
+        n = len(self.matrix)
+        if n == 0:
+            return
+        k = min(self._lists_for(n), n)
+        if n > 256 * k:
+            rng = np.random.default_rng(seed)
+            sample = self.matrix.rows(np.sort(rng.choice(n, size=256 * k, replace=False)))
+        else:
+            sample = self.matrix.rows(slice(0, n))
+        self.centroids = kmeans(sample, k, seed=seed)
+        self._assign = self._nearest(0, n)
+        self._trained_rows = n
+
+    def _nearest(self, start: int, stop: int):
+        assign = np.empty(stop - start, dtype=np.int32)
+        for lo in range(start, stop, 8192):
+            hi = min(lo + 8192, stop)
+            assign[lo - start : hi - start] = np.argmax(self.matrix.rows(slice(lo, hi)) @ self.centroids.T, axis=1)
+        return assign
+
+    def sync(self) -> None:
+        """Assign rows added since the last call, training or retraining as needed."""
+        n = len(self.matrix)
+        if not self.trained:
+            if n >= self.min_train:
+                self.rebuild()
+            return
+        if n >= self._trained_rows * self.rebuild_factor:
+            self.rebuild()
+            return
+        if n > len(self._assign):
+            tail = self._nearest(len(self._assign), n)
+            self._assign = np.concatenate([self._assign, tail])
+
+    def search(self, query, k: int, *, nprobe: int | None = None, exact: bool = False):
+        """Row ids and cosine similarities of (approximately) the `k` closest rows."""
+        with self._lock:
+            self.sync()
+            if exact or not self.trained:
+                return self.matrix.search(query, k)
+            query = np.asarray(query, dtype=np.float32).ravel()
+            if len(query) != self.matrix.dim:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            unit = normalize(query)
+            probes = top_k(self.centroids @ unit, min(nprobe or self.nprobe, len(self.centroids)))
+            candidates = np.flatnonzero(np.isin(self._assign, probes))
+            scores = self.matrix.scores(unit, candidates)
+            order = top_k(scores, k)
+            return self.matrix.ids[candidates[order]], scores[order]
+
+    def compact(self, keep) -> int:
+        """
+        Drop the matrix rows where boolean mask `keep` is false, keeping
+        the trained centroids and the assignments of the remaining rows.
+        """
+        keep = np.asarray(keep, dtype=bool)
+        with self._lock:
+            assigned = len(self._assign)
+            self._assign = self._assign[keep[:assigned]]
+            self._trained_rows = int(keep[: self._trained_rows].sum())
+            dropped = self.matrix.compact(keep)
+            if dropped:
+                self._saved = (-1, 0)  # the saved ids no longer match
+            return dropped
+
+    def save(self, path: str) -> None:
+        """Write centroids and assignments to `path` atomically."""
+        with self._lock:
+            if not self.trained:
+                return
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as handle:
+                np.savez(
+                    handle,
+                    centroids=self.centroids,
+                    assign=self._assign,
+                    ids=self.matrix.ids[: len(self._assign)],
+                    trained_rows=np.int64(self._trained_rows),
+                )
+            os.replace(tmp, path)
+            self._saved = (self._trained_rows, len(self._assign))
+
+    def load(self, path: str) -> bool:
+        """Restore a saved index; False (and untrained) if it does not match the matrix."""
+        try:
+            with np.load(path) as data:
+                centroids, assign, ids = data["centroids"], data["assign"], data["ids"]
+                trained_rows = int(data["trained_rows"])
+        except (OSError, KeyError, ValueError):
+            return False
+        if (
+            centroids.shape[1] != self.matrix.dim
+            or len(ids) > len(self.matrix)
+            or not np.array_equal(ids, self.matrix.ids[: len(ids)])
+        ):
+            return False
+        with self._lock:
+            self.centroids, self._assign, self._trained_rows = centroids, assign, trained_rows
+            self._saved = (trained_rows, len(assign))
+        return True
@@ -27,8 +27,7 @@ class SafeWorkspaceFileAgent:
         self.allowed_roots = self._load_allowed_roots()
 
     def _load_allowed_roots(self) -> List[Path]:
-        profile = db.get_profile_context() or {}
-        raw = profile.get("workspace_allowed_roots")
+        raw = db.get_preference("workspace_allowed_roots")
         roots: List[Path] = []
         if raw:
             try:
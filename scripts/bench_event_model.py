@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: compact slot-based Event vs. the previous frozen dataclass.
+
+Usage: python scripts/bench_event_model.py [iterations]
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Dict
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from corund.event_model import create_event
+
+
+@dataclass(frozen=True)
+class LegacyEvent:
+    """The Event shape used before the slot-based model."""
+
+    type: str
+    timestamp: str
+    source: str
+    payload: Dict[str, Any]
+    priority: int = 50
+    privacy_level: str = "normal"
+
+
+def legacy_create_event(event_type: str, source: str, payload: Dict[str, Any]) -> LegacyEvent:
+    return LegacyEvent(
+        type=event_type,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        source=source,
+        payload=payload,
+    )
+
+
+def _bytes_per_event(factory, n: int = 10_000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    events = [factory("state.focus_level.changed", "bench", {"value": 0.5}) for _ in range(n)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del events
+    return total / n
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    cases = {
+        "legacy dataclass": lambda: legacy_create_event("state.focus_level.changed", "bench", {"value": 0.5}),
+        "slot Event": lambda: create_event("state.focus_level.changed", "bench", {"value": 0.5}),
+        "slot Event + timestamp": lambda: create_event("state.focus_level.changed", "bench", {"value": 0.5}).timestamp,
+    }
+    print(f"{'case':<26}{'ns/event':>12}")
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=iterations, repeat=5))
+        print(f"{name:<26}{best / iterations * 1e9:>12.0f}")
+
+    print()
+    print(f"{'case':<26}{'bytes/event':>12}")
+    print(f"{'legacy dataclass':<26}{_bytes_per_event(legacy_create_event):>12.0f}")
+    print(f"{'slot Event':<26}{_bytes_per_event(lambda t, s, p: create_event(t, s, p)):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ def main() -> None:
     def record(event):
         events.append(event)
 
-    event_bus.subscribe(record)
+    event_bus.subscribe(record, "OS_ACTION_*")
 
     pipeline = OSPipeline(OSAdapter(dry_run=True))
     overrides = OSOverrides()
@@ -32,6 +32,7 @@ def main() -> None:
     overrides.dnd = False
     print(pipeline.handle_intent("REVEAL_PATH", {"path": "README.md", "confirm": True}, overrides=overrides))
 
+    event_bus.wait_posted(timeout=2)
     print("\n== Events ==")
     for event in events:
         print(f"{event.type} {event.payload}")
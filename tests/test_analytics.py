@@ -0,0 +1,76 @@
+import json
+
+from corund import analytics, db
+from corund.memory_store2 import MemoryStore
+from corund.retention import compact
+
+DAY = 86_400
+
+
+def _event(conn, event_id, event_type, ts):
+    conn.execute(
+        "INSERT INTO events(event_id, type, source, payload_json, created_ts) VALUES (?, ?, 'test', '{}', ?)",
+        (event_id, event_type, ts),
+    )
+
+
+def test_rollups_follow_writes_and_survive_retention(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    day = 20_000 * DAY
+
+    def _seed(conn):
+        for n in range(6):
+            _event(conn, f"f{n}", "state.focus_level.changed", day + n * 600)
+        _event(conn, "o1", "OS_ACTION_STARTED", day + 3 * 3600)
+        _event(conn, "o2", "OS_ACTION_STARTED", day + DAY + 10)
+
+    db.write(_seed)
+    store = MemoryStore(write_behind=False)
+    recs = [
+        store.new_decision(agent="a", workspace=ws, tool_name=tool, args={}, reason="r")
+        for ws, tool in [("study", "open_app"), ("study", "open_app"), ("study", "ui.set_density"), (None, "open_app")]
+    ]
+    store.mark_decision_executed(recs[0].decision_id, "ok")
+    store.mark_decision_blocked(recs[1].decision_id, "privacy")
+    store.mark_decision_executed(recs[3].decision_id, "ok")
+
+    assert analytics.event_counts(day, day + DAY, bucket="hour") == [
+        {"bucket": day, "type": "state.focus_level.changed", "count": 6},
+        {"bucket": day + 3 * 3600, "type": "OS_ACTION_STARTED", "count": 1},
+    ]
+    assert [row["count"] for row in analytics.event_counts(day, bucket="day", types=["OS_ACTION_STARTED"])] == [1, 1]
+    assert analytics.top_event_types(day, limit=1) == [("state.focus_level.changed", 6)]
+
+    by_tool = analytics.decision_stats(bucket=None, group_by=("workspace", "tool_name"))
+    assert [(r["workspace"], r["tool_name"], r["total"], r["executed"], r["blocked"]) for r in by_tool] == [
+        ("", "open_app", 1, 1, 0),
+        ("study", "open_app", 2, 1, 1),
+        ("study", "ui.set_density", 1, 0, 0),
+    ]
+    [overall] = analytics.decision_stats(bucket=None, group_by=())
+    assert overall["success_ratio"] == 0.5
+
+    # Compaction removes raw rows but not their rollups.
+    compact(day + 30 * DAY, event_ttls={"**": DAY}, decision_ttl=None, vacuum_pages=0)
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+    assert sum(row["count"] for row in analytics.event_counts(bucket="day")) == 8
+
+    summary = analytics.session_summary(day)
+    assert summary["events"] == 8
+    assert summary["decisions"]["blocked"] == 1
+    text = analytics.format_summary(summary)
+    assert "Decisions: 4 total, 2 executed (50%), 1 blocked" in text
+    db.get_engine().close()
+
+
+def test_summary_subcommand_prints_json(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    db.execute("INSERT INTO events(event_id, type, source, payload_json) VALUES ('e1', 'voice', 'mic', '{}')")
+
+    assert analytics.main(["summary", "--hours", "1", "--json"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert out["events"] == 1
+    assert out["top_event_types"] == [["voice", 1]]
+    assert out["decisions"]["success_ratio"] is None
+    db.get_engine().close()
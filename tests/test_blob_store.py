@@ -0,0 +1,73 @@
+import base64
+
+from corund.blob_store import BlobStore
+from corund.database import Database
+from corund.db import StorageEngine
+from corund.memory_store import MemoryStore
+
+
+def test_identical_content_is_stored_once_and_refcounted(tmp_path):
+    engine = StorageEngine(tmp_path / "etherea.sqlite3")
+    store = BlobStore(tmp_path / "blobs", engine=engine)
+    payload = b"\x89PNG" + bytes(range(256)) * 512
+    first = store.put(payload)
+    second = store.put_stream(payload[i : i + 1000] for i in range(0, len(payload), 1000))
+
+    assert first == second
+    assert store.refcount(first) == 2
+    assert store.read(first) == payload
+    assert b"".join(store.iter_chunks(first, chunk_size=4096)) == payload
+    assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 1
+
+    assert store.decref(first) == 1
+    assert store.exists(first)
+    assert store.decref(first) == 0
+    assert not store.exists(first)
+    engine.close()
+
+
+def test_images_are_kept_as_hashes_in_preferences(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.db"))
+    memory = MemoryStore(blobs=BlobStore(tmp_path / "blobs", engine=database.engine))
+    memory.db = database
+    image = b"GIF89a" + b"\x00" * 4096
+    database.set_preference("img_avatar", base64.b64encode(image).decode("utf-8"))
+
+    assert memory.load_image("avatar") == image
+    ref = database.get_preference("img_avatar")
+    assert memory.blobs.is_ref(ref)
+    assert memory.load_image("avatar") == image
+
+    # Saving the same image again under the same key keeps a single reference.
+    memory._set_image_ref("avatar", memory.blobs.put(image))
+    assert memory.blobs.refcount(ref) == 1
+
+    memory._set_image_ref("avatar", memory.blobs.put(b"other"))
+    assert not memory.blobs.exists(ref)
+    assert memory.load_image("missing") is None
+    database.close()
+
+
+def test_legacy_images_are_migrated_eagerly(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.db"))
+    memory = MemoryStore(blobs=BlobStore(tmp_path / "blobs", engine=database.engine))
+    memory.db = database
+    for key in ("avatar", "wallpaper"):
+        database.set_preference(f"img_{key}", base64.b64encode(key.encode()).decode("utf-8"))
+    database.set_preference("img_broken", "not base64!")
+
+    assert memory.migrate_legacy_images() == 2
+    assert memory.migrate_legacy_images() == 0
+    ref = database.get_preference("img_wallpaper")
+    assert memory.blobs.is_ref(ref) and memory.blobs.read(ref) == b"wallpaper"
+    database.close()
+
+
+def test_refcounts_live_in_the_engine(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.db"))
+    store = BlobStore(tmp_path / "blobs", engine=database.engine)
+    ref = store.put(b"avatar")
+    with database.engine.read() as conn:
+        assert conn.execute("SELECT refcount FROM blobs WHERE digest = ?", (ref,)).fetchone() == (1,)
+    assert not list((tmp_path / "blobs").glob("*.sqlite3"))
+    database.close()
@@ -0,0 +1,189 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from corund import db
+from corund.db import BatchWriter, ConnectionPool
+
+
+def test_pool_reuses_configured_connections(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.sqlite3", size=2)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    for n in range(20):
+        with pool.connection() as conn:
+            conn.execute("INSERT INTO t VALUES (?)", (n,))
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 20
+        with pool.connection() as nested:
+            assert nested is conn
+
+    stats = pool.stats()
+    assert stats["open"] == 1
+    assert stats["acquires"] == 22
+    assert stats["in_use"] == 0
+    pool.close()
+
+
+def test_pool_bounds_concurrency_and_records_waits(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.sqlite3", size=1)
+    held = threading.Event()
+
+    def _hold():
+        with pool.connection():
+            held.set()
+            time.sleep(0.05)
+
+    worker = threading.Thread(target=_hold)
+    worker.start()
+    held.wait()
+    with pool.connection():
+        pass
+    worker.join()
+
+    stats = pool.stats()
+    assert stats["open"] == 1
+    assert stats["waits"] == 1
+    assert stats["wait_ms_max"] > 0
+
+    errors = []
+
+    def _borrow():
+        try:
+            with pool.connection(timeout=0.01):
+                pass
+        except TimeoutError as exc:
+            errors.append(exc)
+
+    with pool.connection():
+        blocker = threading.Thread(target=_borrow)
+        blocker.start()
+        blocker.join()
+    assert len(errors) == 1
+    pool.close()
+
+
+def test_memory_store_logs_decisions_through_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    from corund.memory_store2 import MemoryStore
+
+    store = MemoryStore()
+    rec = store.new_decision(agent="a", workspace=None, tool_name="open_app", args={"x": 1}, reason="r")
+    store.mark_decision_executed(rec.decision_id, "ok")
+    assert store.flush(timeout=5)
+
+    with db.connection() as conn:
+        row = conn.execute(
+            "SELECT executed, execution_result FROM agent_decisions WHERE decision_id=?", (rec.decision_id,)
+        ).fetchone()
+    assert row == (1, "ok")
+    store.close()
+    db.get_engine().close()
+
+
+def test_batch_writer_groups_rows_into_few_transactions(tmp_path):
+    path = tmp_path / "pool.sqlite3"
+    pool = ConnectionPool(path, size=2)
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER PRIMARY KEY)")
+    writer = BatchWriter(path, max_batch=64, max_latency=0.5)
+    for n in range(200):
+        writer.submit("INSERT INTO t VALUES (?)", (n,))
+    writer.submit("INSERT INTO t VALUES (?)", (5,))  # duplicate key: dropped alone
+    assert writer.flush(timeout=5)
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 200
+    stats = writer.stats()
+    assert stats["written"] == 200
+    assert stats["errors"] == 1
+    assert stats["batches"] <= 5
+    writer.close()
+    pool.close()
+
+
+def test_batch_writer_calls_return_results_and_fail_alone(tmp_path):
+    path = tmp_path / "pool.sqlite3"
+    writer = BatchWriter(path)
+    writer.call(lambda conn: conn.execute("CREATE TABLE t (x INTEGER PRIMARY KEY)")).result(5)
+    writer.submit("INSERT INTO t VALUES (?)", (1,))
+    failing = writer.call(lambda conn: conn.execute("INSERT INTO t VALUES (1)"))
+    rowid = writer.call(lambda conn: conn.execute("INSERT INTO t VALUES (2)").lastrowid).result(5)
+    assert rowid == 2
+    with pytest.raises(sqlite3.IntegrityError):
+        failing.result(5)
+    assert writer.call(lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]).result(5) == 2
+    writer.close()
+
+
+def test_batch_writer_applies_backpressure(tmp_path):
+    writer = BatchWriter(tmp_path / "pool.sqlite3", max_batch=1, max_pending=2)
+    writer.call(lambda conn: conn.execute("CREATE TABLE t (x INTEGER)")).result(5)
+    release = threading.Event()
+    # Park the writer thread inside a call so the queue cannot drain.
+    writer.call(lambda conn: release.wait(5))
+    errors = []
+    for n in range(6):
+        try:
+            writer.submit("INSERT INTO t VALUES (?)", (n,), timeout=0.01)
+        except TimeoutError as exc:
+            errors.append(exc)
+    assert errors
+    release.set()
+    writer.close(timeout=5)
+    assert writer.stats()["pending"] == 0
+
+
+def test_batch_writer_flush_after_close_returns(tmp_path):
+    writer = BatchWriter(tmp_path / "pool.sqlite3")
+    writer.submit("CREATE TABLE t (x INTEGER)")
+    writer.close(timeout=5)
+    results = []
+    flusher = threading.Thread(target=lambda: results.append(writer.flush()), daemon=True)
+    flusher.start()
+    flusher.join(5)
+    assert results == [True]
+
+
+def test_engine_reads_are_read_only_and_imports_legacy_db(tmp_path):
+    legacy = sqlite3.connect(tmp_path / "etherea.db")
+    legacy.execute("CREATE TABLE memories (id INTEGER PRIMARY KEY, content TEXT, type TEXT, embedding BLOB, created_at DATETIME)")
+    legacy.execute("CREATE TABLE user_profile (key TEXT PRIMARY KEY, value TEXT)")
+    legacy.execute("INSERT INTO memories VALUES (7, 'old memory', 'general', NULL, '2024-01-01 00:00:00')")
+    legacy.execute("INSERT INTO user_profile VALUES ('theme', 'dark')")
+    legacy.commit()
+    legacy.close()
+
+    engine = db.StorageEngine(tmp_path / "etherea.sqlite3", legacy_path=tmp_path / "etherea.db")
+    with engine.read() as conn:
+        assert conn.execute("SELECT id, content FROM memories").fetchall() == [(7, "old memory")]
+        assert conn.execute("SELECT value FROM user_profile").fetchone() == ("dark",)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM memories")
+    assert engine.execute("INSERT INTO user_profile VALUES ('lang', 'en')") > 0
+    engine.close()
+
+    # The import runs once; later edits to the legacy file are not copied again.
+    legacy = sqlite3.connect(tmp_path / "etherea.db")
+    legacy.execute("INSERT INTO user_profile VALUES ('late', 'x')")
+    legacy.commit()
+    legacy.close()
+    engine = db.StorageEngine(tmp_path / "etherea.sqlite3", legacy_path=tmp_path / "etherea.db")
+    with engine.read() as conn:
+        assert sorted(r[0] for r in conn.execute("SELECT key FROM user_profile")) == ["lang", "theme"]
+    engine.close()
+
+
+def test_memory_store_synchronous_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    from corund.memory_store2 import MemoryStore
+
+    store = MemoryStore(write_behind=False)
+    rec = store.new_decision(agent="a", workspace=None, tool_name="t", args={}, reason="r")
+    store.mark_decision_blocked(rec.decision_id, "privacy")
+    with db.connection() as conn:
+        assert conn.execute("SELECT blocked_by_privacy FROM agent_decisions").fetchone() == (1,)
+    db.get_engine().close()
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from corund.ei_engine import EIEngine
+
+
+def _polled(vector, flow, seconds, tick=0.05):
+    """The former fixed-rate loop, stepped `seconds / tick` times."""
+    clamp = lambda x: max(0.0, min(1.0, x))
+    for _ in range(int(round(seconds / tick))):
+        vector["stress"] -= 0.05 * tick
+        vector["focus"] -= 0.02 * tick
+        vector["energy"] += 0.01 * tick
+        flow = clamp(flow - 0.01 * tick)
+        vector["flow"] = flow
+        if vector["focus"] > 0.8:
+            vector["stress"] *= 0.9
+            if vector["stress"] < 0.1:
+                vector["stress"] = 0.0
+        for key in vector:
+            vector[key] = clamp(vector[key])
+    return vector
+
+
+def test_analytic_decay_matches_fixed_rate_polling():
+    for focus, stress, seconds in [(0.85, 0.7, 1.0), (0.6, 0.5, 4.0), (0.9, 0.95, 10.0)]:
+        engine = EIEngine()
+        engine.emotion_vector.update(focus=focus, stress=stress)
+        engine.sub_states["flow_intensity"] = 0.3
+        expected = _polled(dict(engine.emotion_vector), 0.3, seconds)
+        engine._advance(engine.last_update + seconds)
+        for key, value in expected.items():
+            assert engine.emotion_vector[key] == pytest.approx(value, abs=0.02), key
+
+
+class _RecordingWake(threading.Event):
+    """Wake event that records each wait and flags when the loop blocks on it."""
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+        self.blocked = threading.Event()
+
+    def wait(self, timeout=None):
+        self.timeouts.append(timeout)
+        self.blocked.set()
+        return super().wait(timeout)
+
+
+def test_idle_engine_sleeps_until_input():
+    engine = EIEngine()
+    engine.emotion_vector.update(focus=0.0, stress=0.0, energy=1.0, flow=0.0)
+    engine._last_saved = dict(engine.emotion_vector)  # nothing to persist
+    engine._wake = wake = _RecordingWake()
+    assert engine._next_wake() is None
+    engine.start()
+    try:
+        assert wake.blocked.wait(5)
+        # At rest: one initial pass, then a wait with no timeout instead of polling.
+        assert wake.timeouts == [None]
+        assert engine.wakeups == 1 and engine.emissions == 1
+
+        wake.blocked.clear()
+        engine.on_input_activity("typing", 1.0)
+        assert wake.blocked.wait(5)
+        assert engine.wakeups == 2 and engine.emissions == 2
+        assert wake.timeouts[-1] == pytest.approx(0.02 / 0.05)  # stress now drifts back down
+    finally:
+        engine.stop()
+
+
+def test_input_bursts_are_merged_into_rate_limited_passes():
+    engine = EIEngine(min_interval=0.05)
+    engine.start()
+    try:
+        time.sleep(0.1)
+        start, before = time.monotonic(), engine.wakeups
+        while time.monotonic() - start < 0.5:
+            for _ in range(50):
+                engine.on_input_activity("mouse", {"intensity": 0.5})
+            time.sleep(0.001)
+        elapsed = time.monotonic() - start
+        # One pass per min_interval at most, however many inputs arrive.
+        assert engine.wakeups - before <= elapsed / engine.min_interval + 2
+        deadline = time.time() + 2
+        while engine._last_emitted["curiosity"] < 1.0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert engine._last_emitted["curiosity"] == 1.0  # merged inputs still reach an emission
+    finally:
+        engine.stop()
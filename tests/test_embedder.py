@@ -0,0 +1,78 @@
+import logging
+
+import numpy as np
+
+from corund.database import Database
+from corund.embedder import HashingEmbedder
+from corund.memory_store import MemoryStore
+
+
+def test_hashing_embedder_is_stable_and_ranks_related_text_first(tmp_path):
+    embedder = HashingEmbedder(dim=256)
+    docs = ["Studied linear regression for the exam", "Grocery list: apples and oat milk", "Call mom on Sunday"]
+    vectors = embedder.embed_batch(docs, learn=True)
+    assert vectors.shape == (3, 256) and vectors.dtype == np.float32
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    assert np.allclose(embedder.embed(docs[1]), vectors[1], atol=1e-6)
+    assert not embedder.embed("").any()
+
+    query = embedder.embed("regresion exam studying")  # misspelt and inflected
+    assert int(np.argmax(vectors @ query)) == 0
+
+    path = str(tmp_path / "embedder.npz")
+    embedder.save(path)
+    restored = HashingEmbedder(dim=256)
+    assert restored.load(path) and restored.docs == 3
+    assert np.allclose(restored.embed(docs[2]), embedder.embed(docs[2]))
+    assert not HashingEmbedder(dim=128).load(path)
+
+
+def test_ltm_memories_are_embedded_on_insert(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.sqlite3"))
+    store = MemoryStore()
+    store.db = database
+    store.add_to_ltm("User requested lesson: photosynthesis", "lesson")
+    store.add_to_ltm("Workspace switched to coding mode", "note")
+    store.add_to_ltm("Prefers dark theme in the evening", "note")
+
+    assert store.search_ltm("teach me about photosynthesis", limit=1) == ["User requested lesson: photosynthesis"]
+    assert store.search_ltm("theme", limit=1) == ["Prefers dark theme in the evening"]
+    database.close()
+    assert HashingEmbedder().load(database.embedder_path)
+
+
+def test_memories_without_embeddings_are_backfilled(tmp_path, caplog):
+    database = Database(db_path=str(tmp_path / "etherea.sqlite3"))
+    for content in ("Booked dentist appointment", "Finished the calculus homework", "Bought new running shoes"):
+        database.add_memory(content, "note")
+    assert database.embed_missing(limit=2) == 2
+    assert database.embed_missing(limit=2) == 1
+    assert database.embed_missing() == 0
+    assert database.search_memories("calculus homework", limit=1) == ["Finished the calculus homework"]
+    with database.engine.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM memories WHERE embedding IS NULL").fetchone() == (0,)
+
+    # Vectors of another size cannot join the sidecar; that is logged, not silent.
+    with caplog.at_level(logging.WARNING, logger="corund.vector_index"):
+        database.add_memory("external vector", "note", embedding=np.ones(8))
+    assert "Skipping 8-d embeddings" in caplog.text
+    database.close()
+
+
+def test_reopening_after_backfill_adds_no_duplicates(tmp_path):
+    path = str(tmp_path / "etherea.sqlite3")
+    database = Database(db_path=path)
+    for content in ("Booked dentist appointment", "Finished the calculus homework", "Bought new running shoes"):
+        database.add_memory(content, "note")
+    database.search_memories("anything")  # opens the sidecar
+    database.add_memory("Linear regression notes", "note", embedding=database.embed_memory("Linear regression notes"))
+    database.add_memory("Gym at seven", "note", embedding=database.embed_memory("Gym at seven"))
+    assert database.embed_missing() == 3
+    assert list(database._embeddings.ids) == [4, 5, 1, 2, 3]
+    database.close()
+
+    reopened = Database(db_path=path)
+    hits = reopened.search_memories("regression", limit=5)
+    assert sorted(reopened._embeddings.ids) == [1, 2, 3, 4, 5]
+    assert len(hits) == len(set(hits)) == 5
+    reopened.close()
@@ -0,0 +1,306 @@
+import asyncio
+
+from corund.event_bus import EventBus
+from corund.event_model import create_event
+
+
+def _emit(bus, *types):
+    async def _run():
+        for event_type in types:
+            await bus.emit(create_event(event_type, source="test", payload={}))
+
+    asyncio.run(_run())
+
+
+def test_wildcard_patterns_match_dotted_segments():
+    bus = EventBus()
+    seen = {"segment": [], "prefix": [], "deep": [], "all": []}
+    bus.subscribe(lambda e: seen["segment"].append(e.type), "state.*.changed")
+    bus.subscribe(lambda e: seen["prefix"].append(e.type), "OS_ACTION_*")
+    bus.subscribe(lambda e: seen["deep"].append(e.type), "state.**")
+    bus.subscribe(lambda e: seen["all"].append(e.type))
+
+    _emit(bus, "state.focus_level.changed", "state.batch.x.changed", "OS_ACTION_STARTED", "agent.decision")
+
+    assert seen["segment"] == ["state.focus_level.changed"]
+    assert seen["prefix"] == ["OS_ACTION_STARTED"]
+    assert seen["deep"] == ["state.focus_level.changed", "state.batch.x.changed"]
+    assert len(seen["all"]) == 4
+
+
+def test_dispatch_index_is_invalidated_on_subscription_change():
+    bus = EventBus()
+    calls = []
+
+    def listener(event):
+        calls.append(event.type)
+
+    _emit(bus, "state.focus_level.changed")
+    assert bus.listeners_for("state.focus_level.changed") == ()
+
+    unsubscribe = bus.subscribe(listener, "state.*.changed")
+    _emit(bus, "state.focus_level.changed")
+    assert calls == ["state.focus_level.changed"]
+
+    unsubscribe()
+    _emit(bus, "state.focus_level.changed")
+    assert calls == ["state.focus_level.changed"]
+    assert bus.listeners_for("state.focus_level.changed") == ()
+
+
+def test_listeners_run_in_subscription_order():
+    bus = EventBus()
+    order = []
+    bus.subscribe(lambda e: order.append("all"))
+    bus.subscribe(lambda e: order.append("exact"), "agent.decision")
+    bus.subscribe(lambda e: order.append("pattern"), "agent.*")
+
+    _emit(bus, "agent.decision")
+
+    assert order == ["all", "exact", "pattern"]
+
+
+def test_queued_mode_dispatches_by_priority():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e.type))
+
+    async def _run():
+        bus.start_queue(maxsize=10, workers=1)
+        await bus.emit(create_event("low", source="test", payload={}, priority=80))
+        await bus.emit(create_event("high", source="test", payload={}, priority=10))
+        await bus.emit(create_event("mid", source="test", payload={}))
+        assert seen == []
+        await bus.stop_queue()
+
+    asyncio.run(_run())
+    assert seen == ["high", "mid", "low"]
+
+
+def test_queue_overflow_policies():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append((e.type, e.payload["n"])))
+    bus.set_overflow_policy("state.*.changed", "coalesce")
+    bus.set_overflow_policy("OS_ACTION_*", "drop_oldest")
+
+    async def _run():
+        bus.start_queue(maxsize=2, workers=1)
+        for n in range(3):
+            await bus.emit(create_event("state.focus_level.changed", source="test", payload={"n": n}))
+        for n in range(3):
+            await bus.emit(create_event("OS_ACTION_STARTED", source="test", payload={"n": n}))
+        stats = bus.queue_stats()
+        await bus.stop_queue()
+        return stats
+
+    stats = asyncio.run(_run())
+    assert stats["coalesced"] == 2
+    assert stats["dropped"] == 2
+    assert seen == [("OS_ACTION_STARTED", 1), ("OS_ACTION_STARTED", 2)]
+
+
+def test_block_policy_waits_for_dispatch():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e.payload["n"]))
+
+    async def _run():
+        bus.start_queue(maxsize=1, workers=1)
+        for n in range(4):
+            await bus.emit(create_event("agent.decision", source="test", payload={"n": n}))
+        await bus.stop_queue()
+
+    asyncio.run(_run())
+    assert seen == [0, 1, 2, 3]
+
+
+def test_coalescing_delivers_leading_and_latest_event():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append((e.type, e.payload["value"])))
+    bus.coalesce("state.focus_level.changed", window=0.05)
+
+    async def _run():
+        for n in range(20):
+            await bus.emit(create_event("state.focus_level.changed", source="test", payload={"value": n}))
+        await bus.emit(create_event("state.activity_state.changed", source="test", payload={"value": "flow"}))
+        await asyncio.sleep(0.12)
+
+    asyncio.run(_run())
+    assert seen == [
+        ("state.focus_level.changed", 0),
+        ("state.activity_state.changed", "flow"),
+        ("state.focus_level.changed", 19),
+    ]
+    stats = bus.coalesce_stats()["state.focus_level.changed"]
+    assert stats == {"received": 20, "delivered": 2, "merged": 18}
+
+
+def test_flush_coalesced_delivers_pending_events():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e.payload["value"]), "state.*.changed")
+    bus.coalesce("state.*.changed", window=10.0)
+
+    async def _run():
+        for n in range(3):
+            await bus.emit(create_event("state.cognitive_load.changed", source="test", payload={"value": n}))
+        await bus.flush_coalesced()
+
+    asyncio.run(_run())
+    assert seen == [0, 2]
+
+
+def test_coalescing_window_outlives_the_loop_that_opened_it():
+    import time
+
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e.payload["value"]), "state.focus_level.changed")
+    bus.coalesce("state.focus_level.changed", window=0.05)
+
+    async def _emit_values(*values):
+        for value in values:
+            await bus.emit(create_event("state.focus_level.changed", source="test", payload={"value": value}))
+
+    asyncio.run(_emit_values(0, 1, 2))  # the loop closes before the window does
+    time.sleep(0.06)
+    asyncio.run(_emit_values(3))
+    assert seen == [0, 3]
+    assert bus.coalesce_stats()["state.focus_level.changed"]["merged"] == 2
+
+
+def test_join_waits_only_for_background_tasks_of_its_loop():
+    bus = EventBus()
+
+    async def _stuck(event):
+        await asyncio.Event().wait()
+
+    bus.subscribe(_stuck, "agent.decision", background=True)
+    other = asyncio.new_event_loop()
+    try:
+        other.run_until_complete(bus.emit(create_event("agent.decision", source="test", payload={})))
+        asyncio.run(asyncio.wait_for(bus.join(), 1))
+    finally:
+        for task in asyncio.all_tasks(other):
+            task.cancel()
+        other.run_until_complete(asyncio.sleep(0))
+        other.close()
+
+
+def test_instrumentation_records_latency_and_reports_slow_listeners(tmp_path):
+    import json
+    import time
+
+    bus = EventBus()
+    slow_reports = []
+
+    def slow_listener(event):
+        time.sleep(0.02)
+
+    async def async_listener(event):
+        await asyncio.sleep(0)
+
+    bus.subscribe(slow_listener, "agent.decision")
+    bus.subscribe(async_listener, "agent.*")
+    bus.subscribe(lambda e: slow_reports.append(e.payload), "bus.slow_listener")
+    bus.instrument(slow_threshold=0.01)
+
+    async def _run():
+        for _ in range(2):
+            await bus.emit(create_event("agent.decision", source="test", payload={}))
+        await asyncio.sleep(0)
+
+    asyncio.run(_run())
+    stats = bus.stats()["agent.decision"]
+    slow_name = next(name for name in stats if name.endswith("slow_listener"))
+    assert stats[slow_name]["calls"] == 2
+    assert stats[slow_name]["max_ms"] >= 20
+    assert any(name.endswith("async_listener") for name in stats)
+    assert len(slow_reports) == 2
+    assert slow_reports[0]["listener"] == slow_name
+
+    out = tmp_path / "stats.json"
+    bus.dump_stats(out)
+    assert json.loads(out.read_text())["agent.decision"][slow_name]["calls"] == 2
+
+
+def test_failing_and_slow_listeners_are_isolated_and_dead_lettered():
+    bus = EventBus()
+    delivered = []
+
+    def broken(event):
+        raise RuntimeError("boom")
+
+    async def hangs(event):
+        await asyncio.sleep(10)
+
+    async def fails(event):
+        raise ValueError("bad payload")
+
+    bus.subscribe(broken, "agent.decision")
+    bus.subscribe(hangs, "agent.decision", timeout=0.01)
+    bus.subscribe(fails, "agent.decision")
+    bus.subscribe(lambda e: delivered.append(e.type), "agent.decision")
+
+    async def _run():
+        await bus.emit(create_event("agent.decision", source="test", payload={}))
+
+    asyncio.run(_run())
+    assert delivered == ["agent.decision"]
+    letters = {letter.listener.rsplit(".", 1)[-1]: letter for letter in bus.dead_letters}
+    assert "boom" in letters["broken"].error
+    assert letters["hangs"].timed_out
+    assert "bad payload" in letters["fails"].error
+
+
+def test_background_listener_does_not_block_emit():
+    bus = EventBus()
+    done = []
+
+    async def slow(event):
+        await asyncio.sleep(0.05)
+        done.append(event.type)
+
+    bus.subscribe(slow, "agent.decision", background=True)
+
+    async def _run():
+        await bus.emit(create_event("agent.decision", source="test", payload={}))
+        assert done == []
+        await bus.join()
+
+    asyncio.run(_run())
+    assert done == ["agent.decision"]
+
+
+def test_post_delivers_on_one_persistent_dispatcher_loop():
+    import threading
+
+    bus = EventBus()
+    threads = []
+    bus.subscribe(lambda e: threads.append(threading.current_thread().name), "OS_ACTION_*")
+
+    futures = [bus.post(create_event("OS_ACTION_STARTED", source="test", payload={})) for _ in range(3)]
+    assert bus.wait_posted(timeout=2)
+    assert all(f.done() for f in futures)
+    bus.emit_threadsafe(create_event("OS_ACTION_FINISHED", source="test", payload={}), timeout=2)
+    bus.shutdown_dispatcher()
+
+    assert threads == ["etherea-event-bus"] * 4
+
+
+def test_post_uses_attached_loop():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(asyncio.get_running_loop()), "agent.decision")
+
+    async def _run():
+        loop = asyncio.get_running_loop()
+        bus.attach_loop(loop)
+        future = bus.post(create_event("agent.decision", source="test", payload={}))
+        await asyncio.wrap_future(future)
+        return loop
+
+    loop = asyncio.run(_run())
+    assert seen == [loop]
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+
+from corund.event_bus import EventBus
+from corund.event_journal import EventJournal
+from corund.event_model import create_event
+
+
+def _event(event_type, n, **kwargs):
+    return create_event(event_type, source="test", payload={"n": n}, **kwargs)
+
+
+def test_journal_rotates_segments_and_reads_back_in_order(tmp_path):
+    journal = EventJournal(tmp_path, segment_bytes=512, index_every=4)
+    originals = [_event("state.focus_level.changed", n) for n in range(50)]
+    for event in originals:
+        journal.append(event)
+    journal.append(_event("voice.transcript", 99, privacy_level="sensitive"))
+    journal.close()
+    assert originals[0]._iso is None  # journaling does not format timestamps
+
+    assert len(list(tmp_path.glob("segment-*.log"))) > 1
+    events = list(EventJournal(tmp_path).iter_events())
+    assert [e.payload["n"] for e in events] == list(range(50))
+    assert events[0].source == "test"
+    assert [e.timestamp for e in events] == [e.timestamp for e in originals]
+
+
+def test_old_and_excess_segments_are_pruned(tmp_path):
+    journal = EventJournal(tmp_path, segment_bytes=256, max_age=3600, max_bytes=None)
+    for n in range(40):
+        journal.append(_event("agent.decision", n))
+    segments = sorted(tmp_path.glob("segment-*.log"))
+    assert len(segments) > 4
+    old = time.time() - 7200
+    for path in segments[:2]:
+        os.utime(path, (old, old))
+
+    assert journal.prune() == 2
+    assert not any(path.exists() or path.with_suffix(".idx").exists() for path in segments[:2])
+    assert [e.payload["n"] for e in journal.iter_events()][-1] == 39
+
+    journal.max_bytes = 600
+    journal.prune()
+    remaining = sorted(tmp_path.glob("segment-*.log"))
+    assert remaining[-1] == segments[-1]  # the open segment is kept
+    assert sum(path.stat().st_size for path in remaining) <= 600 + journal.segment_bytes
+    assert len(list(tmp_path.glob("segment-*.idx"))) == len(remaining)
+    journal.close()
+
+
+def test_iter_events_filters_by_time_and_type(tmp_path):
+    journal = EventJournal(tmp_path, index_every=2)
+    for n in range(10):
+        journal.append(_event("OS_ACTION_STARTED", n))
+    time.sleep(0.01)
+    cutoff = time.time()
+    for n in range(10, 14):
+        journal.append(_event("OS_ACTION_FINISHED" if n % 2 else "agent.decision", n))
+
+    recent = [e.payload["n"] for e in journal.iter_events(since=cutoff)]
+    assert recent == [10, 11, 12, 13]
+    finished = [e.payload["n"] for e in journal.iter_events(since=cutoff, types=["OS_ACTION_*"])]
+    assert finished == [11, 13]
+    journal.close()
+
+
+def test_replay_streams_through_bus_without_rejournaling(tmp_path):
+    bus = EventBus()
+    journal = EventJournal(tmp_path)
+    journal.attach(bus)
+
+    async def _run():
+        for n in range(3):
+            await bus.emit(_event("agent.decision", n))
+        seen = []
+        bus.subscribe(lambda e: seen.append(e.payload["n"]), "agent.decision")
+        count = await journal.replay(types=["agent.decision"], bus=bus)
+        return count, seen
+
+    count, seen = asyncio.run(_run())
+    assert count == 3
+    assert seen == [0, 1, 2]
+    assert len(list(journal.iter_events())) == 3
+    journal.close()
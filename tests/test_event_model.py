@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+import time
+
+from corund.event_model import Event, create_event
+
+
+def test_timestamp_is_lazy_iso_utc():
+    before = time.time()
+    event = create_event("state.focus_level.changed", source="test", payload={"value": 0.4})
+    assert event._iso is None
+    parsed = datetime.fromisoformat(event.timestamp)
+    assert parsed.tzinfo == timezone.utc
+    assert abs(parsed.timestamp() - before) < 1.0
+    assert event.timestamp is event.timestamp
+
+
+def test_explicit_timestamp_and_fields_are_preserved():
+    event = create_event(
+        "OS_ACTION_STARTED",
+        source="os_pipeline",
+        payload={"path": "workspace"},
+        priority=35,
+        timestamp="2026-01-26T09:15:45+00:00",
+    )
+    assert event.timestamp == "2026-01-26T09:15:45+00:00"
+    assert event.wall_time == datetime(2026, 1, 26, 9, 15, 45, tzinfo=timezone.utc).timestamp()
+    assert (event.source, event.priority, event.privacy_level) == ("os_pipeline", 35, "normal")
+    assert event == Event("OS_ACTION_STARTED", "2026-01-26T09:15:45+00:00", "os_pipeline", {"path": "workspace"}, 35)
+
+
+def test_sequence_numbers_increase_and_types_are_interned():
+    dynamic_type = "".join(["state.", "focus_level", ".changed"])
+    first = create_event(dynamic_type, source="test", payload={})
+    second = create_event("state.focus_level.changed", source="test", payload={})
+    assert second.seq > first.seq
+    assert first.type is second.type
+    assert not hasattr(first, "__dict__")
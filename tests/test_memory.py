@@ -17,9 +17,11 @@ def db():
         os.remove(DB_TEST_PATH)
     database = Database(db_path=DB_TEST_PATH)
     yield database
-    database.conn.close()
-    if os.path.exists(DB_TEST_PATH):
-        os.remove(DB_TEST_PATH)
+    database.close()
+    for path in (DB_TEST_PATH, DB_TEST_PATH + "-wal", DB_TEST_PATH + "-shm",
+                 database.embeddings_path, database.embeddings_path + ".ids", database.embedder_path):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 def test_database_persistence(db):
@@ -49,3 +51,155 @@ def test_memory_store_integration(db):
     store.add_to_ltm("Persistent context", "context")
     history = store.get_history()
     assert "Persistent context" in history
+
+
+def test_search_updates_incrementally_after_first_load(db):
+    db.add_memory("North", "test", embedding=[0.0, 1.0, 0.0])
+    assert db.search_memories([0.0, 1.0, 0.0], limit=1) == ["North"]
+
+    db.add_memory("East", "test", embedding=[1.0, 0.0, 0.0])
+    db.add_memory("No vector", "test")
+    assert db.search_memories([1.0, 0.05, 0.0], limit=2) == ["East", "North"]
+
+
+def test_ivf_index_recall_and_incremental_inserts(tmp_path):
+    from corund.vector_index import IVFIndex, QuantizedMatrix, normalize
+
+    rng = np.random.default_rng(3)
+    centres = normalize(rng.normal(size=(20, 16)))
+    data = (centres[rng.integers(20, size=3000)] + rng.normal(scale=0.1, size=(3000, 16))).astype(np.float32)
+    matrix = QuantizedMatrix(tmp_path / "memories.emb")
+    matrix.add_many(range(2500), data[:2500])
+    index = IVFIndex(matrix, nlist=20, nprobe=4, min_train=1000)
+
+    hits = 0
+    for query in data[2900:]:
+        expected = set(index.search(query, 5, exact=True)[0].tolist())
+        hits += len(expected & set(index.search(query, 5)[0].tolist()))
+    assert index.trained
+    assert hits / 500 >= 0.9
+
+    matrix.add_many(range(2500, 2900), data[2500:2900])
+    ids, _ = index.search(data[2899], 1)
+    assert ids[0] == 2899
+    matrix.close()
+
+
+def test_memory_index_is_persisted_next_to_database(db):
+    index_path = db.index_path
+    try:
+        for n in range(40):
+            db.add_memory(f"memory {n}", "test", embedding=[float(n % 4 == i) for i in range(4)])
+        db.rebuild_memory_index()
+        assert os.path.exists(index_path)
+
+        reopened = Database(db_path=DB_TEST_PATH)
+        assert reopened.search_memories([0.0, 0.0, 1.0, 0.0], limit=1) == ["memory 2"]
+        assert reopened._memory_index.trained
+        reopened.close()
+    finally:
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+
+def test_concurrent_first_searches_open_the_sidecar_once(db):
+    import threading
+
+    rng = np.random.default_rng(3)
+    for n in range(200):
+        db.add_memory(f"memory {n}", "test", embedding=rng.normal(size=16))
+    query = rng.normal(size=16)
+    start = threading.Barrier(8)
+
+    def _search():
+        start.wait()
+        db.search_memories(query, limit=1)
+
+    threads = [threading.Thread(target=_search) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(db._embeddings) == 200
+
+
+def test_memories_added_while_the_sidecar_opens_are_kept(db, monkeypatch):
+    import threading
+    import time
+    from corund import database as database_module
+
+    db.add_memory("before", "test", embedding=[1.0, 0.0, 0.0, 0.0])
+    added = []
+
+    class _SlowIndex(database_module.IVFIndex):
+        def __init__(self, matrix):
+            # Between the backfill SELECT and publishing the sidecar.
+            thread = threading.Thread(
+                target=db.add_memory, args=("during", "test"), kwargs={"embedding": [0.0, 1.0, 0.0, 0.0]})
+            thread.start()
+            added.append(thread)
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                with db.engine.read() as conn:
+                    if conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0] == 2:
+                        break
+                time.sleep(0.01)
+            super().__init__(matrix)
+
+    monkeypatch.setattr(database_module, "IVFIndex", _SlowIndex)
+    db.search_memories([1.0, 0.0, 0.0, 0.0], limit=1)
+    added[0].join()
+    assert sorted(db._embeddings.ids) == [1, 2]
+    assert db.search_memories([0.0, 1.0, 0.0, 0.0], limit=1) == ["during"]
+
+
+def test_quantized_sidecar_reopens_and_drops_torn_tail(tmp_path):
+    from corund.vector_index import QuantizedMatrix, normalize
+
+    rng = np.random.default_rng(11)
+    vectors = rng.normal(size=(300, 32)).astype(np.float32)
+    path = tmp_path / "memories.emb"
+    sidecar = QuantizedMatrix(path, token=42)
+    sidecar.add_many(range(1, 301), vectors)
+    sidecar.close()
+    with open(path, "ab") as handle:
+        handle.write(b"\x01\x02")  # interrupted append
+
+    reopened = QuantizedMatrix(path, token=42)
+    assert len(reopened) == 300
+    assert list(reopened.ids[:3]) == [1, 2, 3]
+    query = rng.normal(size=32)
+    exact = normalize(vectors) @ normalize(query)
+    assert np.allclose(reopened.scores(normalize(query)), exact, atol=0.02)
+    assert reopened.search(query, 1)[0][0] == int(np.argmax(exact)) + 1
+    assert not reopened.add(301, [1.0, 2.0])
+    reopened.close()
+
+    assert len(QuantizedMatrix(path, token=7)) == 0
+
+
+def test_preferences_are_cached_and_see_other_writers(db):
+    db.set_preference("theme", "dark")
+    assert db.get_preference("theme") == "dark"
+    version = db.preferences_version
+
+    held = db.get_profile_context()
+    db.set_preference("volume", "7")
+    assert "volume" not in held  # updates swap in a new mapping
+    assert db.get_preference("volume", cast=int) == 7
+    assert db.get_preference("theme", cast=int, default=0) == 0
+    assert db.get_profile_context()["volume"] == "7"
+    assert db.preferences_version == version + 1
+
+    # Writes to other tables do not invalidate the cache.
+    db.preference_recheck = 0.0
+    db.engine.execute("INSERT INTO events(event_id, type, source, payload_json) VALUES ('e1', 't', 's', '{}')")
+    db.get_preference("theme")
+    assert db.preferences_version == version + 1
+
+    other = sqlite3.connect(DB_TEST_PATH)
+    other.execute("INSERT OR REPLACE INTO user_profile (key, value) VALUES ('theme', 'light')")
+    other.commit()
+    other.close()
+    db.preference_recheck = 0.0
+    assert db.get_preference("theme") == "light"
@@ -0,0 +1,59 @@
+import numpy as np
+
+from corund.database import Database
+from corund.memory_consolidation import MemoryConsolidator
+
+
+def test_consolidation_merges_duplicates_and_archives_stale(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.sqlite3"))
+    rng = np.random.default_rng(0)
+    topics = rng.normal(size=(6, 32))
+    for n, topic in enumerate(topics):
+        database.add_memory(f"topic {n}", "note", embedding=topic)
+    for n in range(3):
+        database.add_memory(f"topic 1 again {n}", "note", embedding=topics[1] + rng.normal(scale=0.01, size=32))
+    database.add_memory("old and never recalled", "note", embedding=rng.normal(size=32))
+    database.engine.execute("UPDATE memories SET created_at = '2020-01-01 00:00:00' WHERE content LIKE 'old%'")
+
+    consolidator = MemoryConsolidator(database, clusters=4, batch_size=4)
+    # Out of clustering budget: only the stale memory is archived.
+    assert consolidator.run(budget=0) == {"embedded": 0, "clustered": 0, "merged": 0, "archived": 1, "pending": 9}
+
+    assert consolidator.run(budget=5) == {"embedded": 0, "clustered": 6, "merged": 3, "archived": 0, "pending": 0}
+    assert len(database._embeddings) == 6
+    assert database.search_memories(topics[1], limit=1) == ["topic 1"]
+
+    with database.engine.read() as conn:
+        assert conn.execute("SELECT weight FROM memories WHERE content = 'topic 1'").fetchone() == (4,)
+        archived = dict(conn.execute("SELECT content, reason FROM memories_archive").fetchall())
+        assert archived["old and never recalled"] == "stale"
+        assert sum(reason == "duplicate" for reason in archived.values()) == 3
+        sizes = conn.execute("SELECT SUM(size), COUNT(representative_id) FROM memory_clusters").fetchone()
+        assert sizes == (6, 4)
+        assert conn.execute("SELECT COUNT(*) FROM memories WHERE cluster_id IS NULL").fetchone() == (0,)
+
+    # New rows are picked up incrementally; a fresh consolidator resumes from the database.
+    database.add_memory("topic 3 once more", "note", embedding=topics[3] * 2)
+    assert MemoryConsolidator(database, clusters=4).run()["merged"] == 1
+    database.close()
+
+
+def test_rows_added_during_a_pass_are_clustered_by_the_next(tmp_path):
+    database = Database(db_path=str(tmp_path / "etherea.sqlite3"))
+    rng = np.random.default_rng(1)
+    for n in range(4):
+        database.add_memory(f"note {n}", "note", embedding=rng.normal(size=16))
+    consolidator = MemoryConsolidator(database, clusters=2)
+    find_stale = consolidator._stale
+
+    def _stale_with_concurrent_insert(now, exclude):
+        database.add_memory("written mid-pass", "note", embedding=rng.normal(size=16))
+        return find_stale(now, exclude)
+
+    consolidator._stale = _stale_with_concurrent_insert
+    assert consolidator.run(budget=5)["clustered"] == 4
+    consolidator._stale = find_stale
+    assert consolidator.run(budget=5) == {"embedded": 0, "clustered": 1, "merged": 0, "archived": 0, "pending": 0}
+    with database.engine.read() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM memories WHERE cluster_id IS NULL").fetchone() == (0,)
+    database.close()
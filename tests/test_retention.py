@@ -0,0 +1,52 @@
+import time
+
+from corund import db
+from corund.retention import compact, ttl_for
+
+
+def test_ttl_prefers_exact_then_longest_pattern():
+    ttls = {"state.**": 7, "state.focus_level.changed": 1, "*": 90}
+    assert ttl_for("state.focus_level.changed", ttls) == 1
+    assert ttl_for("state.mode.changed", ttls) == 7
+    assert ttl_for("agent.decision", ttls) is None
+    assert ttl_for("voice", ttls) == 90
+
+
+def test_compact_rolls_expired_rows_into_daily_aggregates(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    db.migrate()
+    db.migrate()  # idempotent
+    now = int(time.time())
+    old = now - 10 * 86_400
+    with db.connection() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def _seed(conn):
+        rows = [(f"e{n}", "state.focus_level.changed", "ei", "{}", old + n) for n in range(5)]
+        rows += [("fresh", "state.focus_level.changed", "ei", "{}", now)]
+        rows += [("legacy", "OS_ACTION_STARTED", "os", "{}", None)]
+        conn.executemany(
+            "INSERT INTO events(event_id, type, source, payload_json, created_ts) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        conn.execute(
+            "INSERT INTO agent_decisions(decision_id, agent, tool_name, args_json, reason, executed, created_ts) "
+            "VALUES ('d1', 'policy', 'ui.set_density', '{}', 'r', 1, ?)",
+            (old,),
+        )
+        return conn.execute("SELECT created_ts FROM events WHERE event_id='legacy'").fetchone()[0]
+
+    assert db.write(_seed) is not None
+
+    stats = compact(now, event_ttls={"state.**": 86_400}, decision_ttl=86_400)
+    assert stats["events"] == 5
+    assert stats["decisions"] == 1
+
+    with db.connection() as conn:
+        assert [r[0] for r in conn.execute("SELECT event_id FROM events ORDER BY event_id")] == ["fresh", "legacy"]
+        assert conn.execute("SELECT SUM(count) FROM event_daily").fetchone()[0] == 5
+        assert conn.execute("SELECT total, executed FROM decision_daily").fetchone() == (1, 1)
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM events WHERE type = ? AND created_ts < ?", ("x", now)
+        ))
+        assert "idx_events_type_ts" in plan
+    db.get_engine().close()
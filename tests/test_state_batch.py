@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from corund.event_bus import event_bus
+from corund.state import EthereaState
+
+
+@pytest.fixture
+def state_events():
+    seen = []
+    unsubscribe = event_bus.subscribe(seen.append, "state.**")
+    yield seen
+    unsubscribe()
+
+
+def test_batch_emits_single_diff_event(state_events):
+    state = EthereaState()
+    observed = []
+    unsubscribe = event_bus.subscribe(
+        lambda e: observed.append((state.focus_level, state.activity_state)), "state.batch.changed"
+    )
+
+    async def _run():
+        async with state.batch(source="sensors"):
+            await state.set_focus_level(0.8, source="sensors")
+            await state.set_cognitive_load(0.2, source="sensors")  # unchanged
+            await state.set_activity_state("flow", source="sensors")
+
+    asyncio.run(_run())
+    unsubscribe()
+    assert [e.type for e in state_events] == ["state.batch.changed"]
+    event = state_events[0]
+    assert event.source == "sensors"
+    assert event.payload["changes"] == {
+        "focus_level": {"old": 0.5, "new": 0.8},
+        "activity_state": {"old": "idle", "new": "flow"},
+    }
+    assert observed == [(0.8, "flow")]
+
+
+def test_batch_per_field_compatibility_mode(state_events):
+    state = EthereaState()
+
+    async def _run():
+        async with state.batch(source="ui", per_field_events=True):
+            await state.set_focus_level(0.9, source="ui")
+            await state.add_open_document("notes.md", source="ui")
+
+    asyncio.run(_run())
+    assert [e.type for e in state_events] == [
+        "state.focus_level.changed",
+        "state.open_documents.changed",
+        "state.batch.changed",
+    ]
+    assert state_events[-1].payload["changes"]["open_documents"] == {"old": [], "new": ["notes.md"]}
+
+
+def test_batch_rolls_back_on_error(state_events):
+    state = EthereaState()
+
+    async def _run():
+        async with state.batch(source="ui"):
+            await state.set_focus_level(0.9, source="ui")
+            await state.add_open_document("notes.md", source="ui")
+            raise RuntimeError("abort")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(_run())
+    assert state.focus_level == 0.5
+    assert state.open_documents == []
+    assert state_events == []
+
+
+def test_batch_belongs_to_its_task(state_events):
+    state = EthereaState()
+
+    async def _run():
+        inside = asyncio.Event()
+        release = asyncio.Event()
+
+        async def _batched():
+            async with state.batch(source="ui"):
+                await state.set_focus_level(0.9, source="ui")
+                inside.set()
+                await release.wait()
+
+        task = asyncio.create_task(_batched())
+        await inside.wait()
+        await state.set_cognitive_load(0.7, source="sensors")  # another task: not batched
+        assert [e.type for e in state_events] == ["state.cognitive_load.changed"]
+        release.set()
+        await task
+
+    asyncio.run(_run())
+    assert [e.type for e in state_events] == ["state.cognitive_load.changed", "state.batch.changed"]
+    assert set(state_events[-1].payload["changes"]) == {"focus_level"}
+
+
+def test_per_field_batch_records_one_history_version(state_events):
+    from corund.state_history import StateHistory
+
+    history = StateHistory("etherea")
+    state = EthereaState()
+    state.attach_history(history)
+    before = history.latest.version
+
+    async def _run():
+        async with state.batch(source="ui", per_field_events=True):
+            await state.set_focus_level(0.9, source="ui")
+            await state.set_activity_state("flow", source="ui")
+
+    asyncio.run(_run())
+    assert len(state_events) == 3
+    assert history.latest.version == before + 1
+    assert (history.latest["focus_level"], history.latest["activity_state"]) == (0.9, "flow")
@@ -0,0 +1,75 @@
+import asyncio
+
+from corund.aurora_state import AuroraStateStore
+from corund.runtime_state import RuntimeState
+from corund.state import EthereaState
+from corund.state_history import StateHistory
+
+
+def test_state_at_answers_point_in_time_queries():
+    history = StateHistory("etherea")
+    state = EthereaState()
+    state.attach_history(history)
+    base = history.latest.ts
+
+    async def _run():
+        await state.set_focus_level(0.8, source="test")
+        await state.set_current_workspace("Study", source="test")
+
+    asyncio.run(_run())
+    first, second, third = list(history)
+    assert history.state_at(base)["focus_level"] == 0.5
+    assert history.state_at(second.ts)["focus_level"] == 0.8
+    assert history.state_at(second.ts)["current_workspace"] == "Calm"
+    assert history.state_at(third.ts + 60)["current_workspace"] == "Study"
+    assert history.state_at(base - 60) is None
+    assert history.diff(first, third) == {
+        "focus_level": {"old": 0.5, "new": 0.8},
+        "current_workspace": {"old": "Calm", "new": "Study"},
+    }
+
+
+def test_snapshots_share_unchanged_values():
+    history = StateHistory("runtime")
+    runtime = RuntimeState()
+    before = history.capture(runtime)
+
+    runtime.update_metric("focus", 0.9, source="test")
+    after = history.capture(runtime)
+
+    assert after.version == before.version + 1
+    assert after["overrides"] is before["overrides"]
+    assert after["focus"] is not before["focus"]
+    assert after["focus"]["value"] == 0.9
+    assert set(history.diff(before.version, after.version)) == {"focus"}
+
+
+def test_unchanged_updates_do_not_create_versions():
+    history = StateHistory("aurora")
+    store = AuroraStateStore(history=history)
+    store.update(current_mode="idle", dnd_active=False)
+    assert len(history) == 1
+    store.update(current_mode="focus")
+    assert len(history) == 2
+
+
+def test_aurora_stores_keep_separate_histories():
+    from corund.state_history import get_history
+
+    first, second = AuroraStateStore(), AuroraStateStore()
+    first.update(current_mode="focus")
+    assert first.history is not second.history
+    assert second.history.latest["current_mode"] == "idle"
+    assert first.history is not get_history("aurora_runtime")
+
+
+def test_ring_spills_old_snapshots_to_disk(tmp_path):
+    history = StateHistory("spill", capacity=3, spill_path=tmp_path / "history.jsonl")
+    for n in range(10):
+        history.record({"n": n, "tags": ["a", "b"]}, ts=float(n))
+
+    assert len(history) == 3
+    assert history.state_at(8.5)["n"] == 8
+    spilled = history.state_at(2.5)
+    assert spilled["n"] == 2
+    assert spilled["tags"] == ["a", "b"]
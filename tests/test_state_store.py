@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from corund.aurora_state import AuroraStateStore
+from corund.state import EthereaState
+from corund.state_store import EmotionSlice, StateStore, selector
+
+
+def _store():
+    store = StateStore()
+    store.register_slice("emotion", EmotionSlice)
+    return store
+
+
+def test_selector_recomputes_only_when_its_slices_change():
+    store = _store()
+    store.register_slice("etherea", EthereaState)
+    calls = []
+
+    @selector("emotion")
+    def strained(emotion):
+        calls.append(1)
+        return emotion["stress"] > 0.6
+
+    assert store.select(strained) is False
+    assert store.select(strained) is False
+    store.update("etherea", cognitive_load=0.9)
+    store.select(strained)
+    assert len(calls) == 1
+
+    store.update("emotion", stress=0.8)
+    assert store.select(strained) is True
+    assert len(calls) == 2
+
+
+def test_subscription_fires_only_when_output_changes():
+    store = _store()
+    seen = []
+
+    @selector("emotion")
+    def focused(emotion):
+        return emotion["focus"] >= 0.7
+
+    unsubscribe = store.subscribe(focused, seen.append)
+    store.update("emotion", focus=0.55)
+    store.update("emotion", focus=0.8)
+    store.update("emotion", focus=0.9)
+    store.update("emotion", focus=0.9)
+    assert seen == [True]
+    assert store.version("emotion") == 3
+
+    unsubscribe()
+    store.update("emotion", focus=0.1)
+    assert seen == [True]
+
+
+def test_update_rejects_unknown_fields():
+    store = _store()
+    with pytest.raises(KeyError):
+        store.update("emotion", mood="happy")
+    assert store.version("emotion") == 0
+
+
+def test_aurora_store_forwards_ei_keys_to_emotion_slice():
+    store = StateStore()
+    aurora = AuroraStateStore(store=store)
+    aurora.update(focus=0.9, stress=0.1, emotion_tag="focused", current_mode="deep_work", bogus=1)
+
+    assert store.get("emotion")["focus"] == 0.9
+    assert store.get("emotion")["emotion_tag"] == "focused"
+    assert store.get("aurora")["current_mode"] == "deep_work"
+    assert aurora.runtime.current_mode == "deep_work"
+
+
+def test_etherea_state_changes_mirror_into_store():
+    store = StateStore()
+    state = EthereaState()
+    state.attach_store(store)
+
+    async def _run():
+        await state.set_focus_level(0.8, "test")
+        async with state.batch("test"):
+            await state.set_cognitive_load(0.4, "test")
+            await state.set_activity_state("flow", "test")
+
+    asyncio.run(_run())
+    etherea = store.get("etherea")
+    assert etherea["focus_level"] == 0.8
+    assert etherea["cognitive_load"] == 0.4
+    assert etherea["activity_state"] == "flow"
+    assert store.version("etherea") == 2
+
+
+def test_app_controller_consumers_skip_unrelated_changes(monkeypatch):
+    from corund import app_controller
+
+    store = StateStore()
+    aurora = AuroraStateStore(store=store)
+    shown, nudges = [], []
+    monkeypatch.setattr(app_controller.NotificationManager, "instance",
+                        classmethod(lambda cls: SimpleNamespace(call_me_back=lambda text: nudges.append(text) or True)))
+    controller = app_controller.AppController.__new__(app_controller.AppController)
+    controller.store = store
+    controller._ei_readout = None
+    controller._last_callback_notif = 0.0
+    controller.window = SimpleNamespace(on_emotion_updated=shown.append)
+
+    controller._apply_state_changes()
+    assert shown == [{"focus": 0.5, "stress": 0.2, "energy": 0.5}]
+    aurora.update(current_mode="focus", workspace_name="study", session_active=True)
+    aurora.update(focus=0.501, emotion_tag="focus")  # below the precision shown
+    controller._apply_state_changes()
+    assert len(shown) == 1 and nudges == []
+
+    aurora.update(focus=0.2)
+    controller._apply_state_changes()
+    controller._apply_state_changes()
+    assert shown[-1]["focus"] == 0.2 and len(shown) == 2
+    assert len(nudges) == 1
@@ -0,0 +1,41 @@
+import time
+
+from corund import db
+from corund.database import Database
+from corund.memory_store2 import MemoryStore
+from corund.text_search import search_text
+
+
+def test_search_text_ranks_across_memories_events_and_decisions(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "_DB_PATH", tmp_path / "etherea.sqlite3")
+    database = Database(db_path=str(tmp_path / "etherea.db"))
+    database.add_memory("Studied linear regression and gradient descent for two hours", "study")
+    database.add_memory("Grocery list: apples, oat milk", "note")
+
+    store = MemoryStore(write_behind=False)
+    rec = store.new_decision(
+        agent="policy", workspace="study", tool_name="ui.set_density",
+        args={}, reason="Focus dropped while studying regression",
+    )
+    db.execute(
+        "INSERT OR REPLACE INTO events(event_id, type, source, payload_json) VALUES "
+        "('e1', 'workspace.opened', 'ui', '{\"title\": \"Regression notes.pdf\"}')"
+    )
+    db.execute(
+        "INSERT OR REPLACE INTO events(event_id, type, source, payload_json) VALUES "
+        "('e1', 'workspace.opened', 'ui', '{\"title\": \"Holiday photos\"}')"
+    )
+
+    hits = search_text("When did I last study regression?", database=database)
+    kinds = {hit["kind"] for hit in hits}
+    assert kinds == {"memories", "decisions"}
+    memory = next(hit for hit in hits if hit["kind"] == "memories")
+    assert "[regression]" in memory["snippet"]
+    assert next(hit for hit in hits if hit["kind"] == "decisions")["id"] == rec.decision_id
+    assert [h["rank"] for h in hits] == sorted(h["rank"] for h in hits)
+
+    assert search_text("holiday", kinds=["events"])[0]["id"] == "e1"
+    assert search_text("regression", kinds=["memories"], since=time.time() + 3600, database=database) == []
+    assert search_text('"unbalanced (quote', database=database) == []
+    database.close()
+    db.get_engine().close()